@@ -5,7 +5,6 @@ from flask_limiter.util import get_remote_address
 from dotenv import load_dotenv
 import os
 import sys
-import threading
 import uuid
 from werkzeug.utils import secure_filename
 import logging
@@ -28,12 +27,13 @@ from pipeline.personalization.pattern_discovery import PatternDiscoveryService
 
 # Database and Storage imports
 from database.models import User, Session as DBSession, Event
+from database.context_cache import get_user_context_cache, RECURRING_OCCURRENCES
 from pipeline.input.storage import FileStorage
 from pipeline.events import EventService
 
 # Import pipeline modules
 from pipeline.extraction.extract import UnifiedExtractor
-from pipeline.resolution.temporal_resolver import resolve_temporal
+from pipeline.resolution.temporal_resolver import resolve_temporal_batch, get_duckling_health
 from pipeline.modification.agent import EventModificationAgent
 from pipeline.personalization.agent import PersonalizationAgent
 
@@ -49,6 +49,7 @@ from auth.middleware import require_auth
 
 # Import session processor
 from pipeline.orchestrator import SessionProcessor
+from pipeline.scheduler import get_session_scheduler, SchedulerSaturated
 
 from config.processing import ProcessingConfig
 from config.posthog import init_posthog, set_tracking_context, flush_posthog, capture_agent_error
@@ -209,7 +210,23 @@ app.session_processor = session_processor
 
 @app.route('/health', methods=['GET'])
 def health():
-    return jsonify({'status': 'ok', 'message': 'Backend is running'})
+    # Duckling being down degrades resolution but doesn't fail the backend
+    scheduler_stats = get_session_scheduler().get_stats()
+    return jsonify({
+        'status': 'ok',
+        'message': 'Backend is running',
+        'duckling': get_duckling_health()['state'],
+        'session_queue': {
+            lane: {
+                'running': stats['running'],
+                'queued': stats['queued'],
+                'rejected': stats['rejected'],
+                'wait_p95_ms': stats['wait']['p95_ms'],
+                'run_p95_ms': stats['run']['p95_ms'],
+            }
+            for lane, stats in scheduler_stats['lanes'].items()
+        },
+    })
 
 @app.route('/process', methods=['POST'])
 def process_input():
@@ -313,13 +330,13 @@ def process_input():
         # Resolve temporal expressions per event
         calendar_events = []
         warnings = []
-        for i, extracted in enumerate(extracted_events):
-            try:
-                calendar_event = resolve_temporal(extracted, user_timezone=timezone)
-                calendar_events.append(calendar_event.model_dump())
-            except Exception as e:
-                logger.warning(f"Temporal resolution failed for event {i+1}: {e}")
-                warnings.append(f"Event {i+1} ('{extracted.summary}'): {str(e)}")
+        resolved = resolve_temporal_batch(extracted_events, user_timezone=timezone)
+        for i, (extracted, result) in enumerate(zip(extracted_events, resolved)):
+            if isinstance(result, Exception):
+                logger.warning(f"Temporal resolution failed for event {i+1}: {result}")
+                warnings.append(f"Event {i+1} ('{extracted.summary}'): {str(result)}")
+            else:
+                calendar_events.append(result.model_dump())
 
         response = {
             'success': True,
@@ -567,10 +584,13 @@ def check_event_conflicts():
     same session so a session's own events don't conflict with themselves).
 
     Handles recurring events in both directions:
-    - Candidate events with RRULEs: expands occurrences, checks each against DB
-    - Existing recurring events in DB: expands occurrences, checks against candidates
+    - Candidate events with RRULEs: expands occurrences; every candidate range
+      and occurrence is checked against the DB in one batched RPC
+    - Existing recurring events in DB: checks candidates against the user's
+      cached RecurringOccurrenceIndex (expanded once, invalidated on event writes)
     """
-    from pipeline.resolution.rrule_utils import expand_rrule, parse_event_times, times_overlap
+    from pipeline.resolution.rrule_utils import expand_rrule, parse_event_times
+    from pipeline.resolution.recurrence_index import RecurringOccurrenceIndex
 
     try:
         user_id = request.user_id
@@ -589,93 +609,72 @@ def check_event_conflicts():
             if session:
                 exclude_ids = set(session.get('event_ids') or [])
 
-        # Pre-fetch existing recurring events for direction B checks
-        existing_recurring = Event.get_recurring_events(user_id)
-        # Filter out events from the same session
-        existing_recurring = [
-            e for e in existing_recurring if e.get('id') not in exclude_ids
-        ]
+        # Expanded occurrences of existing recurring events for direction B checks
+        recurring_index = get_user_context_cache().get(
+            user_id, RECURRING_OCCURRENCES,
+            lambda: RecurringOccurrenceIndex(Event.get_recurring_events(user_id)),
+        )
 
-        conflicts = {}
+        # Collect every range to check against the DB: each candidate's base
+        # occurrence, plus future occurrences of recurring candidates
+        ranges = []
+        candidates = []  # (index, start, end, [range indexes])
         for i, event in enumerate(events):
             parsed = parse_event_times(event)
             if not parsed:
                 continue
 
             event_start, event_end = parsed
-            event_duration = event_end - event_start
-            event_conflicts = []
-            seen = set()  # deduplicate by (summary, start_time)
-
-            # --- Direction A: check candidate's base occurrence against DB ---
-            raw_conflicts = EventService.get_conflicting_events(
-                user_id, event_start.isoformat(), event_end.isoformat()
-            )
-            for c in raw_conflicts:
-                if c.get('id') in exclude_ids:
-                    continue
-                key = (c.get('summary', ''), c.get('start_time', ''))
-                if key not in seen:
-                    seen.add(key)
-                    event_conflicts.append({
-                        'summary': c.get('summary', 'Untitled'),
-                        'start_time': c.get('start_time', ''),
-                        'end_time': c.get('end_time', ''),
-                    })
+            range_indexes = [len(ranges)]
+            ranges.append((event_start.isoformat(), event_end.isoformat()))
 
-            # --- Direction A+: if candidate is recurring, check future occurrences ---
             candidate_recurrence = event.get('recurrence')
             if candidate_recurrence:
                 occurrences = expand_rrule(
-                    candidate_recurrence, event_start, event_duration
+                    candidate_recurrence, event_start, event_end - event_start
                 )
-                # Skip the first occurrence (already checked above)
+                # Skip the first occurrence (it's the base range)
                 for occ_start, occ_end in occurrences[1:]:
-                    raw = EventService.get_conflicting_events(
-                        user_id, occ_start.isoformat(), occ_end.isoformat()
-                    )
-                    for c in raw:
-                        if c.get('id') in exclude_ids:
-                            continue
-                        key = (c.get('summary', ''), c.get('start_time', ''))
-                        if key not in seen:
-                            seen.add(key)
-                            event_conflicts.append({
-                                'summary': c.get('summary', 'Untitled'),
-                                'start_time': c.get('start_time', ''),
-                                'end_time': c.get('end_time', ''),
-                            })
+                    range_indexes.append(len(ranges))
+                    ranges.append((occ_start.isoformat(), occ_end.isoformat()))
+
+            candidates.append((i, event_start, event_end, range_indexes))
+
+        # --- Direction A/A+: one query for all ranges of all candidates ---
+        conflicts_by_range = {}
+        for c in EventService.get_conflicting_events_batch(user_id, ranges):
+            conflicts_by_range.setdefault(c.get('range_idx'), []).append(c)
+
+        conflicts = {}
+        for i, event_start, event_end, range_indexes in candidates:
+            event_conflicts = []
+            seen = set()  # deduplicate by (summary, start_time)
+
+            for range_idx in range_indexes:
+                for c in conflicts_by_range.get(range_idx, []):
+                    if c.get('id') in exclude_ids:
+                        continue
+                    key = (c.get('summary', ''), c.get('start_time', ''))
+                    if key not in seen:
+                        seen.add(key)
+                        event_conflicts.append({
+                            'summary': c.get('summary', 'Untitled'),
+                            'start_time': c.get('start_time', ''),
+                            'end_time': c.get('end_time', ''),
+                        })
 
             # --- Direction B: check existing recurring events against candidate ---
-            for rec_event in existing_recurring:
-                rec_start = rec_event.get('start_time')
-                rec_end = rec_event.get('end_time')
-                rec_rules = rec_event.get('recurrence')
-                if not rec_start or not rec_end or not rec_rules:
-                    continue
-
-                try:
-                    from dateutil.parser import isoparse
-                    rec_dt_start = isoparse(rec_start)
-                    rec_dt_end = isoparse(rec_end)
-                    rec_duration = rec_dt_end - rec_dt_start
-
-                    rec_occurrences = expand_rrule(
-                        rec_rules, rec_dt_start, rec_duration
-                    )
-
-                    for occ_start, occ_end in rec_occurrences:
-                        if times_overlap(event_start, event_end, occ_start, occ_end):
-                            key = (rec_event.get('summary', ''), occ_start.isoformat())
-                            if key not in seen:
-                                seen.add(key)
-                                event_conflicts.append({
-                                    'summary': rec_event.get('summary', 'Untitled'),
-                                    'start_time': occ_start.isoformat(),
-                                    'end_time': occ_end.isoformat(),
-                                })
-                except (ValueError, TypeError):
-                    continue
+            for rec_event, occ_start, occ_end in recurring_index.overlapping(
+                event_start, event_end, exclude_ids
+            ):
+                key = (rec_event.get('summary', ''), occ_start.isoformat())
+                if key not in seen:
+                    seen.add(key)
+                    event_conflicts.append({
+                        'summary': rec_event.get('summary', 'Untitled'),
+                        'start_time': occ_start.isoformat(),
+                        'end_time': occ_end.isoformat(),
+                    })
 
             if event_conflicts:
                 conflicts[str(i)] = event_conflicts
@@ -836,6 +835,17 @@ def delete_patterns():
 # Database-backed Session Management Endpoints
 # ============================================================================
 
+def _queue_full_response(e: SchedulerSaturated):
+    """429 for a session the scheduler couldn't admit."""
+    response = jsonify({
+        'error': 'We\'re processing a lot of requests right now. Please try again in a few seconds.',
+        'error_type': 'queue_full',
+        'retry_after': e.retry_after,
+    })
+    response.headers['Retry-After'] = str(e.retry_after)
+    return response, 429
+
+
 @app.route('/sessions', methods=['POST'])
 @require_auth
 def create_text_session():
@@ -871,6 +881,10 @@ def create_text_session():
                 'upgrade_url': '/plans'
             }), 403
 
+        # Reject before creating anything if the session queue is full
+        scheduler = get_session_scheduler()
+        scheduler.check_admission(user_id)
+
         # Create session in database
         session = DBSession.create(
             user_id=user_id,
@@ -882,13 +896,12 @@ def create_text_session():
         from pipeline.stream import init_stream
         init_stream(session['id'])
 
-        # Start processing in background thread
-        thread = threading.Thread(
-            target=session_processor.process_text_session,
-            args=(session['id'], input_text)
-        )
-        thread.daemon = True  # Don't block server shutdown
-        thread.start()
+        # Queue processing on the session worker pool
+        try:
+            scheduler.submit(session['id'], user_id, session_processor.process_text_session, session['id'], input_text)
+        except SchedulerSaturated:
+            DBSession.mark_error(session['id'], 'Server busy, please try again')
+            raise
 
         return jsonify({
             'success': True,
@@ -896,6 +909,8 @@ def create_text_session():
             'message': 'Session created, processing started'
         }), 201
 
+    except SchedulerSaturated as e:
+        return _queue_full_response(e)
     except Exception as e:
         return jsonify({'error': f'Failed to create session: {str(e)}'}), 500
 
@@ -955,6 +970,10 @@ def upload_file_endpoint():
                 'upgrade_url': '/plans'
             }), 403
 
+        # Reject before uploading if the session queue is full
+        scheduler = get_session_scheduler()
+        scheduler.check_admission(user_id)
+
         # Upload to Supabase Storage
         file_path = FileStorage.upload_file(
             file=file,
@@ -979,13 +998,15 @@ def upload_file_endpoint():
         from pipeline.stream import init_stream
         init_stream(session['id'])
 
-        # Start processing in background thread
-        thread = threading.Thread(
-            target=session_processor.process_file_session,
-            args=(session['id'], file_path, file_type)
-        )
-        thread.daemon = True  # Don't block server shutdown
-        thread.start()
+        # Queue processing on the session worker pool
+        try:
+            scheduler.submit(
+                session['id'], user_id, session_processor.process_file_session,
+                session['id'], file_path, file_type
+            )
+        except SchedulerSaturated:
+            DBSession.mark_error(session['id'], 'Server busy, please try again')
+            raise
 
         return jsonify({
             'success': True,
@@ -994,6 +1015,8 @@ def upload_file_endpoint():
             'message': 'File uploaded, processing started'
         }), 201
 
+    except SchedulerSaturated as e:
+        return _queue_full_response(e)
     except Exception as e:
         return jsonify({'error': f'File upload failed: {str(e)}'}), 500
 
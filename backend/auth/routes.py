@@ -10,6 +10,10 @@ from typing import Dict, Any
 from database.models import User, Session as DBSession, Event, Calendar
 from auth.middleware import require_auth
 from database.supabase_client import get_supabase
+from database.context_cache import get_user_context_cache, TIMEZONE
+from database.calendar_index import get_calendar_index
+from pipeline.personalization.similarity import get_index_store
+from pipeline.personalization.location_gazetteer import get_location_gazetteer
 
 # Create blueprint
 auth_bp = Blueprint('auth', __name__)
@@ -100,6 +104,14 @@ def sync_user_profile():
 
                 # Update foreign keys first, then the user row
                 supabase.table("events").update({"user_id": user_id}).eq("user_id", old_user_id).execute()
+                get_user_context_cache().invalidate(old_user_id)
+                get_user_context_cache().invalidate(user_id)
+                get_calendar_index().invalidate(old_user_id)
+                get_calendar_index().invalidate(user_id)
+                get_index_store().invalidate(old_user_id)
+                get_index_store().invalidate(user_id)
+                get_location_gazetteer().invalidate(old_user_id)
+                get_location_gazetteer().invalidate(user_id)
                 supabase.table("sessions").update({"user_id": user_id}).eq("user_id", old_user_id).execute()
                 supabase.table("users").update({"id": user_id}).eq("id", old_user_id).execute()
 
@@ -154,6 +166,7 @@ def sync_user_profile():
             if browser_timezone and not existing_user.get('timezone'):
                 supabase = get_supabase()
                 supabase.table("users").update({"timezone": browser_timezone}).eq("id", user_id).execute()
+                get_user_context_cache().invalidate(user_id, TIMEZONE)
             user = User.get_by_id(user_id)
 
         response_data = {
@@ -572,6 +585,10 @@ def delete_account():
 
         # 3. Delete any remaining events (synced provider events not linked to sessions)
         supabase.table("events").delete().eq("user_id", user_id).execute()
+        get_user_context_cache().invalidate(user_id)
+        get_calendar_index().invalidate(user_id)
+        get_index_store().invalidate(user_id)
+        get_location_gazetteer().invalidate(user_id)
 
         # 4. Delete calendar patterns
         Calendar.delete_by_user(user_id)
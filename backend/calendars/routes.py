@@ -11,6 +11,10 @@ from calendars import factory
 from calendars.google import auth as google_auth  # Still needed for legacy token storage endpoint
 from auth.middleware import require_auth
 from database.models import User, Calendar
+from database.context_cache import get_user_context_cache, HISTORICAL_EVENTS, RECURRING_OCCURRENCES
+from database.calendar_index import get_calendar_index
+from pipeline.personalization.similarity import get_index_store
+from pipeline.personalization.location_gazetteer import get_location_gazetteer
 
 # Create blueprint
 calendar_bp = Blueprint('calendar', __name__)
@@ -624,6 +628,10 @@ def _delete_provider_events(user_id: str, provider: str) -> int:
         response = supabase.table("events").delete()\
             .eq("user_id", user_id)\
             .eq("provider", provider).execute()
+        get_user_context_cache().invalidate(user_id, HISTORICAL_EVENTS, RECURRING_OCCURRENCES)
+        get_calendar_index().invalidate(user_id)
+        get_index_store().invalidate(user_id)
+        get_location_gazetteer().invalidate(user_id)
         return len(response.data)
     except Exception as e:
         print(f"Warning: Failed to delete {provider} events for user {user_id}: {e}")
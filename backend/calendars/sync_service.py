@@ -5,12 +5,17 @@ Also syncs the calendar list and triggers background pattern enrichment.
 """
 
 import logging
+import queue
 import threading
-from typing import Dict, List, Optional, Set
+from typing import Callable, Dict, List, Optional, Set, Tuple
 
 from datetime import datetime, timedelta
 from database.models import Event, User, Calendar
+from database.context_cache import get_user_context_cache, HISTORICAL_EVENTS, RECURRING_OCCURRENCES
 from pipeline.events import EventService
+from pipeline.personalization.location_gazetteer import get_location_gazetteer
+from pipeline.personalization.similarity import get_index_store
+from pipeline.scheduler import submit_maintenance
 from config.calendar import SyncConfig
 from config.limits import EventLimits
 
@@ -53,6 +58,11 @@ class SmartSyncService:
         # Sync calendar list (metadata + background enrichment)
         calendars = self._sync_calendars(user_id, state['provider'])
 
+        # Next session reloads history (calendar upserts invalidate calendars)
+        if any(results.get(k) for k in ('events_added', 'events_updated', 'events_deleted')):
+            get_user_context_cache().invalidate(user_id, HISTORICAL_EVENTS, RECURRING_OCCURRENCES)
+            get_index_store().invalidate(user_id)
+
         return {
             'success': True,
             'strategy': strategy,
@@ -226,10 +236,8 @@ class SmartSyncService:
 
         results = {'events_added': 0, 'events_updated': 0, 'events_deleted': 0}
 
-        for event in events:
-            change = self._process_event(user_id, provider, calendar_id, event)
-            if change:
-                results[f'events_{change}'] += 1
+        for i in range(0, len(events), SyncConfig.MAX_RESULTS_FULL):
+            self._apply_events(user_id, provider, calendar_id, events[i:i + SyncConfig.MAX_RESULTS_FULL], results)
 
         # Update last_synced_at
         self._save_sync_state(user_id, provider, calendar_id, sync_token=None)
@@ -260,38 +268,24 @@ class SmartSyncService:
 
         service = build('calendar', 'v3', credentials=credentials)
 
-        results = {'events_added': 0, 'events_updated': 0, 'events_deleted': 0}
-        page_token = None
-        new_sync_token = None
-
-        while True:
-            try:
-                response = service.events().list(
-                    calendarId=calendar_id,
-                    syncToken=sync_token,
-                    pageToken=page_token,
-                    showDeleted=True
-                ).execute()
-
-                # Process events
-                for event in response.get('items', []):
-                    change = self._process_event(user_id, provider, calendar_id, event)
-                    if change:
-                        results[f'events_{change}'] += 1
-
-                page_token = response.get('nextPageToken')
-                if not page_token:
-                    new_sync_token = response.get('nextSyncToken')
-                    break
+        def fetch_page(page_token: Optional[str]) -> Dict:
+            return service.events().list(
+                calendarId=calendar_id,
+                syncToken=sync_token,
+                pageToken=page_token,
+                showDeleted=True
+            ).execute()
 
-            except HttpError as e:
-                if e.resp.status == 410:
-                    # Token expired - fallback to full sync
-                    print(f"Sync token expired for user {user_id}, falling back to full sync")
-                    return self._google_full_sync(user_id, provider, calendar_id)
-                raise
+        try:
+            results, new_sync_token = self._sync_pages(user_id, provider, calendar_id, fetch_page)
+        except HttpError as e:
+            if e.resp.status == 410:
+                # Token expired - fallback to full sync
+                print(f"Sync token expired for user {user_id}, falling back to full sync")
+                return self._google_full_sync(user_id, provider, calendar_id)
+            raise
 
-        # Save new sync token
+        # Save new sync token (only reached once every page is written)
         if new_sync_token:
             self._save_sync_state(user_id, provider, calendar_id, new_sync_token)
 
@@ -328,10 +322,7 @@ class SmartSyncService:
 
         results = {'events_added': 0, 'events_updated': 0, 'events_deleted': 0}
 
-        for event in response.get('items', []):
-            change = self._process_event(user_id, provider, calendar_id, event)
-            if change:
-                results[f'events_{change}'] += 1
+        self._apply_events(user_id, provider, calendar_id, response.get('items', []), results)
 
         # Get new sync token for next time
         sync_token = response.get('nextSyncToken')
@@ -362,12 +353,8 @@ class SmartSyncService:
         # Fetch events from last year
         time_min = (datetime.utcnow() - timedelta(days=365)).isoformat() + 'Z'
 
-        results = {'events_added': 0, 'events_updated': 0, 'events_deleted': 0}
-        page_token = None
-        new_sync_token = None
-
-        while True:
-            response = service.events().list(
+        def fetch_page(page_token: Optional[str]) -> Dict:
+            return service.events().list(
                 calendarId=calendar_id,
                 timeMin=time_min,
                 maxResults=SyncConfig.MAX_RESULTS_FULL,
@@ -376,49 +363,184 @@ class SmartSyncService:
                 singleEvents=True
             ).execute()
 
-            # Process events
-            for event in response.get('items', []):
-                change = self._process_event(user_id, provider, calendar_id, event)
-                if change:
-                    results[f'events_{change}'] += 1
+        results, new_sync_token = self._sync_pages(user_id, provider, calendar_id, fetch_page)
 
-            page_token = response.get('nextPageToken')
-            if not page_token:
-                new_sync_token = response.get('nextSyncToken')
-                break
-
-        # Save sync token
+        # Save sync token (only reached once every page is written)
         if new_sync_token:
             self._save_sync_state(user_id, provider, calendar_id, new_sync_token)
 
         return results
 
-    def _process_event(self, user_id: str, provider: str, calendar_id: str, event: Dict) -> Optional[str]:
+    def _sync_pages(
+        self,
+        user_id: str,
+        provider: str,
+        calendar_id: str,
+        fetch_page: Callable[[Optional[str]], Dict]
+    ) -> Tuple[Dict, Optional[str]]:
         """
-        Process single event (create/update/delete).
+        Page through the provider while a writer thread applies each page.
+
+        Fetching page N+1 overlaps writing page N, so a long sync takes about
+        max(fetch, write) instead of their sum. A bounded queue
+        (SyncConfig.PIPELINE_MAX_PAGES_AHEAD) keeps paging from running far
+        ahead of the database. There is a single writer and it applies pages
+        in fetch order, so an event that shows up on several pages ends up in
+        its latest state.
+
+        Args:
+            user_id: User's UUID
+            provider: Provider name
+            calendar_id: Provider calendar ID
+            fetch_page: Takes a page token (None for the first page) and
+                        returns the provider response dict
 
         Returns:
-            'added', 'updated', 'deleted', or None
+            (results, next_sync_token). The sync token is only returned once
+            every page has been written.
+
+        Raises:
+            Whatever fetch_page or the writes raised, after the writer stops
         """
+        results = {'events_added': 0, 'events_updated': 0, 'events_deleted': 0}
+        pages: queue.Queue = queue.Queue(maxsize=SyncConfig.PIPELINE_MAX_PAGES_AHEAD)
+        write_errors: List[Exception] = []
+
+        def write_pages():
+            while True:
+                items = pages.get()
+                if items is None:
+                    return
+                if write_errors:
+                    continue  # Keep draining so the fetcher never blocks on a full queue
+                try:
+                    self._apply_events(user_id, provider, calendar_id, items, results)
+                except Exception as e:
+                    write_errors.append(e)
 
-        provider_event_id = event['id']
+        writer = threading.Thread(
+            target=write_pages,
+            daemon=True,
+            name=f"sync-write-{user_id[:8]}"
+        )
+        writer.start()
 
-        # Check if exists
-        existing = Event.get_by_provider_event_id(
-            user_id=user_id,
-            provider=provider,
-            provider_event_id=provider_event_id
+        page_token = None
+        next_sync_token = None
+        try:
+            while not write_errors:
+                response = fetch_page(page_token)
+                pages.put(response.get('items', []))
+
+                page_token = response.get('nextPageToken')
+                if not page_token:
+                    next_sync_token = response.get('nextSyncToken')
+                    break
+        finally:
+            pages.put(None)
+            writer.join()
+
+        if write_errors:
+            raise write_errors[0]
+
+        return results, next_sync_token
+
+    def _apply_events(
+        self,
+        user_id: str,
+        provider: str,
+        calendar_id: str,
+        events: List[Dict],
+        results: Dict[str, int]
+    ):
+        """
+        Apply a page of provider events (create/update/delete) in bulk.
+
+        Looks up the page's existing rows in one query, diffs in memory in
+        event order (so a repeated ID in the page counts exactly as it would
+        applied one by one), then writes all inserts, updates and
+        soft-deletes in batches.
+
+        Args:
+            user_id: User's UUID
+            provider: Provider name
+            calendar_id: Provider calendar ID
+            events: Provider event dicts (with 'id' and optional 'status')
+            results: Counters to increment (events_added/updated/deleted)
+        """
+        if not events:
+            return
+
+        existing = Event.get_by_provider_event_ids(
+            user_id, provider, [event['id'] for event in events]
         )
+        # provider_event_id → row id, or None for a row inserted by this page
+        live = {pid: row['id'] for pid, row in existing.items()}
 
-        # Handle deletion
-        if event.get('status') == 'cancelled':
-            if existing:
-                Event.soft_delete(existing['id'])
-                return 'deleted'
-            return None
+        inserts: Dict[str, Dict] = {}   # provider_event_id → event_data
+        updates: Dict[str, Dict] = {}   # row id → upsert row
+        deletes: List[str] = []
 
-        # Parse event
-        event_data = {
+        for event in events:
+            provider_event_id = event['id']
+
+            # Handle deletion
+            if event.get('status') == 'cancelled':
+                if provider_event_id in live:
+                    row_id = live.pop(provider_event_id)
+                    if row_id is None:
+                        del inserts[provider_event_id]
+                    else:
+                        deletes.append(row_id)
+                    results['events_deleted'] += 1
+                continue
+
+            event_data = self._parse_event(event, calendar_id)
+
+            # Create or update
+            if provider_event_id not in live:
+                live[provider_event_id] = None
+                inserts[provider_event_id] = {'provider_event_id': provider_event_id, **event_data}
+                results['events_added'] += 1
+            elif live[provider_event_id] is None:
+                inserts[provider_event_id] = {'provider_event_id': provider_event_id, **event_data}
+                results['events_updated'] += 1
+            else:
+                updates[live[provider_event_id]] = {
+                    'id': live[provider_event_id],
+                    'user_id': user_id,
+                    'provider': provider,
+                    'provider_event_id': provider_event_id,
+                    **event_data,
+                }
+                results['events_updated'] += 1
+
+        batch = SyncConfig.BULK_WRITE_BATCH_SIZE
+        insert_rows = list(inserts.values())
+        update_rows = list(updates.values())
+
+        for i in range(0, len(insert_rows), batch):
+            created = EventService.bulk_create_provider_events(
+                user_id, provider, calendar_id, insert_rows[i:i + batch]
+            )
+            for row in created:
+                if row.get('id'):
+                    self._record_location(user_id, row['id'], row)
+
+        for i in range(0, len(update_rows), batch):
+            Event.upsert_batch(update_rows[i:i + batch])
+        for row in update_rows:
+            self._record_location(user_id, row['id'], row)
+
+        for i in range(0, len(deletes), batch):
+            Event.soft_delete_batch(deletes[i:i + batch])
+        for row_id in deletes:
+            get_location_gazetteer().remove_event(user_id, row_id)
+
+    @staticmethod
+    def _parse_event(event: Dict, calendar_id: str) -> Dict:
+        """Map a provider event to events-table columns."""
+        return {
             'summary': event.get('summary', 'Untitled Event'),
             'description': event.get('description'),
             'location': event.get('location'),
@@ -431,20 +553,17 @@ class SmartSyncService:
             'calendar_name': calendar_id,
         }
 
-        # Create or update
-        if existing:
-            Event.update(existing['id'], event_data)
-            return 'updated'
-        else:
-            EventService.create_provider_event(
-                user_id=user_id,
-                provider=provider,
-                provider_account_id=calendar_id,
-                provider_event_id=provider_event_id,
-                compute_embedding_now=False,
-                **event_data
-            )
-            return 'added'
+    @staticmethod
+    def _record_location(user_id: str, event_id: str, event_data: Dict):
+        """Keep the user's location gazetteer current with a synced event."""
+        get_location_gazetteer().record_event(
+            user_id,
+            event_id,
+            location=event_data.get('location'),
+            summary=event_data.get('summary'),
+            calendar_name=event_data.get('calendar_name'),
+            start_time=event_data.get('start_time'),
+        )
 
     # ========================================================================
     # Calendar List Sync + Pattern Enrichment
@@ -510,16 +629,14 @@ class SmartSyncService:
             total_events = Event.count_user_events(user_id)
             if total_events >= EventLimits.MIN_EVENTS_FOR_PATTERN_DISCOVERY:
                 logger.info(
-                    f"Spawning background enrichment for {len(needs_enrichment)} "
+                    f"Queueing background enrichment for {len(needs_enrichment)} "
                     f"calendar(s) for user {user_id[:8]}"
                 )
-                thread = threading.Thread(
-                    target=self._enrich_calendars_background,
-                    args=(user_id, provider, needs_enrichment),
-                    daemon=True,
-                    name=f"cal-enrich-{user_id[:8]}"
+                submit_maintenance(
+                    f"cal-enrich-{user_id}", user_id,
+                    self._enrich_calendars_background,
+                    user_id, provider, needs_enrichment
                 )
-                thread.start()
 
         # Return calendar list from DB (now has updated metadata)
         return self._calendars_from_db(user_id)
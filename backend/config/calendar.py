@@ -16,6 +16,12 @@ class SyncConfig:
     MAX_RESULTS_INCREMENTAL: int = 250
     MAX_RESULTS_FULL: int = 2500
 
+    # Rows per batched INSERT / upsert / soft-delete when applying a page
+    BULK_WRITE_BATCH_SIZE: int = 500
+
+    # Pages fetched ahead of the DB writer before paging blocks (backpressure)
+    PIPELINE_MAX_PAGES_AHEAD: int = 2
+
 
 class CollectionConfig:
     """Data collection for pattern analysis."""
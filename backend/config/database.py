@@ -3,6 +3,8 @@ Database query limits and defaults.
 Controls pagination, batch sizes, and default result counts.
 """
 
+import os
+
 
 class QueryLimits:
     """Default limits for database queries."""
@@ -16,6 +18,9 @@ class QueryLimits:
     DEFAULT_EVENTS_WITH_EMBEDDINGS_LIMIT: int = 200
     DEFAULT_SIMILAR_EVENTS_LIMIT: int = 10
 
+    # Provider event IDs per `in_` lookup (keeps the request URL short)
+    PROVIDER_EVENT_LOOKUP_CHUNK: int = 200
+
     # Embedding computation
     EMBEDDING_BATCH_SIZE: int = 100
 
@@ -26,9 +31,69 @@ class QueryLimits:
     LOCATION_SEARCH_RESULTS_LIMIT: int = 5
 
 
+class LocationGazetteerConfig:
+    """Per-user location gazetteer (fuzzy location history search)."""
+
+    # Max users kept in memory (LRU beyond this)
+    MAX_USERS: int = 256
+
+    # Reseed from the database after this long (backstop for writes outside sync)
+    TTL_SECONDS: float = 3600.0
+
+
+class CalendarIndexConfig:
+    """Per-user in-memory calendar index (conflict / surrounding-event queries)."""
+
+    # Serve interval queries from the index instead of PostgREST. Opt-in: the
+    # index lives in each gunicorn worker and is only updated by writes made in
+    # that worker, so with -w > 1 another worker can serve stale conflicts and
+    # context until its TTL expires. Enable with a single worker.
+    ENABLED: bool = os.getenv('DROPCAL_CALENDAR_INDEX', 'false').lower() == 'true'
+
+    # Max users kept in memory (LRU beyond this)
+    MAX_USERS: int = 128
+
+    # Reload from the database after this long (backstop for writes that bypass the models)
+    TTL_SECONDS: float = 900.0
+
+    # Page size when seeding a user's index
+    LOAD_PAGE_SIZE: int = 1000
+
+
+class UserContextCacheConfig:
+    """Per-user cache of session context (historical events, calendars, timezone)."""
+
+    # Max users kept in memory (LRU beyond this)
+    MAX_USERS: int = 256
+
+    # Reload from the database after this long (backstop for writes that bypass the models)
+    TTL_SECONDS: float = 300.0
+
+
 class StreamConfig:
-    """Server-sent event stream polling configuration."""
+    """Server-sent event stream backend and polling configuration."""
+
+    # 'memory' (process-local, needs gunicorn -w 1) or 'redis' (shared across
+    # workers). Only streams are shared: the scheduler and caches stay per worker.
+    BACKEND: str = os.getenv('DROPCAL_STREAM_BACKEND', 'memory').lower()
+    REDIS_URL: str = os.getenv('DROPCAL_STREAM_REDIS_URL', os.getenv('REDIS_URL', 'redis://localhost:6379/0'))
+    REDIS_KEY_PREFIX: str = 'dropcal:stream:'
+
+    # Streams older than this are dropped (memory) or expire (redis)
+    TTL_SECONDS: int = 600  # 10 minutes
+
+    # Event-list changes kept per in-process stream for delta resume
+    # (older Last-Event-IDs get a full snapshot instead)
+    MAX_CHANGE_LOG: int = 500
+
+    # Live streams: readers sleep until the pipeline writes; a keepalive
+    # comment goes out when nothing was sent for this long (ALB/Nginx idle timeouts)
+    HEARTBEAT_SECONDS: float = 15.0
+    MAX_STREAM_SECONDS: float = 300.0  # 5 min
 
-    # Max polls for SSE stream (MAX_POLLS * POLL_INTERVAL = max stream duration)
+    # DB fallback (no stream on this worker): MAX_POLLS * POLL_INTERVAL = max
+    # stream duration. Polls start at POLL_INTERVAL and back off to
+    # POLL_MAX_INTERVAL so a waiting tab doesn't hit Supabase 10x a second.
     MAX_POLLS: int = 100
     POLL_INTERVAL_SECONDS: float = 0.1  # 100ms
+    POLL_MAX_INTERVAL_SECONDS: float = 2.0
@@ -4,6 +4,7 @@ Controls input size limits, event caps, parallelism, and timeouts.
 """
 
 import os
+from dataclasses import dataclass
 from config.limits import TextLimits, EventLimits
 
 
@@ -40,3 +41,94 @@ class ProcessingConfig:
             f"{cls.MAX_EVENTS_PER_REQUEST} will be processed. "
             f"Please submit remaining events in a separate request."
         )
+
+
+class DucklingCacheConfig:
+    """Memoization of Duckling parse results."""
+
+    # Max cached (text, dims, locale, timezone, reference) entries
+    MAX_ENTRIES: int = int(os.getenv('DROPCAL_DUCKLING_CACHE_SIZE', '4096'))
+
+    # Grains whose resolved value depends only on the reference date, not time of day
+    DAY_GRAINS = frozenset({'day', 'week', 'month', 'quarter', 'year'})
+
+
+class DucklingBreakerConfig:
+    """Circuit breaker in front of the Duckling sidecar."""
+
+    # Consecutive connection errors / timeouts / 5xx before failing fast
+    FAILURE_THRESHOLD: int = int(os.getenv('DROPCAL_DUCKLING_FAILURE_THRESHOLD', '3'))
+
+    # Seconds between background health probes while open
+    PROBE_INTERVAL_SECONDS: float = float(os.getenv('DROPCAL_DUCKLING_PROBE_INTERVAL', '5'))
+
+
+class DucklingTransportConfig:
+    """HTTP connection pool for the Duckling sidecar."""
+
+    # Sessions a worker resolves at once (each fans out up to MAX_WORKERS parses)
+    CONCURRENT_SESSIONS: int = int(os.getenv('DROPCAL_CONCURRENT_SESSIONS', '4'))
+
+    # Pooled keep-alive connections to Duckling
+    POOL_MAXSIZE: int = ProcessingConfig.MAX_WORKERS * CONCURRENT_SESSIONS
+
+    # Seconds an idle pooled connection is kept open
+    KEEPALIVE_EXPIRY_SECONDS: float = 60.0
+
+    # Gather batch parses on one asyncio client (httpx, pinned in requirements.txt)
+    # instead of a thread pool. Falls back to the threaded pool if httpx is missing.
+    USE_ASYNC: bool = os.getenv('DROPCAL_DUCKLING_ASYNC', 'false').lower() == 'true'
+
+
+@dataclass(frozen=True)
+class LaneLimits:
+    """Concurrency and queue limits for one scheduler lane."""
+
+    # Jobs from this lane running at once
+    workers: int
+
+    # Jobs waiting before new ones are rejected (429 for sessions)
+    max_queued: int
+
+    # Jobs one user may have waiting at once
+    max_queued_per_user: int
+
+    # Only start when no higher lane is waiting and sessions leave a worker idle
+    yields: bool = False
+
+
+class SessionSchedulerConfig:
+    """Worker pool that runs session pipelines and background maintenance."""
+
+    # Sessions (interactive + email) processed at once per worker process
+    # (the Duckling pool is sized for this)
+    WORKERS: int = DucklingTransportConfig.CONCURRENT_SESSIONS
+
+    # Background jobs (embeddings, calendar enrichment, pattern refresh) at once
+    MAINTENANCE_WORKERS: int = int(os.getenv('DROPCAL_MAINTENANCE_WORKERS', '1'))
+
+    # Lanes in priority order: a free worker always takes the first lane with work
+    LANES = {
+        'interactive': LaneLimits(
+            workers=WORKERS,
+            max_queued=int(os.getenv('DROPCAL_SESSION_QUEUE_MAX', '32')),
+            max_queued_per_user=int(os.getenv('DROPCAL_SESSION_QUEUE_MAX_PER_USER', '4')),
+        ),
+        'email': LaneLimits(
+            workers=max(1, WORKERS // 2),
+            max_queued=64,
+            max_queued_per_user=8,
+        ),
+        'maintenance': LaneLimits(
+            workers=MAINTENANCE_WORKERS,
+            max_queued=256,
+            max_queued_per_user=16,
+            yields=True,
+        ),
+    }
+
+    # Retry-After sent with a 429 when saturated
+    RETRY_AFTER_SECONDS: int = 5
+
+    # Queue wait / run time histogram buckets (milliseconds)
+    WAIT_BUCKETS_MS = (10, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
@@ -2,6 +2,9 @@
 Embedding, similarity search, and pattern discovery configuration.
 """
 
+import os
+from typing import Optional
+
 
 class EmbeddingConfig:
     """Sentence transformer and embedding settings."""
@@ -12,9 +15,47 @@ class EmbeddingConfig:
     FAISS_BATCH_SIZE: int = 32
     KEYWORD_CACHE_SIZE: int = 1000
     QUERY_CACHE_SIZE_LIMIT: int = 1000
+    # Shared text → embedding LRU cache (all similarity instances in the process)
+    EMBEDDING_CACHE_MAX_BYTES: int = int(os.getenv('DROPCAL_EMBEDDING_CACHE_MAX_MB', '32')) * 1024 * 1024
+    EMBEDDING_CACHE_DTYPE: str = os.getenv('DROPCAL_EMBEDDING_CACHE_DTYPE', 'float32')  # or 'float16'
     LENGTH_SIMILARITY_DECAY_T: float = 3.0  # exp(-diff / T)
 
 
+class CompactIndexConfig:
+    """Opt-in compact FAISS index for large histories (exact flat index otherwise)."""
+
+    # 'flat' (exact, default), 'sq8' (int8 scalar quantized), 'sq_fp16', or 'hnsw'
+    INDEX_TYPE: str = os.getenv('DROPCAL_SIMILARITY_INDEX_TYPE', 'flat')
+    # Compact index only used at or above this many events. Histories are
+    # loaded with QueryLimits.PERSONALIZATION_HISTORICAL_LIMIT (200), so this
+    # must stay below that or the compact types are never selected.
+    MIN_EVENTS: int = int(os.getenv('DROPCAL_COMPACT_INDEX_MIN_EVENTS', '100'))
+    # In-memory embedding copy dtype when compact ('float16' or 'float32')
+    EMBEDDING_DTYPE: str = os.getenv('DROPCAL_COMPACT_EMBEDDING_DTYPE', 'float16')
+
+    HNSW_M: int = 32
+    HNSW_EF_CONSTRUCTION: int = 80
+    HNSW_EF_SEARCH: int = 64
+
+
+class CorrectionCacheConfig:
+    """Per-user correction embedding matrix cache."""
+
+    MAX_USERS: int = 256
+    # Backstop for corrections changed outside CorrectionStorageService
+    TTL_SECONDS: float = 600.0
+
+
+class IndexStoreConfig:
+    """Per-user FAISS index store (warm indexes reused across sessions)."""
+
+    # Memory budget for all cached indexes (embeddings + FAISS copy)
+    MAX_BYTES: int = int(os.getenv('DROPCAL_INDEX_STORE_MAX_MB', '128')) * 1024 * 1024
+
+    # Local directory for faiss.write_index snapshots (None = memory only)
+    PERSIST_DIR: Optional[str] = os.getenv('DROPCAL_INDEX_STORE_DIR') or None
+
+
 class PatternDiscoveryConfig:
     """Pattern discovery and sampling settings."""
 
@@ -0,0 +1,360 @@
+"""
+Per-user Calendar Index
+
+In-memory sorted-array index of a user's timed events, answering the interval
+questions that used to be PostgREST round trips:
+
+- overlap: events conflicting with a time range (get_conflicting_events[_batch])
+- k-nearest by start: events around a target time (get_surrounding_events)
+- events on a date: timed events starting that day (get_events_on_date)
+
+Each user's events are kept as sorted (start_us, event_id) lists, one for
+provider events and one for DropCal drafts (drafts count for conflicts but
+not for personalization context). Overlap queries bisect on start time
+bounded by the longest event duration, so only candidates that can overlap
+are inspected.
+
+A user's index is seeded lazily from the events table, then updated
+incrementally from the rows returned by Event model writes (which covers
+calendar sync). Hard deletes invalidate it; a TTL is the backstop for writes
+that bypass the models. Query semantics match the SQL they replace:
+timestamps without an offset are read as UTC, like the database does.
+
+The index is per process: writes handled by one gunicorn worker don't reach
+another worker's copy, which stays stale until its TTL. It is therefore
+opt-in (DROPCAL_CALENDAR_INDEX=true) and meant for single-worker deploys.
+"""
+
+import logging
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from config.database import CalendarIndexConfig
+from .supabase_client import get_supabase
+
+logger = logging.getLogger(__name__)
+
+
+# Fields returned by surrounding-event / events-on-date queries
+CONTEXT_FIELDS = (
+    'summary', 'start_time', 'end_time', 'start_date', 'end_date',
+    'is_all_day', 'location', 'calendar_name',
+)
+
+# Fields returned by conflict queries
+CONFLICT_FIELDS = ('id', 'summary', 'start_time', 'end_time')
+
+_LOAD_FIELDS = 'id, provider, ' + ', '.join(CONTEXT_FIELDS)
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _to_epoch_us(value: Optional[str]) -> Optional[int]:
+    """Epoch microseconds of an ISO timestamp (naive = UTC), or None."""
+    if not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (ValueError, TypeError, AttributeError):
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return (dt - _EPOCH) // _MICROSECOND
+
+
+class _UserCalendar:
+    """One user's timed events as sorted start-time arrays."""
+
+    def __init__(self):
+        # event_id → (start_us, end_us, is_draft, row)
+        self.records: Dict[str, Tuple[int, Optional[int], bool, Dict[str, Any]]] = {}
+        # Sorted (start_us, event_id) per kind: provider events / DropCal drafts
+        self.entries: Dict[bool, List[Tuple[int, str]]] = {False: [], True: []}
+        # Longest end - start per kind (only grows; a stale max just widens the scan)
+        self.max_duration: Dict[bool, int] = {False: 0, True: 0}
+        self.loaded_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def upsert(self, row: Dict[str, Any]):
+        event_id = str(row['id'])
+        self.remove(event_id)
+        if row.get('deleted_at'):
+            return
+        start_us = _to_epoch_us(row.get('start_time'))
+        if start_us is None:
+            return  # All-day / untimed events aren't part of interval queries
+
+        end_us = _to_epoch_us(row.get('end_time'))
+        is_draft = row.get('provider') == 'dropcal'
+        record = {field: row.get(field) for field in CONTEXT_FIELDS}
+        record['id'] = event_id
+
+        self.records[event_id] = (start_us, end_us, is_draft, record)
+        insort(self.entries[is_draft], (start_us, event_id))
+        if end_us is not None and end_us - start_us > self.max_duration[is_draft]:
+            self.max_duration[is_draft] = end_us - start_us
+
+    def remove(self, event_id: str):
+        record = self.records.pop(event_id, None)
+        if record is None:
+            return
+        entries = self.entries[record[2]]
+        i = bisect_left(entries, (record[0], event_id))
+        if i < len(entries) and entries[i] == (record[0], event_id):
+            del entries[i]
+
+    def overlapping(self, start_us: int, end_us: int) -> List[Dict[str, Any]]:
+        """Provider events and drafts with start < end_us and end > start_us, by start."""
+        hits = []
+        for is_draft, entries in self.entries.items():
+            # Any overlap starts after start_us - max_duration and before end_us
+            lo = bisect_left(entries, (start_us - self.max_duration[is_draft] + 1,))
+            hi = bisect_left(entries, (end_us,))
+            for key in entries[lo:hi]:
+                event_end = self.records[key[1]][1]
+                if event_end is not None and event_end > start_us:
+                    hits.append(key)
+        hits.sort()
+        return [self.records[event_id][3] for _, event_id in hits]
+
+    def nearest(self, target_us: int, n: int) -> List[Dict[str, Any]]:
+        """Up to n provider events before target_us (nearest first), then up to n at/after it."""
+        entries = self.entries[False]
+        i = bisect_left(entries, (target_us,))
+        before = entries[max(0, i - n):i][::-1]
+        after = entries[i:i + n]
+        return [self.records[event_id][3] for _, event_id in before + after]
+
+    def starting_between(self, lo_us: int, hi_us: int, limit: int) -> List[Dict[str, Any]]:
+        """Up to limit provider events with lo_us <= start <= hi_us, by start."""
+        entries = self.entries[False]
+        lo = bisect_left(entries, (lo_us,))
+        hi = min(bisect_left(entries, (hi_us + 1,)), lo + limit)
+        return [self.records[event_id][3] for _, event_id in entries[lo:hi]]
+
+
+class CalendarIndex:
+    """
+    Process-wide store of per-user calendar indexes.
+
+    Example:
+        >>> index = get_calendar_index()
+        >>> index.conflicting(user_id, '2026-02-05T14:00:00-05:00', '2026-02-05T15:00:00-05:00')
+        [{'id': '...', 'summary': 'CS 101', 'start_time': '...', 'end_time': '...'}]
+    """
+
+    def __init__(
+        self,
+        loader: Optional[Callable[[str], List[Dict[str, Any]]]] = None,
+        max_users: Optional[int] = None,
+        ttl_seconds: Optional[float] = None
+    ):
+        """
+        Initialize the calendar index store.
+
+        Args:
+            loader: Returns a user's non-deleted timed events
+                    (default: load_calendar_events from the events table)
+            max_users: Max users kept (default: CalendarIndexConfig.MAX_USERS)
+            ttl_seconds: Reseed a user's index after this long
+                         (default: CalendarIndexConfig.TTL_SECONDS)
+        """
+        self.loader = loader or load_calendar_events
+        self.max_users = max_users if max_users is not None else CalendarIndexConfig.MAX_USERS
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else CalendarIndexConfig.TTL_SECONDS
+
+        self._users: 'OrderedDict[str, _UserCalendar]' = OrderedDict()
+        # user_id → write counter, so a seed that raced a write isn't kept
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.loads = 0
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def conflicting(self, user_id: str, start_time: str, end_time: str) -> List[Dict[str, Any]]:
+        """
+        Events (including drafts) overlapping [start_time, end_time).
+
+        Returns:
+            [{'id', 'summary', 'start_time', 'end_time'}] ordered by start_time
+        """
+        return [
+            {field: conflict[field] for field in CONFLICT_FIELDS}
+            for conflict in self.conflicting_batch(user_id, [(start_time, end_time)])
+        ]
+
+    def conflicting_batch(
+        self,
+        user_id: str,
+        ranges: Sequence[Tuple[str, str]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Events overlapping any of many ranges, tagged with the range index.
+
+        Returns:
+            [{'range_idx', 'id', 'summary', 'start_time', 'end_time'}]
+            ordered by range_idx, then start_time
+        """
+        if not ranges:
+            return []
+        calendar = self._get_or_load(user_id)
+        results = []
+        with self._lock:
+            for range_idx, (start_time, end_time) in enumerate(ranges):
+                start_us, end_us = _to_epoch_us(start_time), _to_epoch_us(end_time)
+                if start_us is None or end_us is None:
+                    continue
+                for record in calendar.overlapping(start_us, end_us):
+                    conflict = {'range_idx': range_idx}
+                    conflict.update((field, record.get(field)) for field in CONFLICT_FIELDS)
+                    results.append(conflict)
+        return results
+
+    def surrounding(self, user_id: str, target_time: str, n: int) -> List[Dict[str, Any]]:
+        """
+        Up to n provider events starting before target_time (nearest first),
+        followed by up to n starting at/after it — the two queries
+        get_surrounding_events merges before trimming by distance.
+        """
+        target_us = _to_epoch_us(target_time)
+        if target_us is None:
+            return []
+        calendar = self._get_or_load(user_id)
+        with self._lock:
+            return [_context_row(r) for r in calendar.nearest(target_us, n)]
+
+    def events_on_date(self, user_id: str, target_date: str, k: int) -> List[Dict[str, Any]]:
+        """Up to k provider events starting between target_date 00:00:00 and 23:59:59 (UTC)."""
+        lo_us = _to_epoch_us(f"{target_date}T00:00:00")
+        hi_us = _to_epoch_us(f"{target_date}T23:59:59")
+        if lo_us is None or hi_us is None:
+            return []
+        calendar = self._get_or_load(user_id)
+        with self._lock:
+            return [_context_row(r) for r in calendar.starting_between(lo_us, hi_us, k)]
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def apply_rows(self, rows: Iterable[Dict[str, Any]]):
+        """
+        Apply event rows returned by a write (insert/update/soft delete).
+
+        Rows without start/end columns (e.g. embedding-only upserts) don't
+        change intervals and are skipped. Users not loaded are left unloaded.
+        """
+        with self._lock:
+            for row in rows:
+                user_id = row.get('user_id') if row else None
+                if not user_id or not row.get('id'):
+                    continue
+                self._versions[user_id] = self._versions.get(user_id, 0) + 1
+                calendar = self._users.get(user_id)
+                if calendar is None:
+                    continue
+                if row.get('deleted_at') or ('start_time' in row and 'end_time' in row):
+                    calendar.upsert(row)
+
+    def remove_events(self, user_id: str, event_ids: Iterable[str]):
+        """Apply hard-deleted events."""
+        with self._lock:
+            self._versions[user_id] = self._versions.get(user_id, 0) + 1
+            calendar = self._users.get(user_id)
+            if calendar is not None:
+                for event_id in event_ids:
+                    calendar.remove(str(event_id))
+
+    def invalidate(self, user_id: str):
+        """Drop a user's index; the next query reseeds it."""
+        with self._lock:
+            self._versions[user_id] = self._versions.get(user_id, 0) + 1
+            self._users.pop(user_id, None)
+
+    def is_loaded(self, user_id: str) -> bool:
+        with self._lock:
+            return user_id in self._users
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index size and hit/load counters."""
+        with self._lock:
+            total = self.hits + self.loads
+            return {
+                'users': len(self._users),
+                'events': sum(len(c) for c in self._users.values()),
+                'hits': self.hits,
+                'loads': self.loads,
+                'hit_rate': self.hits / total if total > 0 else 0.0,
+            }
+
+    def _get_or_load(self, user_id: str) -> _UserCalendar:
+        with self._lock:
+            calendar = self._users.get(user_id)
+            if calendar is not None and time.monotonic() - calendar.loaded_at < self.ttl_seconds:
+                self._users.move_to_end(user_id)
+                self.hits += 1
+                return calendar
+            self.loads += 1
+            version = self._versions.get(user_id, 0)
+
+        calendar = _UserCalendar()
+        for row in self.loader(user_id):
+            if row.get('id'):
+                calendar.upsert(row)
+
+        with self._lock:
+            if self._versions.get(user_id, 0) == version:
+                self._users[user_id] = calendar
+                self._users.move_to_end(user_id)
+                while len(self._users) > self.max_users:
+                    self._users.popitem(last=False)
+        return calendar
+
+
+def _context_row(record: Dict[str, Any]) -> Dict[str, Any]:
+    return {field: record.get(field) for field in CONTEXT_FIELDS}
+
+
+def load_calendar_events(user_id: str) -> List[Dict[str, Any]]:
+    """Fetch all of a user's non-deleted timed events, paged."""
+    page_size = CalendarIndexConfig.LOAD_PAGE_SIZE
+    rows: List[Dict[str, Any]] = []
+    while True:
+        response = get_supabase().table("events")\
+            .select(_LOAD_FIELDS)\
+            .eq("user_id", user_id)\
+            .is_("deleted_at", None)\
+            .not_.is_("start_time", None)\
+            .order("start_time", desc=False)\
+            .order("id", desc=False)\
+            .range(len(rows), len(rows) + page_size - 1).execute()
+        page = response.data or []
+        rows.extend(page)
+        if len(page) < page_size:
+            return rows
+
+
+# Global index instance (lazy loaded)
+_global_index: Optional[CalendarIndex] = None
+_global_index_lock = threading.Lock()
+
+
+def get_calendar_index() -> CalendarIndex:
+    """Get or create the process-wide calendar index (singleton)."""
+    global _global_index
+    if _global_index is None:
+        with _global_index_lock:
+            if _global_index is None:
+                _global_index = CalendarIndex()
+    return _global_index
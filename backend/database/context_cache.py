@@ -0,0 +1,170 @@
+"""
+User Context Cache
+
+Per-user, in-process cache of the context loaded at the start of every
+session: historical events (with embeddings), calendars and timezone. Users
+often upload several files a minute apart; without this each session reloads
+the same rows from Supabase. It also holds each user's expanded recurring
+events (RecurringOccurrenceIndex) for conflict checks.
+
+Entries are invalidated by the writes that change them (Event / Calendar
+model writes, timezone saves, SmartSyncService.sync), with a TTL as a
+backstop. A per-user version guards against caching a load that raced a write.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from config.database import UserContextCacheConfig
+
+logger = logging.getLogger(__name__)
+
+
+HISTORICAL_EVENTS = 'historical_events'
+CALENDARS = 'calendars'
+TIMEZONE = 'timezone'
+RECURRING_OCCURRENCES = 'recurring_occurrences'
+
+ALL_KINDS = (HISTORICAL_EVENTS, CALENDARS, TIMEZONE, RECURRING_OCCURRENCES)
+
+
+class UserContextCache:
+    """
+    Thread-safe LRU of user_id → {kind: (loaded_at, value)}.
+
+    Example:
+        >>> cache = get_user_context_cache()
+        >>> calendars = cache.get(user_id, CALENDARS, lambda: Calendar.get_by_user(user_id))
+        >>> cache.invalidate(user_id, CALENDARS)
+    """
+
+    def __init__(self, max_users: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            max_users: Max users kept (default: UserContextCacheConfig.MAX_USERS)
+            ttl_seconds: Entry lifetime (default: UserContextCacheConfig.TTL_SECONDS)
+        """
+        self.max_users = max_users if max_users is not None else UserContextCacheConfig.MAX_USERS
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else UserContextCacheConfig.TTL_SECONDS
+
+        self._entries: 'OrderedDict[str, Dict[str, Tuple[float, Any]]]' = OrderedDict()
+        # (user_id, kind) → write counter, bumped on invalidate
+        self._versions: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: str, kind: str, loader: Callable[[], Any]) -> Any:
+        """
+        Get a user's cached value of the given kind, loading it on a miss.
+
+        Args:
+            user_id: User UUID
+            kind: HISTORICAL_EVENTS, CALENDARS, TIMEZONE or RECURRING_OCCURRENCES
+            loader: Fetches the value from the database
+
+        Returns:
+            The cached or freshly loaded value (shared — treat as read-only)
+
+        Raises:
+            Exception: Whatever loader raises (nothing is cached)
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id, {}).get(kind)
+            if entry is not None and now - entry[0] < self.ttl_seconds:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            version = self._versions.get((user_id, kind), 0)
+
+        value = loader()
+
+        with self._lock:
+            if self._versions.get((user_id, kind), 0) == version:
+                self._entries.setdefault(user_id, {})[kind] = (now, value)
+                self._entries.move_to_end(user_id)
+                while len(self._entries) > self.max_users:
+                    self._entries.popitem(last=False)
+
+        return value
+
+    def invalidate(self, user_id: str, *kinds: str):
+        """
+        Drop a user's cached context.
+
+        Args:
+            user_id: User UUID
+            *kinds: Kinds to drop (default: all)
+        """
+        kinds = kinds or ALL_KINDS
+        with self._lock:
+            entry = self._entries.get(user_id)
+            for kind in kinds:
+                if entry is not None:
+                    entry.pop(kind, None)
+                self._versions[(user_id, kind)] = self._versions.get((user_id, kind), 0) + 1
+            if entry is not None and not entry:
+                del self._entries[user_id]
+
+    def invalidate_events(self, rows: Iterable[Dict[str, Any]]):
+        """
+        Drop historical events and recurring occurrences for the owners of
+        written event rows.
+
+        DropCal drafts aren't part of the history, so writes to them only
+        drop recurring occurrences (drafts are checked for conflicts too)
+        — otherwise every session would evict its own history.
+        """
+        history_user_ids = set()
+        recurring_user_ids = set()
+        for row in rows:
+            if not row or not row.get('user_id'):
+                continue
+            recurring_user_ids.add(row['user_id'])
+            if row.get('provider') != 'dropcal':
+                history_user_ids.add(row['user_id'])
+        for user_id in recurring_user_ids:
+            if user_id in history_user_ids:
+                self.invalidate(user_id, HISTORICAL_EVENTS, RECURRING_OCCURRENCES)
+            else:
+                self.invalidate(user_id, RECURRING_OCCURRENCES)
+
+    def clear(self):
+        """Drop all cached context."""
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache size and hit/miss counters."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'users': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total > 0 else 0.0,
+            }
+
+
+# Global cache instance (lazy loaded)
+_global_cache: Optional[UserContextCache] = None
+_global_cache_lock = threading.Lock()
+
+
+def get_user_context_cache() -> UserContextCache:
+    """Get or create the process-wide user context cache (singleton)."""
+    global _global_cache
+    if _global_cache is None:
+        with _global_cache_lock:
+            if _global_cache is None:
+                _global_cache = UserContextCache()
+    return _global_cache
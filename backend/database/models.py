@@ -3,12 +3,34 @@ Database models for User and Session operations.
 Provides CRUD operations for Supabase tables.
 """
 
+import logging
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Sequence, Tuple
 from .supabase_client import get_supabase
+from .context_cache import get_user_context_cache, CALENDARS, RECURRING_OCCURRENCES
+from .calendar_index import get_calendar_index
 from auth.encryption import encrypt_token, decrypt_token
 from config.database import QueryLimits
 
+logger = logging.getLogger(__name__)
+
+# RPCs whose fallback has already been logged in this process
+_warned_rpc_fallbacks = set()
+
+
+def _warn_rpc_fallback(name: str, error: Exception):
+    """Log (once per process) that an RPC failed and its slower fallback is in use."""
+    if name not in _warned_rpc_fallbacks:
+        _warned_rpc_fallbacks.add(name)
+        logger.warning(f"RPC {name} failed ({error}); falling back to per-item queries. "
+                       f"Is its supabase migration applied?")
+
+
+def _events_written(rows: List[Dict[str, Any]]):
+    """Propagate written event rows to the user context cache and calendar index."""
+    get_user_context_cache().invalidate_events(rows)
+    get_calendar_index().apply_rows(rows)
+
 
 class User:
     """User model for database operations."""
@@ -1057,7 +1079,7 @@ class Session:
         # Delete uploaded file from Supabase Storage if this was a file-based session
         input_type = session.get('input_type', 'text')
         input_content = session.get('input_content', '')
-        if input_type != 'text' and input_content and '/' in input_content:
+        if input_type not in ('text', 'email') and input_content and '/' in input_content:
             try:
                 from pipeline.input.storage import FileStorage
                 FileStorage.delete_file(input_content)
@@ -1069,6 +1091,9 @@ class Session:
         if event_ids:
             try:
                 supabase.table("events").delete().in_("id", event_ids).execute()
+                if session.get('user_id'):
+                    get_calendar_index().remove_events(session['user_id'], event_ids)
+                    get_user_context_cache().invalidate(session['user_id'], RECURRING_OCCURRENCES)
             except Exception as e:
                 print(f"Warning: Failed to delete events for session {session_id}: {e}")
 
@@ -1275,6 +1300,7 @@ class Event:
             data["recurrence"] = recurrence
 
         response = supabase.table("events").insert(data).execute()
+        _events_written(response.data)
         return response.data[0]
 
     @staticmethod
@@ -1293,8 +1319,41 @@ class Event:
             return []
         supabase = get_supabase()
         response = supabase.table("events").insert(events_data).execute()
+        _events_written(response.data)
         return response.data
 
+    @staticmethod
+    def upsert_batch(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Update multiple existing events in a single upsert query.
+
+        Args:
+            rows: Dicts with 'id' plus the columns to set. Every row must have
+                  the same keys and include the NOT NULL columns (user_id,
+                  provider, summary).
+
+        Returns:
+            List of updated event dicts
+        """
+        if not rows:
+            return []
+        supabase = get_supabase()
+        response = supabase.table("events").upsert(rows, on_conflict="id").execute()
+        _events_written(response.data or [])
+        return response.data or []
+
+    @staticmethod
+    def soft_delete_batch(event_ids: List[str]) -> List[Dict[str, Any]]:
+        """Soft delete multiple events in one UPDATE. Returns the deleted rows."""
+        if not event_ids:
+            return []
+        supabase = get_supabase()
+        response = supabase.table("events").update({
+            "deleted_at": datetime.utcnow().isoformat()
+        }).in_("id", event_ids).execute()
+        _events_written(response.data or [])
+        return response.data or []
+
     @staticmethod
     def update_embeddings_batch(updates: List[Dict[str, Any]]) -> None:
         """
@@ -1307,7 +1366,8 @@ class Event:
         if not updates:
             return
         supabase = get_supabase()
-        supabase.table("events").upsert(updates, on_conflict="id").execute()
+        response = supabase.table("events").upsert(updates, on_conflict="id").execute()
+        _events_written(response.data or [])
 
     @staticmethod
     def get_by_id(event_id: str) -> Optional[Dict[str, Any]]:
@@ -1402,6 +1462,7 @@ class Event:
         response = supabase.table("events").update(updates).eq("id", event_id).execute()
         if not response.data:
             return None
+        _events_written(response.data)
         return response.data[0]
 
     @staticmethod
@@ -1475,6 +1536,7 @@ class Event:
             updates["correction_history"] = correction_history
 
         response = supabase.table("events").update(updates).eq("id", event_id).execute()
+        _events_written(response.data)
         return response.data[0]
 
     @staticmethod
@@ -1486,6 +1548,7 @@ class Event:
         }).eq("id", event_id).execute()
         if not response.data:
             return None
+        _events_written(response.data)
         return response.data[0]
 
     @staticmethod
@@ -1516,6 +1579,58 @@ class Event:
 
         return response.data
 
+    @staticmethod
+    def get_conflicting_events_batch(
+        user_id: str,
+        ranges: Sequence[Tuple[str, str]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Get events conflicting with any of many time ranges, in one query.
+
+        Args:
+            user_id: User's UUID
+            ranges: (start, end) ISO timestamp pairs
+
+        Returns:
+            Conflicting events (id, summary, start_time, end_time), each tagged
+            with the index of the range it overlaps as 'range_idx', ordered by
+            range_idx then start_time. An event overlapping several ranges
+            appears once per range.
+        """
+        if not ranges:
+            return []
+
+        supabase = get_supabase()
+
+        try:
+            response = supabase.rpc('get_conflicting_events_batch', {
+                'p_user_id': user_id,
+                'p_ranges': [
+                    {'idx': idx, 'start': start_time, 'end': end_time}
+                    for idx, (start_time, end_time) in enumerate(ranges)
+                ]
+            }).execute()
+            return response.data or []
+        except Exception as e:
+            # RPC not yet deployed — fall back to one query per range
+            _warn_rpc_fallback('get_conflicting_events_batch', e)
+
+        conflicts = []
+        for idx, (start_time, end_time) in enumerate(ranges):
+            rows = Event.get_conflicting_events(user_id, start_time, end_time) or []
+            rows = sorted(rows, key=lambda r: (r.get('start_time') or '', str(r.get('id'))))
+            conflicts.extend(
+                {
+                    'range_idx': idx,
+                    'id': r.get('id'),
+                    'summary': r.get('summary'),
+                    'start_time': r.get('start_time'),
+                    'end_time': r.get('end_time'),
+                }
+                for r in rows
+            )
+        return conflicts
+
     @staticmethod
     def get_recurring_events(user_id: str) -> List[Dict[str, Any]]:
         """
@@ -1564,6 +1679,41 @@ class Event:
 
         return response.data
 
+    @staticmethod
+    def get_by_provider_event_ids(
+        user_id: str,
+        provider: str,
+        provider_event_ids: Sequence[str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Get live events for many provider event IDs (one `in_` query per chunk).
+
+        Args:
+            user_id: User's UUID
+            provider: Provider name ('google', 'microsoft', etc.)
+            provider_event_ids: Provider's event IDs
+
+        Returns:
+            Dict of provider_event_id → {'id', 'provider_event_id'} for the
+            IDs that have a non-deleted row
+        """
+        ids = list(dict.fromkeys(provider_event_ids))
+        if not ids:
+            return {}
+        supabase = get_supabase()
+        chunk = QueryLimits.PROVIDER_EVENT_LOOKUP_CHUNK
+
+        existing = {}
+        for i in range(0, len(ids), chunk):
+            response = supabase.table("events").select("id, provider_event_id")\
+                .eq("user_id", user_id)\
+                .eq("provider", provider)\
+                .in_("provider_event_id", ids[i:i + chunk])\
+                .is_("deleted_at", None).execute()
+            for row in response.data or []:
+                existing.setdefault(row['provider_event_id'], row)
+        return existing
+
     @staticmethod
     def get_by_provider_event_id(
         user_id: str,
@@ -1709,6 +1859,7 @@ class Calendar:
         response = supabase.table("calendars").upsert(
             data, on_conflict="user_id,provider_cal_id"
         ).execute()
+        get_user_context_cache().invalidate(user_id, CALENDARS)
         return response.data[0]
 
     @staticmethod
@@ -1743,6 +1894,7 @@ class Calendar:
             "updated_at": datetime.utcnow().isoformat(),
         }).eq("user_id", user_id)\
           .eq("provider_cal_id", provider_cal_id).execute()
+        get_user_context_cache().invalidate(user_id, CALENDARS)
         return response.data[0] if response.data else None
 
     @staticmethod
@@ -1752,6 +1904,7 @@ class Calendar:
         response = supabase.table("calendars").delete()\
             .eq("user_id", user_id)\
             .eq("provider_cal_id", provider_cal_id).execute()
+        get_user_context_cache().invalidate(user_id, CALENDARS)
         return len(response.data) > 0
 
     @staticmethod
@@ -1760,4 +1913,5 @@ class Calendar:
         supabase = get_supabase()
         response = supabase.table("calendars").delete()\
             .eq("user_id", user_id).execute()
+        get_user_context_cache().invalidate(user_id, CALENDARS)
         return len(response.data)
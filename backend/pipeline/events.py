@@ -3,14 +3,15 @@ Event Service - Manages unified event storage and operations.
 Handles both DropCal-created events and provider-synced events.
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
 import numpy as np
 
 import logging
 from database.models import Event, Session
+from database.calendar_index import get_calendar_index
 from pipeline.personalization.similarity import compute_embedding, compute_embeddings_batch
-from config.database import QueryLimits
+from config.database import QueryLimits, CalendarIndexConfig
 
 logger = logging.getLogger(__name__)
 
@@ -395,32 +396,44 @@ class EventService:
         events_data: List[Dict[str, Any]]
     ) -> List[Dict[str, Any]]:
         """
-        Bulk create provider events (for initial sync).
+        Bulk create provider events in a single batch INSERT (for sync).
 
+        Rows match what create_provider_event would insert one at a time.
         Embeddings computed later by background job for performance.
 
         Args:
             user_id: User's UUID
             provider: Provider name
             provider_account_id: Provider account
-            events_data: List of event dicts to create
+            events_data: List of event dicts to create (provider_event_id,
+                         summary and the create_provider_event fields)
 
         Returns:
-            List of created events
+            List of created events, in the same order as events_data
         """
-        created_events = []
-
-        for event_data in events_data:
-            event = EventService.create_provider_event(
-                user_id=user_id,
-                provider=provider,
-                provider_account_id=provider_account_id,
-                compute_embedding_now=False,  # Async for bulk
-                **event_data
-            )
-            created_events.append(event)
+        if not events_data:
+            return []
 
-        return created_events
+        rows = []
+        for data in events_data:
+            row = {
+                "user_id": user_id,
+                "provider": provider,
+                "provider_account_id": provider_account_id or None,
+                "summary": data.get('summary'),
+                "is_all_day": data.get('is_all_day', False),
+                "is_draft": False,  # Provider events are never drafts
+            }
+            # A multi-row INSERT needs the same keys on every row, so optional
+            # fields Event.create would omit are sent as NULL instead
+            for key in (
+                'provider_event_id', 'start_time', 'end_time', 'start_date', 'end_date',
+                'description', 'location', 'timezone', 'calendar_name',
+            ):
+                row[key] = data.get(key) or None
+            rows.append(row)
+
+        return Event.create_batch(rows)
 
     @staticmethod
     def get_historical_events(
@@ -489,11 +502,16 @@ class EventService:
             Each dict contains: summary, start_time, end_time, start_date,
             end_date, is_all_day, location, calendar_name.
         """
+        half_k = max(k, 2)  # fetch more than needed, trim later
+
+        if CalendarIndexConfig.ENABLED:
+            all_events = get_calendar_index().surrounding(user_id, target_time, half_k)
+            return EventService._nearest_by_start_time(all_events, target_time, k)
+
         from database.supabase_client import get_supabase
         supabase = get_supabase()
 
         fields = "summary, start_time, end_time, start_date, end_date, is_all_day, location, calendar_name"
-        half_k = max(k, 2)  # fetch more than needed, trim later
 
         # Events before target_time
         before = supabase.table("events").select(fields)\
@@ -517,10 +535,19 @@ class EventService:
 
         # Merge and sort by absolute distance from target_time
         all_events = (before.data or []) + (after.data or [])
+        return EventService._nearest_by_start_time(all_events, target_time, k)
 
+    @staticmethod
+    def _nearest_by_start_time(
+        events: List[Dict[str, Any]],
+        target_time: str,
+        k: int
+    ) -> List[Dict[str, Any]]:
+        """Sort events by absolute distance of start_time from target_time and keep k."""
         try:
             target_dt = datetime.fromisoformat(target_time)
-            all_events.sort(
+            events = sorted(
+                events,
                 key=lambda e: abs(
                     (datetime.fromisoformat(e['start_time']) - target_dt).total_seconds()
                 )
@@ -528,7 +555,7 @@ class EventService:
         except (ValueError, TypeError):
             pass
 
-        return all_events[:k]
+        return events[:k]
 
     @staticmethod
     def get_events_on_date(
@@ -550,6 +577,9 @@ class EventService:
         Returns:
             List of event dicts sorted by start_time.
         """
+        if CalendarIndexConfig.ENABLED:
+            return get_calendar_index().events_on_date(user_id, target_date, k)
+
         from database.supabase_client import get_supabase
         supabase = get_supabase()
 
@@ -581,8 +611,9 @@ class EventService:
         Find locations from the user's event history similar to query_location.
 
         Uses fuzzy string matching (difflib.SequenceMatcher) against distinct
-        locations from the user's calendar history. Returns matches with
-        frequency counts and context.
+        locations from the user's calendar history, via the per-user location
+        gazetteer (character n-gram index, kept current by calendar sync). Returns
+        matches with frequency counts and context.
 
         Args:
             user_id: User's UUID
@@ -594,61 +625,94 @@ class EventService:
             [{'location': str, 'match_score': float, 'count': int,
               'last_used_with': str, 'calendar': str}]
         """
-        from database.supabase_client import get_supabase
-        from difflib import SequenceMatcher
-        from collections import defaultdict
+        from pipeline.personalization.location_gazetteer import get_location_gazetteer
+        return get_location_gazetteer().search(user_id, query_location, limit)
 
-        supabase = get_supabase()
+    @staticmethod
+    def get_personalization_context_bundle(
+        user_id: str,
+        targets: List[Dict[str, Optional[str]]],
+        k: int = QueryLimits.SURROUNDING_EVENTS_LIMIT
+    ) -> Dict[int, Dict[str, List[Dict[str, Any]]]]:
+        """
+        Fetch surrounding events for a whole session in one RPC, plus location matches.
 
-        # Fetch events with non-null locations
-        response = supabase.table("events")\
-            .select("location, summary, calendar_name, start_time")\
-            .eq("user_id", user_id)\
-            .neq("provider", "dropcal")\
-            .is_("deleted_at", None)\
-            .not_.is_("location", None)\
-            .order("start_time", desc=True)\
-            .limit(QueryLimits.LOCATION_HISTORY_FETCH_LIMIT).execute()
+        Batched equivalent of calling get_surrounding_events /
+        get_events_on_date and search_location_history per event. Location
+        matches come from the in-memory location gazetteer; with the calendar
+        index enabled, surrounding events are served in-process (no RPC).
 
-        if not response.data:
-            return []
+        Args:
+            user_id: User's UUID
+            targets: One dict per event (list position = event index) with
+                     optional 'target_time' (ISO datetime), 'target_date'
+                     (YYYY-MM-DD, used when there is no target_time) and
+                     'location' (query for location matching)
+            k: Surrounding events per event
 
-        # Group by location (case-insensitive), track count and most recent usage
-        location_data = defaultdict(lambda: {
-            'count': 0,
-            'canonical': '',
-            'last_used_with': '',
-            'calendar': ''
-        })
-
-        for event in response.data:
-            loc = event['location']
-            key = loc.lower().strip()
-            data = location_data[key]
-            data['count'] += 1
-            # Keep the most recent occurrence's details (results are ordered desc)
-            if not data['canonical']:
-                data['canonical'] = loc
-                data['last_used_with'] = event.get('summary', '')
-                data['calendar'] = event.get('calendar_name', '')
-
-        # Score each unique location against query
-        query_lower = query_location.lower().strip()
-        results = []
-        for key, data in location_data.items():
-            score = SequenceMatcher(None, query_lower, key).ratio()
-            if score >= 0.3:
-                results.append({
-                    'location': data['canonical'],
-                    'match_score': round(score, 2),
-                    'count': data['count'],
-                    'last_used_with': data['last_used_with'],
-                    'calendar': data['calendar'],
-                })
+        Returns:
+            {event_index: {'surrounding_events': [...], 'location_matches': [...]}}
+            for every index in targets
+
+        Raises:
+            Exception: If the RPC fails (e.g. function not deployed)
+        """
+        if CalendarIndexConfig.ENABLED:
+            surrounding = {}
+            for i, target in enumerate(targets):
+                if target.get('target_time'):
+                    surrounding[str(i)] = get_calendar_index().surrounding(
+                        user_id, target['target_time'], max(k, 2)
+                    )
+                elif target.get('target_date'):
+                    surrounding[str(i)] = get_calendar_index().events_on_date(
+                        user_id, target['target_date'], k
+                    )
+        else:
+            surrounding = EventService._fetch_context_bundle(user_id, targets, k)
+
+        bundle = {}
+        for i, target in enumerate(targets):
+            rows = surrounding.get(str(i)) or []
+            if target.get('target_time'):
+                # Same trim as get_surrounding_events: k nearest by distance
+                rows = EventService._nearest_by_start_time(rows, target['target_time'], k)
+
+            location = (target.get('location') or '').strip()
+            bundle[i] = {
+                'surrounding_events': rows,
+                'location_matches': (
+                    EventService.search_location_history(user_id, location)
+                    if location else []
+                ),
+            }
+
+        return bundle
+
+    @staticmethod
+    def _fetch_context_bundle(
+        user_id: str,
+        targets: List[Dict[str, Optional[str]]],
+        k: int
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Surrounding events per target index from the get_personalization_context_bundle RPC."""
+        from database.supabase_client import get_supabase
+        supabase = get_supabase()
+
+        rpc_targets = [
+            {'idx': i, 'target_time': t.get('target_time'), 'target_date': t.get('target_date')}
+            for i, t in enumerate(targets)
+            if t.get('target_time') or t.get('target_date')
+        ]
+        response = supabase.rpc('get_personalization_context_bundle', {
+            'p_user_id': user_id,
+            'p_targets': rpc_targets,
+            'p_k': k,
+            'p_include_locations': False,  # Served by the location gazetteer
+        }).execute()
 
-        # Sort by score descending, then by count descending
-        results.sort(key=lambda r: (-r['match_score'], -r['count']))
-        return results[:limit]
+        data = response.data or {}
+        return data.get('surrounding') or {}
 
     @staticmethod
     def find_similar_events(
@@ -973,8 +1037,29 @@ class EventService:
         Returns:
             List of conflicting events
         """
+        if CalendarIndexConfig.ENABLED:
+            return get_calendar_index().conflicting(user_id, start_time, end_time)
         return Event.get_conflicting_events(user_id, start_time, end_time)
 
+    @staticmethod
+    def get_conflicting_events_batch(
+        user_id: str,
+        ranges: List[Tuple[str, str]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Get events that conflict with any of many time ranges (one RPC).
+
+        Args:
+            user_id: User's UUID
+            ranges: (start, end) ISO timestamp pairs
+
+        Returns:
+            Conflicting events tagged with 'range_idx' (index into ranges)
+        """
+        if CalendarIndexConfig.ENABLED:
+            return get_calendar_index().conflicting_batch(user_id, ranges)
+        return Event.get_conflicting_events_batch(user_id, ranges)
+
     @staticmethod
     def get_user_corrections(user_id: str) -> List[Dict[str, Any]]:
         """
@@ -1,12 +1,12 @@
 import os
 import hmac
 import logging
-import threading
 
 from flask import Blueprint, jsonify, request, current_app
 
 from database.models import User, Session as DBSession
 from pipeline.input.email.parser import build_email_text
+from pipeline.scheduler import get_session_scheduler, SchedulerSaturated, EMAIL
 
 logger = logging.getLogger(__name__)
 
@@ -92,20 +92,32 @@ def receive_inbound_email():
             'reason': 'Empty email content'
         }), 200
 
-    # 6. Create session and process
+    # 6. Create session and queue processing (429 lets the worker retry later)
     session_processor = current_app.session_processor
+    scheduler = get_session_scheduler()
+    try:
+        scheduler.check_admission(user_id, lane=EMAIL)
+    except SchedulerSaturated as e:
+        logger.warning(f"Session queue full, deferring inbound email for user {user_id}: {e}")
+        return jsonify({'error': 'Busy, retry later'}), 429, {'Retry-After': str(e.retry_after)}
+
     session = DBSession.create(
         user_id=user_id,
         input_type='email',
         input_content=email_text
     )
 
-    thread = threading.Thread(
-        target=session_processor.process_text_session,
-        args=(session['id'], email_text)
-    )
-    thread.daemon = True
-    thread.start()
+    try:
+        scheduler.submit(
+            session['id'], user_id, session_processor.process_text_session,
+            session['id'], email_text, lane=EMAIL
+        )
+    except SchedulerSaturated as e:
+        # Lost the admission race: the provider retries the email, so don't
+        # leave an error session behind for a message that will succeed later
+        DBSession.delete(session['id'])
+        logger.warning(f"Session queue full, deferring inbound email for user {user_id}: {e}")
+        return jsonify({'error': 'Busy, retry later'}), 429, {'Retry-After': str(e.retry_after)}
 
     logger.info(f"Inbound email session created: {session['id']} for user {user_id}")
 
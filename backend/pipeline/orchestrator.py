@@ -5,20 +5,26 @@ Pipeline: EXTRACT (1 LLM call) → RESOLVE (0 LLM, Duckling) → PERSONALIZE (0-
 """
 
 from typing import Optional
-from concurrent.futures import ThreadPoolExecutor
 import os
 import logging
 import threading
 import traceback
 from database.models import Session as DBSession, Event
+from database.context_cache import (
+    get_user_context_cache, HISTORICAL_EVENTS, CALENDARS, TIMEZONE
+)
 from pipeline.input.factory import InputProcessorFactory, InputType
 from pipeline.extraction.extract import UnifiedExtractor
-from pipeline.resolution.temporal_resolver import resolve_temporal
+from pipeline.resolution.temporal_resolver import (
+    resolve_temporal_batch, get_duckling_cache_stats, get_duckling_latency_stats,
+)
+from pipeline.resolution.fast_parser import get_fast_path_stats
 from pipeline.personalization.agent import PersonalizationAgent
 from pipeline.extraction.icon_selector import get_icon_selector
 from pipeline.events import EventService
 from pipeline.personalization.service import PersonalizationService
 from pipeline.stream import get_stream
+from pipeline.scheduler import submit_maintenance
 from config.posthog import (
     set_tracking_context, flush_posthog, capture_agent_error,
     capture_pipeline_trace, stage_span,
@@ -205,16 +211,28 @@ class SessionProcessor:
             return ''
 
     def _get_user_timezone(self, user_id: str) -> str:
-        """Get user's timezone from profile, default to America/New_York."""
-        try:
+        """Get user's timezone from profile (cached), default to America/New_York."""
+        def _load():
             from database.models import User
             user = User.get_by_id(user_id)
-            if user and user.get('timezone'):
-                return user['timezone']
+            return user.get('timezone') if user else None
+
+        try:
+            timezone = get_user_context_cache().get(user_id, TIMEZONE, _load)
+            if timezone:
+                return timezone
         except Exception as e:
             logger.warning(f"Could not fetch user timezone: {e}")
         return 'America/New_York'
 
+    @staticmethod
+    def _get_user_calendars(user_id: str) -> list:
+        """Get user's calendars (cached until a calendar write or TTL)."""
+        from database.models import Calendar
+        return get_user_context_cache().get(
+            user_id, CALENDARS, lambda: Calendar.get_by_user(user_id)
+        )
+
     def _select_and_update_icon(self, session_id: str, text: str) -> None:
         """Select icon asynchronously (runs in background thread)."""
         try:
@@ -283,9 +301,12 @@ class SessionProcessor:
                 self.pattern_refresh_service.maybe_refresh(user_id)
 
             from config.database import QueryLimits
-            historical_events = EventService.get_historical_events_with_embeddings(
-                user_id=user_id,
-                limit=QueryLimits.PERSONALIZATION_HISTORICAL_LIMIT
+            historical_events = get_user_context_cache().get(
+                user_id, HISTORICAL_EVENTS,
+                lambda: EventService.get_historical_events_with_embeddings(
+                    user_id=user_id,
+                    limit=QueryLimits.PERSONALIZATION_HISTORICAL_LIMIT
+                )
             )
             return patterns, historical_events
         except Exception as e:
@@ -429,13 +450,12 @@ class SessionProcessor:
                         context_result['patterns'] = p
                         context_result['historical_events'] = h
                         if p is not None:
-                            self.personalize_agent.build_similarity_index(h)
+                            self.personalize_agent.build_similarity_index(h, user_id)
 
                         tz_result['timezone'] = self._get_user_timezone(user_id)
 
                         try:
-                            from database.models import Calendar
-                            cals = Calendar.get_by_user(user_id)
+                            cals = self._get_user_calendars(user_id)
                             cal_lookup = {}
                             primary_cal = None
                             for cal in cals:
@@ -528,31 +548,19 @@ class SessionProcessor:
             t_resolve = _time.time()
             with stage_span("resolution"):
                 calendar_events = []
-
-                def _resolve_one(extracted):
-                    return resolve_temporal(extracted, user_timezone=timezone)
-
                 failed_events = []
-                with ThreadPoolExecutor(max_workers=min(len(extracted_events), 8)) as pool:
-                    future_to_idx = {
-                        pool.submit(_resolve_one, ext): i
-                        for i, ext in enumerate(extracted_events)
-                    }
-                    # Collect results preserving original order
-                    ordered_results = {}
-                    for future in future_to_idx:
-                        idx = future_to_idx[future]
-                        try:
-                            ordered_results[idx] = future.result()
-                        except Exception as e:
-                            failed_summary = extracted_events[idx].summary
-                            failed_events.append(failed_summary)
-                            logger.warning(
-                                f"Temporal resolution failed for '{failed_summary}': {e}"
-                            )
 
-                    for i in sorted(ordered_results):
-                        calendar_events.append(ordered_results[i])
+                # Every date/time string in the session is parsed in one
+                # batched Duckling pass, then events resolve without I/O
+                resolved = resolve_temporal_batch(extracted_events, user_timezone=timezone)
+                for extracted, result in zip(extracted_events, resolved):
+                    if isinstance(result, Exception):
+                        failed_events.append(extracted.summary)
+                        logger.warning(
+                            f"Temporal resolution failed for '{extracted.summary}': {result}"
+                        )
+                    else:
+                        calendar_events.append(result)
 
                 if failed_events:
                     logger.warning(
@@ -560,7 +568,16 @@ class SessionProcessor:
                         f"due to temporal resolution failures: {failed_events}"
                     )
 
-            logger.info(f"[timing] resolve: {_time.time() - t_resolve:.2f}s")
+            duckling_stats = get_duckling_cache_stats()
+            fast_path_stats = get_fast_path_stats()
+            duckling_latency = get_duckling_latency_stats()
+            logger.info(
+                f"[timing] resolve: {_time.time() - t_resolve:.2f}s "
+                f"(fast path hit rate {fast_path_stats['hit_rate']:.0%}, "
+                f"duckling cache hit rate {duckling_stats['hit_rate']:.0%}, "
+                f"{duckling_stats['misses']} calls total, "
+                f"duckling p50/p95 {duckling_latency['p50_ms']:.0f}/{duckling_latency['p95_ms']:.0f}ms)"
+            )
             self._check_timed_out(session_id)
 
             if not calendar_events:
@@ -684,12 +701,11 @@ class SessionProcessor:
             # Embeddings are only needed for future similarity search,
             # not for the current session. Compute after signaling done.
             if created_events:
-                embed_thread = threading.Thread(
-                    target=EventService.compute_embeddings_background,
-                    args=(created_events, events_data),
-                    daemon=True,
+                submit_maintenance(
+                    f"embeddings-{session_id}", user_id,
+                    EventService.compute_embeddings_background,
+                    created_events, events_data
                 )
-                embed_thread.start()
 
         except Exception as e:
             error_message = str(e)
@@ -771,13 +787,12 @@ class SessionProcessor:
                     context_result['patterns'] = p
                     context_result['historical_events'] = h
                     if p is not None:
-                        self.personalize_agent.build_similarity_index(h)
+                        self.personalize_agent.build_similarity_index(h, user_id)
 
                     tz_result['timezone'] = self._get_user_timezone(user_id)
 
                     try:
-                        from database.models import Calendar
-                        cals = Calendar.get_by_user(user_id)
+                        cals = self._get_user_calendars(user_id)
                         cal_lookup = {}
                         primary_cal = None
                         for cal in cals:
@@ -31,7 +31,7 @@ from pydantic import BaseModel, create_model, Field as PydanticField
 from pipeline.base_agent import BaseAgent
 from pipeline.prompt_loader import load_prompt
 from pipeline.models import CalendarEvent, CalendarDateTime
-from pipeline.personalization.similarity import ProductionSimilaritySearch
+from pipeline.personalization.similarity import ProductionSimilaritySearch, get_index_store
 from config.posthog import capture_llm_generation
 
 
@@ -49,6 +49,9 @@ class TimeInferenceOutput(BaseModel):
 
 logger = logging.getLogger(__name__)
 
+# Whether the context bundle fallback has been logged in this process
+_bundle_fallback_logged = False
+
 
 # Task registry — each task maps to a description file, output field type, and merge target.
 # Only tasks in the batch's union get included in the prompt and output model.
@@ -100,17 +103,35 @@ class PersonalizationAgent(BaseAgent):
     def __init__(self, llm: ChatAnthropic):
         super().__init__("Personalize")
         self.llm = llm
-        self.similarity_search = None
+        # Per-user indexes live in the shared store — this agent is shared across users
+        self.index_store = get_index_store()
 
     def execute(self, *args, **kwargs):
         """Delegate to execute_batch — personalization is batch-only."""
         return self.execute_batch(*args, **kwargs)
 
-    def build_similarity_index(self, historical_events: Optional[List[Dict]] = None):
-        """Pre-build the similarity search index (call before execute_batch)."""
-        if historical_events and len(historical_events) >= 3 and self.similarity_search is None:
-            self.similarity_search = ProductionSimilaritySearch()
-            self.similarity_search.build_index(historical_events)
+    def build_similarity_index(
+        self,
+        historical_events: Optional[List[Dict]] = None,
+        user_id: Optional[str] = None,
+    ):
+        """Pre-build (or warm) the user's similarity search index (call before execute_batch)."""
+        self._get_similarity_search(historical_events, user_id)
+
+    def _get_similarity_search(
+        self,
+        historical_events: Optional[List[Dict]],
+        user_id: Optional[str],
+    ) -> Optional[ProductionSimilaritySearch]:
+        """Return a built search index for this user's history, reusing a warm one if stored."""
+        if not historical_events or len(historical_events) < 3:
+            return None
+        if user_id:
+            return self.index_store.get_or_build(user_id, historical_events)
+        # No user to key on — build a one-off index
+        search = ProductionSimilaritySearch()
+        search.build_index(historical_events)
+        return search
 
     def execute_batch(
         self,
@@ -321,11 +342,24 @@ class PersonalizationAgent(BaseAgent):
         # Batch-fetch corrections: 1 DB query + 1 batch encode instead of N of each
         per_event_corrections = self._batch_query_corrections(events, user_id)
 
+        # Resolve the user's index once (warm from the store when possible), then
+        # search all events together: 1 batch encode + 1 multi-row search
+        similarity_search = self._get_similarity_search(historical_events, user_id)
+        per_event_similar = self._find_similar_events(events, similarity_search, k=k_per_event)
+
+        # Surrounding events + location history for all events in one RPC
+        # (None → fall back to per-event queries)
+        bundle = self._fetch_context_bundle(events, user_id)
+
         def _fetch_context(i, event):
-            similar = self._find_similar_events(event, historical_events, k=k_per_event)
+            similar = per_event_similar[i]
             duration_stats = self._compute_duration_stats(similar)
-            surrounding = self._fetch_surrounding_events(event, user_id)
-            location_matches = self._fetch_location_history(event, user_id)
+            if bundle is not None:
+                surrounding = bundle[i]['surrounding_events']
+                location_matches = bundle[i]['location_matches']
+            else:
+                surrounding = self._fetch_surrounding_events(event, user_id)
+                location_matches = self._fetch_location_history(event, user_id)
             corrections = per_event_corrections[i]
             location_corrections = self._extract_location_corrections(corrections)
             return i, {
@@ -599,46 +633,47 @@ class PersonalizationAgent(BaseAgent):
 
     def _find_similar_events(
         self,
-        event: CalendarEvent,
-        historical_events: Optional[List[Dict]] = None,
+        events: List[CalendarEvent],
+        similarity_search: Optional[ProductionSimilaritySearch] = None,
         k: int = 7,
-    ) -> List[Dict]:
+    ) -> List[List[Dict]]:
         """
         Find similar historical events and include temporal data for duration inference.
 
         Args:
-            event: CalendarEvent to find similar events for
-            historical_events: User's historical events
-            k: Number of similar events to return
+            events: CalendarEvents to find similar events for
+            similarity_search: User's built search index (None if too little history)
+            k: Number of similar events to return per event
 
-        Returns list of dicts for display builders (not a formatted string).
+        Returns one list of dicts per event for display builders (not a formatted string).
         """
-        if not historical_events or len(historical_events) < 3:
-            return []
-
-        # Build similarity index if not already built (reused across events in session)
-        if self.similarity_search is None:
-            self.similarity_search = ProductionSimilaritySearch()
-            self.similarity_search.build_index(historical_events)
-
-        query_event = {
-            'title': event.summary or '',
-            'all_day': event.start.date is not None,
-            'calendar_name': event.calendar or 'Default'
-        }
+        if similarity_search is None or not events:
+            return [[] for _ in events]
+
+        query_events = [
+            {
+                'title': event.summary or '',
+                'all_day': event.start.date is not None,
+                'calendar_name': event.calendar or 'Default'
+            }
+            for event in events
+        ]
 
         try:
-            similar = self.similarity_search.find_similar_with_diversity(
-                query_event,
+            per_event_similar = similarity_search.find_similar_batch(
+                query_events,
                 k=k,
                 diversity_threshold=0.85
             )
-        except Exception:
-            return []
+        except Exception as e:
+            logger.warning(f"Similar event search failed: {e}")
+            return [[] for _ in events]
 
-        if not similar:
-            return []
+        return [self._format_similar_events(similar) for similar in per_event_similar]
 
+    @staticmethod
+    def _format_similar_events(similar: List) -> List[Dict]:
+        """Convert (event, score, breakdown) search results into display dicts."""
         results = []
         for evt, score, breakdown in similar:
             entry = {
@@ -689,6 +724,39 @@ class PersonalizationAgent(BaseAgent):
     # External data fetchers
     # =========================================================================
 
+    def _fetch_context_bundle(
+        self,
+        events: List[CalendarEvent],
+        user_id: Optional[str]
+    ) -> Optional[Dict[int, Dict[str, List[Dict]]]]:
+        """Fetch surrounding events and location matches for all events in one round trip.
+
+        Returns {event_index: {'surrounding_events', 'location_matches'}}, or
+        None if the batched RPC is unavailable.
+        """
+        if not user_id:
+            return None
+
+        targets = [
+            {
+                'target_time': event.start.dateTime,
+                'target_date': event.start.date if not event.start.dateTime else None,
+                'location': event.location,
+            }
+            for event in events
+        ]
+
+        try:
+            from pipeline.events import EventService
+            return EventService.get_personalization_context_bundle(user_id, targets)
+        except Exception as e:
+            global _bundle_fallback_logged
+            if not _bundle_fallback_logged:
+                _bundle_fallback_logged = True
+                logger.warning(f"Context bundle RPC unavailable, using per-event queries "
+                               f"(is its supabase migration applied?): {e}")
+            return None
+
     def _fetch_surrounding_events(
         self,
         event: CalendarEvent,
@@ -754,41 +822,26 @@ class PersonalizationAgent(BaseAgent):
         """
         Fetch corrections once, batch-embed all events, rank per-event.
 
-        Single DB fetch + single batched encode instead of N individual
-        instantiations, queries, and encode calls.
+        Corrections and their embedding matrix come from a per-user cache
+        (refetched only after a new correction is stored), plus a single
+        batched encode instead of N individual queries and encode calls.
         """
         empty = [[] for _ in events]
         if not user_id:
             return empty
 
-        # 1. Single DB fetch for all user corrections
+        # 1. User's corrections + normalized embedding matrix (cached per user)
         try:
-            from database.supabase_client import get_supabase
-            supabase = get_supabase()
-            result = supabase.table('event_corrections').select('*').eq('user_id', user_id).execute()
-            corrections = result.data
+            from pipeline.personalization.corrections.matrix_cache import get_correction_matrix_cache
+            valid_corrections, stored_matrix = get_correction_matrix_cache().get(user_id)
         except Exception as e:
             logger.warning(f"Failed to fetch corrections: {e}")
             return empty
 
-        if not corrections:
-            return empty
-
-        # 2. Filter corrections that have stored embeddings
-        valid_corrections = []
-        stored_embeddings = []
-        for c in corrections:
-            emb = c.get('facts_embedding', [])
-            if emb:
-                valid_corrections.append(c)
-                stored_embeddings.append(emb)
-
         if not valid_corrections:
             return empty
 
-        stored_matrix = np.array(stored_embeddings)  # (num_corrections, dim)
-
-        # 3. Batch-embed all events using the global singleton model
+        # 2. Batch-embed all events using the global singleton model
         from pipeline.personalization.similarity.service import get_embedding_model
         model = get_embedding_model()
 
@@ -799,12 +852,16 @@ class PersonalizationAgent(BaseAgent):
             normalize_embeddings=True,
         )  # (num_events, dim)
 
-        # 4. Similarity matrix + per-event top-k ranking
+        # 3. Similarity matrix + per-event top-k ranking
         similarity_matrix = event_embeddings @ stored_matrix.T  # (num_events, num_corrections)
 
         per_event_results = []
+        top_k = min(k, len(valid_corrections))
         for i in range(len(events)):
-            top_indices = np.argsort(similarity_matrix[i])[::-1][:k]
+            row = similarity_matrix[i]
+            # Top-k in O(n), then order just those k
+            top_indices = np.argpartition(-row, top_k - 1)[:top_k]
+            top_indices = top_indices[np.argsort(-row[top_indices])]
             per_event_results.append([valid_corrections[idx] for idx in top_indices])
 
         return per_event_results
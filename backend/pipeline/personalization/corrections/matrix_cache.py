@@ -0,0 +1,165 @@
+"""
+Correction Matrix Cache
+
+Per-user cache of a user's corrections plus their normalized facts-embedding
+matrix, so personalization doesn't re-fetch and re-decode every correction on
+every upload. Corrections change rarely: entries are invalidated when
+CorrectionStorageService stores a new row, with a TTL as a backstop.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config.similarity import CorrectionCacheConfig
+
+logger = logging.getLogger(__name__)
+
+
+# Only the columns personalization reads (prompt context + location corrections)
+CORRECTION_COLUMNS = (
+    'id, extracted_facts, system_suggestion, user_final, fields_changed, '
+    'title_change, calendar_change, time_change, facts_embedding'
+)
+
+
+class CorrectionMatrixCache:
+    """
+    Thread-safe LRU of user_id → (corrections, normalized embedding matrix).
+
+    Example:
+        >>> cache = get_correction_matrix_cache()
+        >>> corrections, matrix = cache.get(user_id)
+        >>> scores = event_embeddings @ matrix.T
+    """
+
+    def __init__(self, max_users: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            max_users: Max users kept (default: CorrectionCacheConfig.MAX_USERS)
+            ttl_seconds: Entry lifetime (default: CorrectionCacheConfig.TTL_SECONDS)
+        """
+        self.max_users = max_users if max_users is not None else CorrectionCacheConfig.MAX_USERS
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else CorrectionCacheConfig.TTL_SECONDS
+
+        # user_id → (loaded_at, corrections, matrix)
+        self._entries: 'OrderedDict[str, Tuple[float, List[Dict], np.ndarray]]' = OrderedDict()
+        # Bumped on invalidate so a load that raced a new correction isn't cached
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: str) -> Tuple[List[Dict], np.ndarray]:
+        """
+        Get a user's corrections that have embeddings, and their embedding matrix.
+
+        Args:
+            user_id: User UUID
+
+        Returns:
+            Tuple of (corrections, matrix) where matrix is (len(corrections), dim)
+            float32 with L2-normalized rows. Empty list / (0, 0) matrix if none.
+
+        Raises:
+            Exception: If the database fetch fails (nothing is cached)
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and now - entry[0] < self.ttl_seconds:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[1], entry[2]
+            self.misses += 1
+            version = self._versions.get(user_id, 0)
+
+        corrections, matrix = self._load(user_id)
+
+        with self._lock:
+            if self._versions.get(user_id, 0) == version:
+                self._entries[user_id] = (now, corrections, matrix)
+                self._entries.move_to_end(user_id)
+                while len(self._entries) > self.max_users:
+                    self._entries.popitem(last=False)
+
+        return corrections, matrix
+
+    def invalidate(self, user_id: str):
+        """Drop a user's cached corrections (call after storing a new correction)."""
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self._versions[user_id] = self._versions.get(user_id, 0) + 1
+
+    def clear(self):
+        """Drop all cached corrections."""
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+
+    def get_stats(self) -> Dict:
+        """Get cache size and hit/miss counters."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'users': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total > 0 else 0.0,
+            }
+
+    @staticmethod
+    def _load(user_id: str) -> Tuple[List[Dict], np.ndarray]:
+        """Fetch the needed columns and build the normalized float32 matrix."""
+        from database.supabase_client import get_supabase
+        from pipeline.personalization.similarity.service import (
+            get_embedding_model, parse_stored_embeddings_matrix
+        )
+
+        result = get_supabase().table('event_corrections')\
+            .select(CORRECTION_COLUMNS)\
+            .eq('user_id', user_id)\
+            .execute()
+        corrections = result.data or []
+        if not corrections:
+            return [], np.zeros((0, 0), dtype=np.float32)
+
+        dimension = get_embedding_model().get_sentence_embedding_dimension()
+        parsed_matrix, valid_rows = parse_stored_embeddings_matrix(
+            [c.get('facts_embedding') for c in corrections], dimension
+        )
+
+        # The embedding isn't needed once it's in the matrix
+        valid_corrections = []
+        for i in valid_rows:
+            correction = dict(corrections[i])
+            correction.pop('facts_embedding', None)
+            valid_corrections.append(correction)
+
+        matrix = parsed_matrix[valid_rows]
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix /= np.maximum(norms, 1e-8)
+
+        return valid_corrections, matrix
+
+
+# Global cache instance (lazy loaded)
+_global_cache: Optional[CorrectionMatrixCache] = None
+_global_cache_lock = threading.Lock()
+
+
+def get_correction_matrix_cache() -> CorrectionMatrixCache:
+    """Get or create the process-wide correction matrix cache (singleton)."""
+    global _global_cache
+    if _global_cache is None:
+        with _global_cache_lock:
+            if _global_cache is None:
+                _global_cache = CorrectionMatrixCache()
+    return _global_cache
@@ -11,6 +11,7 @@ from sentence_transformers import SentenceTransformer
 from typing import List, Dict, Optional
 from database.supabase_client import get_supabase
 from .analyzer import CorrectionAnalyzer
+from .matrix_cache import get_correction_matrix_cache
 
 
 class CorrectionStorageService:
@@ -91,6 +92,7 @@ class CorrectionStorageService:
         # 4. Store in database
         try:
             result = self.supabase.table('event_corrections').insert(correction_data).execute()
+            get_correction_matrix_cache().invalidate(user_id)
             return result.data[0]['id']
         except Exception as e:
             print(f"Error storing correction: {e}")
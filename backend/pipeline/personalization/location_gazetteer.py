@@ -0,0 +1,297 @@
+"""
+Per-user Location Gazetteer
+
+Deduplicated index of the locations a user has used, with counts and
+last-used context, searched through a character n-gram index instead of
+re-fetching and re-scanning location history on every lookup.
+
+The index stores character counts per location (unigram posting lists). The
+overlap with the query is exactly difflib's quick_ratio() upper bound, so
+locations that cannot reach the score threshold are skipped without running
+SequenceMatcher, and no location that would have matched is ever missed
+(a trigram filter would drop e.g. 'sci lib' vs 'cit 368', ratio 0.43).
+
+A user's gazetteer is seeded lazily from their recent location history
+(same window as search_location_history used to fetch), then kept current
+incrementally by SmartSyncService as provider events are added, updated or
+deleted, and dropped when a user's calendars or account are removed. At most
+LocationGazetteerConfig.MAX_USERS users are kept (least recently searched
+evicted first). Scoring is unchanged: difflib ratio on the normalized location,
+threshold 0.3, rounded to 2 places, sorted by (-match_score, -count).
+"""
+
+import logging
+import threading
+import time
+from collections import Counter, OrderedDict, defaultdict
+from datetime import datetime
+from difflib import SequenceMatcher
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from config.database import QueryLimits, LocationGazetteerConfig
+
+logger = logging.getLogger(__name__)
+
+
+MIN_MATCH_SCORE = 0.3
+
+
+def _normalize(location: str) -> str:
+    return location.lower().strip()
+
+
+def _recency_key(start_time: Optional[str]) -> Tuple[int, Any]:
+    """
+    Sort key matching ORDER BY start_time DESC (NULLs first) as "most recent".
+
+    Rows without a start_time (all-day) sort as newest, like the history query.
+    """
+    if not start_time:
+        return (1, '')
+    try:
+        return (0, datetime.fromisoformat(start_time.replace('Z', '+00:00')).timestamp())
+    except (ValueError, TypeError, AttributeError):
+        return (0, 0.0)
+
+
+class _UserGazetteer:
+    """One user's locations, per-event records and character n-gram index."""
+
+    def __init__(self):
+        # event_id → (location key, raw location, summary, calendar_name, start_time)
+        self.events: Dict[str, Tuple[str, str, str, str, Optional[str]]] = {}
+        # location key → event ids using it
+        self.location_events: Dict[str, Set[str]] = defaultdict(set)
+        # location key → event id whose details are shown (most recent use)
+        self.latest: Dict[str, str] = {}
+        # character → {location key: occurrences of the character in the key}
+        self.char_index: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self.loaded_at = time.monotonic()
+
+    def add(self, event_id: str, location: str, summary: str, calendar: str, start_time: Optional[str]):
+        key = _normalize(location)
+        if not key:
+            return
+        self.events[event_id] = (key, location, summary or '', calendar or '', start_time)
+
+        if not self.location_events.get(key):
+            for char, count in Counter(key).items():
+                self.char_index[char][key] = count
+        self.location_events[key].add(event_id)
+
+        current = self.latest.get(key)
+        if current is None or _recency_key(start_time) > _recency_key(self.events[current][4]):
+            self.latest[key] = event_id
+
+    def remove(self, event_id: str):
+        record = self.events.pop(event_id, None)
+        if record is None:
+            return
+        key = record[0]
+        event_ids = self.location_events.get(key)
+        if event_ids is None:
+            return
+        event_ids.discard(event_id)
+
+        if not event_ids:
+            # Location no longer used — drop it from the index
+            del self.location_events[key]
+            self.latest.pop(key, None)
+            for char in set(key):
+                postings = self.char_index.get(char)
+                if postings is not None:
+                    postings.pop(key, None)
+                    if not postings:
+                        del self.char_index[char]
+        elif self.latest.get(key) == event_id:
+            self.latest[key] = max(event_ids, key=lambda i: _recency_key(self.events[i][4]))
+
+    def search(self, query_location: str, limit: int) -> List[Dict[str, Any]]:
+        query = _normalize(query_location)
+        if not query:
+            return []
+
+        # Shared character counts per location (= quick_ratio's numerator / 2)
+        overlaps: Dict[str, int] = defaultdict(int)
+        for char, query_count in Counter(query).items():
+            for key, key_count in self.char_index.get(char, {}).items():
+                overlaps[key] += min(query_count, key_count)
+
+        results = []
+        for key, overlap in overlaps.items():
+            # Upper bound on ratio(); skip locations that can't reach the threshold
+            if 2.0 * overlap / (len(query) + len(key)) < MIN_MATCH_SCORE:
+                continue
+            score = SequenceMatcher(None, query, key).ratio()
+            if score >= MIN_MATCH_SCORE:
+                _, raw_location, summary, calendar, _ = self.events[self.latest[key]]
+                results.append({
+                    'location': raw_location,
+                    'match_score': round(score, 2),
+                    'count': len(self.location_events[key]),
+                    'last_used_with': summary,
+                    'calendar': calendar,
+                })
+
+        results.sort(key=lambda r: (-r['match_score'], -r['count']))
+        return results[:limit]
+
+
+class LocationGazetteer:
+    """
+    Process-wide store of per-user location gazetteers.
+
+    Example:
+        >>> gazetteer = get_location_gazetteer()
+        >>> gazetteer.search(user_id, 'thayer st')
+        [{'location': '123 Thayer St', 'match_score': 0.72, 'count': 4, ...}]
+    """
+
+    def __init__(
+        self,
+        loader: Optional[Callable[[str], List[Dict[str, Any]]]] = None,
+        max_users: Optional[int] = None,
+        ttl_seconds: Optional[float] = None
+    ):
+        """
+        Initialize the gazetteer store.
+
+        Args:
+            loader: Returns a user's recent location rows (id, location, summary,
+                    calendar_name, start_time), most recent first
+                    (default: load_location_history from the events table)
+            max_users: Max users kept (default: LocationGazetteerConfig.MAX_USERS)
+            ttl_seconds: Reseed a user's gazetteer after this long
+                         (default: LocationGazetteerConfig.TTL_SECONDS)
+        """
+        self.loader = loader or load_location_history
+        self.max_users = max_users if max_users is not None else LocationGazetteerConfig.MAX_USERS
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else LocationGazetteerConfig.TTL_SECONDS
+        self._users: 'OrderedDict[str, _UserGazetteer]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def search(
+        self,
+        user_id: str,
+        query_location: str,
+        limit: int = QueryLimits.LOCATION_SEARCH_RESULTS_LIMIT
+    ) -> List[Dict[str, Any]]:
+        """
+        Find locations from the user's history similar to query_location.
+
+        Args:
+            user_id: User's UUID
+            query_location: Location string to match against
+            limit: Max number of results to return
+
+        Returns:
+            [{'location', 'match_score', 'count', 'last_used_with', 'calendar'}]
+            sorted by match score, then count
+        """
+        gazetteer = self._get_or_load(user_id)
+        with self._lock:
+            return gazetteer.search(query_location, limit)
+
+    def record_event(
+        self,
+        user_id: str,
+        event_id: str,
+        location: Optional[str],
+        summary: Optional[str] = None,
+        calendar_name: Optional[str] = None,
+        start_time: Optional[str] = None
+    ):
+        """
+        Apply an added/updated provider event (no-op until the user is seeded).
+
+        Args:
+            user_id: User's UUID
+            event_id: Event row UUID
+            location: Event location (None/empty removes the event's location)
+            summary: Event title (shown as last_used_with)
+            calendar_name: Calendar the event belongs to
+            start_time: Event start (ISO) used to pick the most recent use
+        """
+        with self._lock:
+            gazetteer = self._users.get(user_id)
+            if gazetteer is None:
+                return
+            gazetteer.remove(event_id)
+            if location and location.strip():
+                gazetteer.add(event_id, location, summary or '', calendar_name or '', start_time)
+
+    def remove_event(self, user_id: str, event_id: str):
+        """Apply a deleted provider event."""
+        with self._lock:
+            gazetteer = self._users.get(user_id)
+            if gazetteer is not None:
+                gazetteer.remove(event_id)
+
+    def invalidate(self, user_id: str):
+        """Drop a user's gazetteer; the next search reseeds it."""
+        with self._lock:
+            self._users.pop(user_id, None)
+
+    def is_loaded(self, user_id: str) -> bool:
+        with self._lock:
+            return user_id in self._users
+
+    def _get_or_load(self, user_id: str) -> _UserGazetteer:
+        with self._lock:
+            gazetteer = self._users.get(user_id)
+            if gazetteer is not None and time.monotonic() - gazetteer.loaded_at < self.ttl_seconds:
+                self._users.move_to_end(user_id)
+                return gazetteer
+
+        rows = self.loader(user_id)
+        gazetteer = _UserGazetteer()
+        for row in rows:
+            location = row.get('location')
+            if not location:
+                continue
+            event_id = str(row.get('id') or f"seed-{len(gazetteer.events)}")
+            gazetteer.add(
+                event_id,
+                location,
+                row.get('summary', ''),
+                row.get('calendar_name', ''),
+                row.get('start_time'),
+            )
+
+        with self._lock:
+            self._users[user_id] = gazetteer
+            self._users.move_to_end(user_id)
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+        return gazetteer
+
+
+def load_location_history(user_id: str) -> List[Dict[str, Any]]:
+    """Fetch a user's recent events with a location, most recent first."""
+    from database.supabase_client import get_supabase
+
+    response = get_supabase().table("events")\
+        .select("id, location, summary, calendar_name, start_time")\
+        .eq("user_id", user_id)\
+        .neq("provider", "dropcal")\
+        .is_("deleted_at", None)\
+        .not_.is_("location", None)\
+        .order("start_time", desc=True)\
+        .limit(QueryLimits.LOCATION_HISTORY_FETCH_LIMIT).execute()
+
+    return response.data or []
+
+
+# Global gazetteer instance (lazy loaded)
+_global_gazetteer: Optional[LocationGazetteer] = None
+_global_gazetteer_lock = threading.Lock()
+
+
+def get_location_gazetteer() -> LocationGazetteer:
+    """Get or create the process-wide location gazetteer (singleton)."""
+    global _global_gazetteer
+    if _global_gazetteer is None:
+        with _global_gazetteer_lock:
+            if _global_gazetteer is None:
+                _global_gazetteer = LocationGazetteer()
+    return _global_gazetteer
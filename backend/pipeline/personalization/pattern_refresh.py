@@ -3,7 +3,8 @@ Incremental pattern refresh service.
 
 Detects new/stale calendars and refreshes their patterns in the background.
 Runs non-blocking during event processing — current session uses existing
-patterns, refresh benefits the next session.
+patterns, refresh benefits the next session. Both the check and the refresh
+run on the scheduler's maintenance lane, which yields to session work.
 """
 
 import logging
@@ -17,6 +18,7 @@ from pipeline.personalization.pattern_discovery import PatternDiscoveryService
 from config.calendar import RefreshConfig
 from config.posthog import set_tracking_context, flush_posthog
 from config.similarity import PatternDiscoveryConfig
+from pipeline.scheduler import submit_maintenance
 
 logger = logging.getLogger(__name__)
 
@@ -44,7 +46,7 @@ class PatternRefreshService:
 
     def maybe_refresh(self, user_id: str) -> None:
         """
-        Check if calendars need refreshing and spawn background thread if so.
+        Queue a background check (and refresh if needed) of the user's calendars.
 
         Non-blocking: returns immediately. Refresh happens in background
         and benefits the next session.
@@ -52,11 +54,13 @@ class PatternRefreshService:
         Args:
             user_id: User's UUID
         """
-        try:
-            lock = self._get_user_lock(user_id)
-            if lock.locked():
-                return
+        if self._get_user_lock(user_id).locked():
+            return
+        submit_maintenance(f"calendar-refresh-{user_id}", user_id, self._check_and_refresh, user_id)
 
+    def _check_and_refresh(self, user_id: str) -> None:
+        """Maintenance job: compare provider calendars with stored ones and refresh if needed."""
+        try:
             # Fetch current calendar list from provider (~100ms)
             current_calendars = calendar_factory.list_calendars(user_id)
             if not current_calendars:
@@ -84,14 +88,10 @@ class PatternRefreshService:
                 f"{len(removed_cal_ids)} removed"
             )
 
-            thread = threading.Thread(
-                target=self._run_refresh,
-                args=(user_id, stored_lookup, current_calendars,
-                      new_cal_ids, stale_cal_ids, removed_cal_ids),
-                daemon=True,
-                name=f"calendar-refresh-{user_id[:8]}"
+            self._run_refresh(
+                user_id, stored_lookup, current_calendars,
+                new_cal_ids, stale_cal_ids, removed_cal_ids
             )
-            thread.start()
 
         except Exception as e:
             logger.warning(f"Error checking calendar refresh for {user_id[:8]}: {e}")
@@ -157,7 +157,7 @@ class PatternRefreshService:
         stale_cal_ids: Set[str],
         removed_cal_ids: Set[str]
     ) -> None:
-        """Background thread: fetch events, run LLM analysis, write to DB."""
+        """Fetch events, run LLM analysis, write to DB (on the maintenance lane)."""
         lock = self._get_user_lock(user_id)
         if not lock.acquire(blocking=False):
             logger.info(f"Refresh already in progress for user {user_id[:8]}")
@@ -154,3 +154,6 @@ class PersonalizationService:
         from database.supabase_client import get_supabase
         supabase = get_supabase()
         supabase.table("users").update({"timezone": timezone}).eq("id", user_id).execute()
+
+        from database.context_cache import get_user_context_cache, TIMEZONE
+        get_user_context_cache().invalidate(user_id, TIMEZONE)
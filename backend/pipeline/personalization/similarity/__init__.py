@@ -22,6 +22,17 @@ from .service import (
     compute_embeddings_batch
 )
 
+from .embedding_cache import (
+    EmbeddingCache,
+    get_embedding_cache
+)
+
+from .index_store import (
+    SimilarityIndexStore,
+    get_index_store,
+    compute_events_fingerprint
+)
+
 from .evaluation import (
     SimilarityEvaluator,
     run_evaluation_report,
@@ -45,6 +56,13 @@ __all__ = [
     'event_to_text',
     'compute_embedding',
     'compute_embeddings_batch',
+    # Embedding cache
+    'EmbeddingCache',
+    'get_embedding_cache',
+    # Index store
+    'SimilarityIndexStore',
+    'get_index_store',
+    'compute_events_fingerprint',
     # Evaluation
     'SimilarityEvaluator',
     'run_evaluation_report',
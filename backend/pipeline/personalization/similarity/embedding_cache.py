@@ -0,0 +1,163 @@
+"""
+Shared Embedding Cache
+
+Thread-safe LRU cache of text embeddings with a byte budget, shared by every
+CalendarEventSimilarity instance in the process. Replaces the per-instance
+dict that grew for the life of the worker.
+
+Vectors are stored as float32 (default) or float16 to halve memory; reads
+always return float32.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import numpy as np
+
+from config.similarity import EmbeddingConfig
+
+
+# Rough per-entry overhead of the key string and OrderedDict node
+_ENTRY_OVERHEAD_BYTES = 100
+
+
+class EmbeddingCache:
+    """
+    Byte-bounded, thread-safe LRU cache mapping normalized text → embedding.
+
+    Supports the dict operations the similarity code uses (in, [], []=, len,
+    clear) so it can stand in for the old plain-dict cache.
+
+    Example:
+        >>> cache = get_embedding_cache()
+        >>> cache.put('math homework', embedding)
+        >>> cache.get('math homework')
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None, dtype: Optional[str] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes: Memory budget (default: EmbeddingConfig.EMBEDDING_CACHE_MAX_BYTES)
+            dtype: Storage dtype, 'float32' or 'float16' (default: EmbeddingConfig.EMBEDDING_CACHE_DTYPE)
+        """
+        self.max_bytes = max_bytes if max_bytes is not None else EmbeddingConfig.EMBEDDING_CACHE_MAX_BYTES
+        self.dtype = np.dtype(dtype or EmbeddingConfig.EMBEDDING_CACHE_DTYPE)
+        if self.dtype not in (np.float32, np.float16):
+            raise ValueError(f"Embedding cache dtype must be float32 or float16, got {self.dtype}")
+
+        self._entries: 'OrderedDict[str, np.ndarray]' = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+        # Stats
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """
+        Look up an embedding and mark it most recently used.
+
+        Args:
+            key: Normalized text key
+
+        Returns:
+            float32 embedding, or None on a miss
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return value.astype(np.float32, copy=False)
+
+    def put(self, key: str, embedding: np.ndarray):
+        """
+        Store an embedding, evicting least recently used entries over budget.
+
+        Args:
+            key: Normalized text key
+            embedding: Embedding vector (copied into the storage dtype)
+        """
+        value = np.array(embedding, dtype=self.dtype, copy=True)
+        nbytes = value.nbytes + len(key) + _ENTRY_OVERHEAD_BYTES
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._total_bytes -= old.nbytes + len(key) + _ENTRY_OVERHEAD_BYTES
+
+            self._entries[key] = value
+            self._total_bytes += nbytes
+
+            while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+                evicted_key, evicted = self._entries.popitem(last=False)
+                self._total_bytes -= evicted.nbytes + len(evicted_key) + _ENTRY_OVERHEAD_BYTES
+                self.evictions += 1
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __getitem__(self, key: str) -> np.ndarray:
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, embedding: np.ndarray):
+        self.put(key, embedding)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def clear(self):
+        """Drop all entries and reset counters."""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def get_stats(self) -> Dict:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dict with size, bytes, max_bytes, dtype, hits, misses,
+            evictions and hit_rate
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'dtype': self.dtype.name,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / total if total > 0 else 0.0,
+            }
+
+
+# Global cache instance (lazy loaded)
+_global_cache: Optional[EmbeddingCache] = None
+_global_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Get or create the process-wide embedding cache (singleton)."""
+    global _global_cache
+    if _global_cache is None:
+        with _global_cache_lock:
+            if _global_cache is None:
+                _global_cache = EmbeddingCache()
+    return _global_cache
@@ -0,0 +1,288 @@
+"""
+Per-user FAISS Index Store
+
+Keeps built similarity indexes warm across sessions so a repeat upload does
+not re-encode the user's history before the first query can run.
+
+Entries are keyed by (user_id, fingerprint of the indexed event set), so any
+change to the user's history (new, edited or removed events) produces a new
+key and the stale index is dropped. Eviction is LRU by memory budget.
+Optionally, indexes are snapshotted to local disk (faiss.write_index plus an
+id map) so a worker restart still starts warm.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from .service import ProductionSimilaritySearch
+from config.similarity import IndexStoreConfig
+
+logger = logging.getLogger(__name__)
+
+
+def compute_events_fingerprint(events: List[Dict]) -> str:
+    """
+    Fingerprint an ordered event set for index cache keys.
+
+    Covers everything that affects the built index or the event dicts it
+    returns: event id, last update time, and the indexed title.
+
+    Args:
+        events: Historical events in index order
+
+    Returns:
+        Hex digest identifying this exact event set
+    """
+    hasher = hashlib.sha1()
+    for event in events:
+        hasher.update(str(event.get('id', '')).encode('utf-8'))
+        hasher.update(b'\x1f')
+        hasher.update(str(event.get('updated_at', '')).encode('utf-8'))
+        hasher.update(b'\x1f')
+        hasher.update(str(event.get('title', event.get('summary', ''))).encode('utf-8'))
+        hasher.update(b'\x1e')
+    return hasher.hexdigest()
+
+
+class SimilarityIndexStore:
+    """
+    Thread-safe LRU store of per-user ProductionSimilaritySearch instances.
+
+    Example:
+        >>> store = get_index_store()
+        >>> search = store.get_or_build(user_id, historical_events)
+        >>> search.find_similar_with_diversity({'title': 'math homework'}, k=5)
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None, persist_dir: Optional[str] = None):
+        """
+        Initialize the index store.
+
+        Args:
+            max_bytes: Memory budget for cached indexes (default: IndexStoreConfig.MAX_BYTES)
+            persist_dir: Directory for on-disk snapshots (default: IndexStoreConfig.PERSIST_DIR,
+                         None disables persistence)
+        """
+        self.max_bytes = max_bytes if max_bytes is not None else IndexStoreConfig.MAX_BYTES
+        self.persist_dir = persist_dir if persist_dir is not None else IndexStoreConfig.PERSIST_DIR
+
+        # (user_id, fingerprint) → (search, nbytes), least recently used first
+        self._entries: 'OrderedDict[Tuple[str, str], Tuple[ProductionSimilaritySearch, int]]' = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+        # Stats
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_build(
+        self,
+        user_id: str,
+        historical_events: List[Dict]
+    ) -> ProductionSimilaritySearch:
+        """
+        Return a warm search index for this user's event set, building it on a miss.
+
+        Lookup order: memory → disk snapshot → build (encode + index).
+
+        Args:
+            user_id: User's UUID
+            historical_events: User's historical events (index order)
+
+        Returns:
+            ProductionSimilaritySearch with its index built
+        """
+        fingerprint = compute_events_fingerprint(historical_events)
+        key = (user_id, fingerprint)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+        search = self._load_from_disk(user_id, fingerprint, historical_events)
+        if search is not None:
+            with self._lock:
+                self.disk_hits += 1
+        else:
+            with self._lock:
+                self.misses += 1
+            search = ProductionSimilaritySearch()
+            search.build_index(historical_events)
+            self._save_to_disk(user_id, fingerprint, search)
+
+        self._put(key, search)
+        return search
+
+    def invalidate(self, user_id: str):
+        """
+        Drop all in-memory indexes for a user.
+
+        A changed history already misses by fingerprint; this frees the stale
+        index right away after bulk writes (provider sync or disconnect,
+        account merge or deletion) instead of waiting for the next session.
+        """
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == user_id]:
+                self._drop(key)
+
+    def clear(self):
+        """Drop all in-memory indexes."""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def get_stats(self) -> Dict:
+        """
+        Get store statistics.
+
+        Returns:
+            Dict with entries, total_bytes, max_bytes, hits, disk_hits,
+            misses, evictions and hit_rate (memory + disk hits / lookups)
+        """
+        with self._lock:
+            total = self.hits + self.disk_hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'total_bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': (self.hits + self.disk_hits) / total if total > 0 else 0.0,
+            }
+
+    # ========================================================================
+    # Memory management
+    # ========================================================================
+
+    def _put(self, key: Tuple[str, str], search: ProductionSimilaritySearch):
+        """Insert an entry, replacing stale fingerprints for the same user, then evict LRU."""
+        if search.retrieval.index is None:
+            return
+
+        nbytes = self._estimate_bytes(search)
+        user_id = key[0]
+
+        with self._lock:
+            # Only the latest event set per user is worth keeping
+            for stale_key in [k for k in self._entries if k[0] == user_id and k != key]:
+                self._drop(stale_key)
+
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (search, nbytes)
+            self._total_bytes += nbytes
+
+            # Evict least recently used until under budget (always keep the newest)
+            while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+                oldest_key = next(iter(self._entries))
+                self._drop(oldest_key)
+                self.evictions += 1
+
+    def _drop(self, key: Tuple[str, str]):
+        """Remove an entry. Caller must hold self._lock."""
+        _, nbytes = self._entries.pop(key)
+        self._total_bytes -= nbytes
+
+    @staticmethod
+    def _estimate_bytes(search: ProductionSimilaritySearch) -> int:
+        """Embedding matrix plus the FAISS index's own vector/code storage."""
+        return search.retrieval.memory_bytes()
+
+    # ========================================================================
+    # Disk persistence
+    # ========================================================================
+
+    def _snapshot_paths(self, user_id: str, fingerprint: str) -> Tuple[str, str, str]:
+        """Return (user_dir, index_path, id_map_path) for a snapshot."""
+        safe_user = hashlib.sha1(user_id.encode('utf-8')).hexdigest()
+        user_dir = os.path.join(self.persist_dir, safe_user)
+        return (
+            user_dir,
+            os.path.join(user_dir, f"{fingerprint}.faiss"),
+            os.path.join(user_dir, f"{fingerprint}.ids.json"),
+        )
+
+    def _load_from_disk(
+        self,
+        user_id: str,
+        fingerprint: str,
+        historical_events: List[Dict]
+    ) -> Optional[ProductionSimilaritySearch]:
+        """Hydrate a search from a disk snapshot, or None if absent/unusable."""
+        if not self.persist_dir:
+            return None
+
+        _, index_path, id_map_path = self._snapshot_paths(user_id, fingerprint)
+        if not os.path.exists(index_path) or not os.path.exists(id_map_path):
+            return None
+
+        try:
+            import faiss
+
+            with open(id_map_path) as f:
+                event_ids = json.load(f)
+
+            events_by_id = {str(e.get('id')): e for e in historical_events}
+            if len(event_ids) != len(historical_events) or any(i not in events_by_id for i in event_ids):
+                return None
+
+            index = faiss.read_index(index_path)
+            search = ProductionSimilaritySearch()
+            search.retrieval.restore_index([events_by_id[i] for i in event_ids], index)
+            return search
+        except Exception as e:
+            logger.warning(f"Could not load index snapshot for user {user_id[:8]}: {e}")
+            return None
+
+    def _save_to_disk(self, user_id: str, fingerprint: str, search: ProductionSimilaritySearch):
+        """Write a snapshot and remove older snapshots for the same user."""
+        if not self.persist_dir or search.retrieval.index is None:
+            return
+
+        # The id map needs a stable id for every indexed event
+        event_ids = [e.get('id') for e in search.retrieval.events]
+        if any(i is None for i in event_ids):
+            return
+
+        try:
+            import faiss
+
+            user_dir, index_path, id_map_path = self._snapshot_paths(user_id, fingerprint)
+            os.makedirs(user_dir, exist_ok=True)
+
+            for name in os.listdir(user_dir):
+                if not name.startswith(fingerprint):
+                    os.remove(os.path.join(user_dir, name))
+
+            faiss.write_index(search.retrieval.index, index_path)
+            with open(id_map_path, 'w') as f:
+                json.dump([str(i) for i in event_ids], f)
+        except Exception as e:
+            logger.warning(f"Could not save index snapshot for user {user_id[:8]}: {e}")
+
+
+# Global store instance (lazy loaded)
+_global_store: Optional[SimilarityIndexStore] = None
+_global_store_lock = threading.Lock()
+
+
+def get_index_store() -> SimilarityIndexStore:
+    """Get or create the global per-user index store (singleton)."""
+    global _global_store
+    if _global_store is None:
+        with _global_store_lock:
+            if _global_store is None:
+                _global_store = SimilarityIndexStore()
+    return _global_store
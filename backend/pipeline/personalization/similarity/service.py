@@ -17,6 +17,8 @@ Architecture:
 """
 
 import re
+import threading
+from collections import OrderedDict
 import numpy as np
 from typing import List, Dict, Tuple, Optional, Set
 from functools import lru_cache
@@ -28,7 +30,8 @@ from .models import (
     SimilarEvent,
     SimilaritySearchResult
 )
-from config.similarity import EmbeddingConfig
+from .embedding_cache import EmbeddingCache, get_embedding_cache
+from config.similarity import EmbeddingConfig, CompactIndexConfig
 
 
 class CalendarEventSimilarity:
@@ -50,13 +53,15 @@ class CalendarEventSimilarity:
 
     def __init__(
         self,
-        weights: Optional[SimilarityWeights] = None
+        weights: Optional[SimilarityWeights] = None,
+        embedding_cache: Optional[EmbeddingCache] = None
     ):
         """
         Initialize the similarity engine.
 
         Args:
             weights: Custom weights for similarity components (default: 70/15/10/5)
+            embedding_cache: Embedding cache to use (default: process-wide shared cache)
         """
         # Reuse global singleton (loaded once at startup, not per-session)
         self.model = get_embedding_model()
@@ -70,8 +75,8 @@ class CalendarEventSimilarity:
                 f"Similarity weights must sum to 1.0, got {sum([self.weights.semantic, self.weights.length, self.weights.keyword, self.weights.temporal])}"
             )
 
-        # Cache for embeddings (memory efficient)
-        self._embedding_cache: Dict[str, np.ndarray] = {}
+        # Shared, byte-bounded LRU cache for embeddings
+        self._embedding_cache = embedding_cache if embedding_cache is not None else get_embedding_cache()
 
         # Stopwords for keyword extraction
         self.stopwords = {
@@ -146,6 +151,93 @@ class CalendarEventSimilarity:
 
         return final_score, scores
 
+    def compute_similarity_batch(
+        self,
+        query_event: Dict,
+        candidate_events: List[Dict],
+        candidate_keywords: Optional[List[Set[str]]] = None,
+        candidate_word_counts: Optional[np.ndarray] = None
+    ) -> List[Tuple[float, Dict]]:
+        """
+        Score many candidates against one query in a single vectorized pass.
+
+        Produces the same (final_score, breakdown_dict) per candidate as
+        compute_similarity, but with one matrix product for semantic scores,
+        vectorized length decay, and optional precomputed keyword sets /
+        word counts for indexed events.
+
+        Args:
+            query_event: Query event dict (must have 'title' field)
+            candidate_events: Candidate events to compare against
+            candidate_keywords: Precomputed _extract_keywords(title) per candidate
+            candidate_word_counts: Precomputed title word count per candidate
+
+        Returns:
+            List of (final_score, breakdown_dict), aligned with candidate_events
+        """
+        zero = {'semantic': 0.0, 'length': 0.0, 'keyword': 0.0, 'temporal': 0.0, 'final': 0.0}
+        results: List[Tuple[float, Dict]] = [(0.0, dict(zero)) for _ in candidate_events]
+
+        query_title = query_event.get('title', '')
+        if not query_title:
+            return results
+
+        # Candidates with a missing title score zero (same as compute_similarity)
+        rows = [i for i, c in enumerate(candidate_events) if c.get('title', '')]
+        if not rows:
+            return results
+        titles = [candidate_events[i].get('title', '') for i in rows]
+
+        # 1. Semantic: cosine similarity via one (1 x d) @ (d x n) product
+        query_emb = self._get_embedding(query_title).astype(np.float32)
+        query_emb = query_emb / max(np.linalg.norm(query_emb), 1e-8)
+        cand_embs = self._get_embeddings(titles)
+        cand_embs = cand_embs / np.maximum(np.linalg.norm(cand_embs, axis=1, keepdims=True), 1e-8)
+        semantic = np.clip(cand_embs @ query_emb, 0.0, 1.0).astype(np.float64)
+
+        # 2. Length: exp(-|diff| / T) over word counts
+        if candidate_word_counts is not None:
+            cand_lengths = np.asarray(candidate_word_counts)[rows]
+        else:
+            cand_lengths = np.array([len(t.split()) for t in titles])
+        query_length = len(query_title.split())
+        length = np.exp(-np.abs(cand_lengths - query_length) / EmbeddingConfig.LENGTH_SIMILARITY_DECAY_T)
+
+        # 3. Keyword: Jaccard over keyword sets
+        query_keywords = self._extract_keywords(query_title)
+        keyword = np.zeros(len(rows))
+        if query_keywords:
+            for j, i in enumerate(rows):
+                keywords = candidate_keywords[i] if candidate_keywords is not None else self._extract_keywords(titles[j])
+                if keywords:
+                    keyword[j] = len(query_keywords & keywords) / len(query_keywords | keywords)
+
+        # 4. Temporal: all-day vs timed
+        query_all_day = query_event.get('all_day', True)
+        temporal = np.array([
+            1.0 if query_all_day == candidate_events[i].get('all_day', True) else 0.5
+            for i in rows
+        ])
+
+        final = (
+            self.weights.semantic * semantic +
+            self.weights.length * length +
+            self.weights.keyword * keyword +
+            self.weights.temporal * temporal
+        )
+
+        for j, i in enumerate(rows):
+            breakdown = {
+                'semantic': float(semantic[j]),
+                'length': float(length[j]),
+                'keyword': float(keyword[j]),
+                'temporal': float(temporal[j]),
+                'final': float(final[j]),
+            }
+            results[i] = (breakdown['final'], breakdown)
+
+        return results
+
     def _semantic_similarity(self, text1: str, text2: str) -> float:
         """
         Compute semantic similarity using sentence embeddings.
@@ -305,19 +397,55 @@ class CalendarEventSimilarity:
         cache_key = text.strip().lower()
 
         # Check cache
-        if cache_key in self._embedding_cache:
-            return self._embedding_cache[cache_key]
+        embedding = self._embedding_cache.get(cache_key)
+        if embedding is not None:
+            return embedding
 
         # Compute embedding
         embedding = self.model.encode(text, convert_to_numpy=True)
 
         # Cache it
-        self._embedding_cache[cache_key] = embedding
+        self._embedding_cache.put(cache_key, embedding)
 
         return embedding
 
+    def _get_embeddings(self, texts: List[str]) -> np.ndarray:
+        """
+        Get embeddings for many texts, encoding all cache misses in one batch.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            Array of shape (len(texts), dim), row-aligned with texts
+        """
+        cache_keys = [text.strip().lower() for text in texts]
+
+        found: Dict[str, np.ndarray] = {}
+        missing: Dict[str, str] = {}
+        for key, text in zip(cache_keys, texts):
+            if key in found or key in missing:
+                continue
+            embedding = self._embedding_cache.get(key)
+            if embedding is not None:
+                found[key] = embedding
+            else:
+                missing[key] = text
+
+        if missing:
+            encoded = self.model.encode(
+                list(missing.values()),
+                batch_size=EmbeddingConfig.FAISS_BATCH_SIZE,
+                convert_to_numpy=True
+            )
+            for key, embedding in zip(missing.keys(), encoded):
+                self._embedding_cache.put(key, embedding)
+                found[key] = embedding
+
+        return np.stack([found[key] for key in cache_keys]).astype(np.float32)
+
     def clear_cache(self):
-        """Clear the embedding cache."""
+        """Clear the (shared) embedding cache."""
         self._embedding_cache.clear()
 
     def get_cache_size(self) -> int:
@@ -413,24 +541,40 @@ class TwoStageRetrieval:
     maintaining high accuracy.
     """
 
-    def __init__(self, similarity: Optional[CalendarEventSimilarity] = None):
+    def __init__(
+        self,
+        similarity: Optional[CalendarEventSimilarity] = None,
+        index_type: Optional[str] = None
+    ):
         """
         Initialize two-stage retrieval system.
 
         Args:
             similarity: CalendarEventSimilarity instance (creates one if None)
+            index_type: Force 'flat', 'sq8', 'sq_fp16' or 'hnsw' regardless of
+                        history size (default: CompactIndexConfig, applied only
+                        to histories of at least CompactIndexConfig.MIN_EVENTS)
         """
         self.similarity = similarity or CalendarEventSimilarity()
         self.events: List[Dict] = []
         self.embeddings: Optional[np.ndarray] = None
         self.index: Optional['faiss.Index'] = None  # FAISS index
+        self.forced_index_type = index_type
+        self.index_type = 'flat'
+
+        # Stage-2 features precomputed per indexed event (row-aligned with events)
+        self._keyword_sets: List[Set[str]] = []
+        self._word_counts: Optional[np.ndarray] = None
 
     def build_index(self, historical_events: List[Dict], show_progress: bool = False):
         """
         Pre-compute embeddings and build FAISS index.
 
         Call this once during onboarding or preference refresh.
-        Takes ~1-2 seconds for 1000 events.
+        Events that carry a stored pgvector 'event_embedding' (as returned by
+        EventService.get_historical_events_with_embeddings) are loaded as-is;
+        only rows without one are encoded, in a single batch. A fully
+        embedded history builds without a model pass.
 
         Args:
             historical_events: List of calendar event dicts
@@ -453,18 +597,32 @@ class TwoStageRetrieval:
         # Extract titles for embedding
         titles = [e.get('title', e.get('summary', '')) for e in historical_events]
 
-        # Batch encode all event titles
-        self.embeddings = self.similarity.model.encode(
-            titles,
-            batch_size=EmbeddingConfig.FAISS_BATCH_SIZE,
-            convert_to_numpy=True,
-            show_progress_bar=show_progress
+        dimension = self.similarity.model.get_sentence_embedding_dimension()
+
+        # Hydrate from stored embeddings into one preallocated float32 matrix;
+        # collect rows that still need encoding
+        self.embeddings, stored_rows = parse_stored_embeddings_matrix(
+            [e.get('event_embedding') for e in historical_events], dimension
         )
+        stored = set(stored_rows)
+        missing = [i for i in range(len(historical_events)) if i not in stored]
+
+        # Rows whose vector is exactly the title embedding. Stored vectors embed
+        # "summary description" — only reusable by the reranker when that text
+        # is just the title
+        cacheable = [
+            i for i, event in enumerate(historical_events)
+            if i not in stored or stored_embedding_text(event) == titles[i]
+        ]
 
-        # Populate embedding cache for fast reranking
-        for title, embedding in zip(titles, self.embeddings):
-            cache_key = title.strip().lower()
-            self.similarity._embedding_cache[cache_key] = embedding
+        # Batch encode titles of events without a stored embedding
+        if missing:
+            self.embeddings[missing] = self.similarity.model.encode(
+                [titles[i] for i in missing],
+                batch_size=EmbeddingConfig.FAISS_BATCH_SIZE,
+                convert_to_numpy=True,
+                show_progress_bar=show_progress
+            )
 
         # Build FAISS index for cosine similarity
         try:
@@ -475,15 +633,149 @@ class TwoStageRetrieval:
                 "Install with: pip install faiss-cpu"
             )
 
-        dimension = self.embeddings.shape[1]  # 384 for MiniLM
-        self.index = faiss.IndexFlatIP(dimension)  # Inner product for cosine similarity
+        # Inner product for cosine similarity (exact flat, or compact for large histories)
+        self.index_type = self._resolve_index_type(len(historical_events))
+        self.index = self._create_index(faiss, dimension, self.index_type)
 
         # Normalize embeddings for cosine similarity
         # After normalization: inner product = cosine similarity
         faiss.normalize_L2(self.embeddings)
+        if not self.index.is_trained:
+            self.index.train(self.embeddings)
         self.index.add(self.embeddings)
 
-        print(f"✓ Index built ({dimension} dimensions, {self.index.ntotal} vectors)")
+        # Populate embedding cache for fast reranking
+        self._populate_embedding_cache(
+            [titles[i] for i in cacheable],
+            [self.embeddings[i] for i in cacheable]
+        )
+        self._precompute_rerank_features()
+        self._compact_embeddings()
+
+        print(
+            f"✓ Index built ({dimension} dimensions, {self.index.ntotal} vectors, "
+            f"{len(stored_rows)} from stored embeddings, {self.index_type})"
+        )
+
+    def _resolve_index_type(self, n_events: int) -> str:
+        """Pick the index type: forced type, else compact config for large histories."""
+        if self.forced_index_type:
+            return self.forced_index_type
+        if n_events >= CompactIndexConfig.MIN_EVENTS:
+            return CompactIndexConfig.INDEX_TYPE
+        return 'flat'
+
+    @staticmethod
+    def _create_index(faiss, dimension: int, index_type: str) -> 'faiss.Index':
+        """Create an empty inner-product FAISS index of the given type."""
+        if index_type == 'sq8':
+            return faiss.IndexScalarQuantizer(
+                dimension, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT
+            )
+        if index_type == 'sq_fp16':
+            return faiss.IndexScalarQuantizer(
+                dimension, faiss.ScalarQuantizer.QT_fp16, faiss.METRIC_INNER_PRODUCT
+            )
+        if index_type == 'hnsw':
+            index = faiss.IndexHNSWFlat(dimension, CompactIndexConfig.HNSW_M, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efConstruction = CompactIndexConfig.HNSW_EF_CONSTRUCTION
+            index.hnsw.efSearch = CompactIndexConfig.HNSW_EF_SEARCH
+            return index
+        if index_type != 'flat':
+            raise ValueError(f"Unknown similarity index type: {index_type}")
+        return faiss.IndexFlatIP(dimension)
+
+    def _compact_embeddings(self):
+        """Keep the in-memory embedding copy in the compact dtype for non-flat indexes."""
+        if self.index_type != 'flat' and self.embeddings is not None:
+            self.embeddings = self.embeddings.astype(CompactIndexConfig.EMBEDDING_DTYPE)
+
+    def memory_bytes(self) -> int:
+        """
+        Estimate memory held by the index and its embedding copy.
+
+        Returns:
+            Approximate bytes (embedding matrix + FAISS vector/code storage)
+        """
+        if self.index is None or self.embeddings is None:
+            return 0
+        n, dimension = self.index.ntotal, self.embeddings.shape[1]
+        per_vector = {
+            'flat': dimension * 4,
+            'sq8': dimension,
+            'sq_fp16': dimension * 2,
+            'hnsw': dimension * 4 + CompactIndexConfig.HNSW_M * 2 * 4,  # vectors + graph links
+        }.get(self.index_type, dimension * 4)
+        return int(self.embeddings.nbytes) + n * per_vector
+
+    def restore_index(self, historical_events: List[Dict], index: 'faiss.Index'):
+        """
+        Attach a prebuilt FAISS index instead of re-encoding the events.
+
+        Used by the per-user index store to hydrate a warm index (from memory
+        or a faiss.write_index snapshot). The index must contain one
+        L2-normalized vector per event, in the same order as historical_events.
+
+        Args:
+            historical_events: Events the index was built from, in index order
+            index: FAISS inner-product index over normalized title embeddings
+        """
+        if index.ntotal != len(historical_events):
+            raise ValueError(
+                f"Index has {index.ntotal} vectors but {len(historical_events)} events were given"
+            )
+
+        self.events = historical_events
+        self.index = index
+        self.index_type = self._detect_index_type(index)
+        self.embeddings = index.reconstruct_n(0, index.ntotal)
+
+        # Same rule as build_index: stored "summary description" vectors are
+        # not title embeddings, so they stay out of the reranker cache
+        cacheable = [
+            (title, embedding)
+            for event, title, embedding in zip(
+                historical_events,
+                (e.get('title', e.get('summary', '')) for e in historical_events),
+                self.embeddings
+            )
+            if event.get('event_embedding') is None or stored_embedding_text(event) == title
+        ]
+        self._populate_embedding_cache(
+            [title for title, _ in cacheable],
+            [embedding for _, embedding in cacheable]
+        )
+        self._precompute_rerank_features()
+        self._compact_embeddings()
+
+    @staticmethod
+    def _detect_index_type(index: 'faiss.Index') -> str:
+        """Map a (restored) FAISS index back to its index type name."""
+        import faiss
+
+        if isinstance(index, faiss.IndexHNSW):
+            return 'hnsw'
+        if isinstance(index, faiss.IndexScalarQuantizer):
+            if index.sq.qtype == faiss.ScalarQuantizer.QT_fp16:
+                return 'sq_fp16'
+            return 'sq8'
+        return 'flat'
+
+    def _populate_embedding_cache(self, titles: List[str], embeddings: List[np.ndarray]):
+        """Seed the reranker's embedding cache so stage 2 never re-encodes indexed titles."""
+        for title, embedding in zip(titles, embeddings):
+            cache_key = title.strip().lower()
+            self.similarity._embedding_cache.put(cache_key, embedding)
+
+    def _precompute_rerank_features(self):
+        """Extract keyword sets and word counts once per indexed event for stage 2."""
+        # Reranker scores the 'title' field (not summary), like compute_similarity
+        candidate_titles = [e.get('title', '') for e in self.events]
+        self._keyword_sets = [
+            self.similarity._extract_keywords(title) if title else set()
+            for title in candidate_titles
+        ]
+        self._word_counts = np.array([len(title.split()) for title in candidate_titles])
 
     def retrieve_similar(
         self,
@@ -518,18 +810,92 @@ class TwoStageRetrieval:
             )
 
         # Stage 1: Fast semantic search
-        candidates = self._fast_semantic_search(query_event, n=k * rerank_factor)
-
-        if not candidates:
-            return []
+        candidate_indices = self._fast_semantic_search_indices(query_event, n=k * rerank_factor)
 
         # Stage 2: Precise multi-faceted reranking
-        scored = []
-        for candidate in candidates:
-            score, breakdown = self.similarity.compute_similarity(
-                query_event, candidate
+        return self._rerank(query_event, candidate_indices, k)
+
+    def retrieve_similar_batch(
+        self,
+        query_events: List[Dict],
+        k: int = 7,
+        rerank_factor: int = 3
+    ) -> List[List[Tuple[Dict, float, Dict]]]:
+        """
+        Two-stage retrieval for many queries at once.
+
+        Encodes all query titles in one model.encode call and runs a single
+        multi-row FAISS search, then reranks each query's candidates.
+
+        Args:
+            query_events: Events to search for (each must have 'title' field)
+            k: Number of final results per query
+            rerank_factor: Retrieve k * rerank_factor candidates for stage 2
+
+        Returns:
+            One list of (event, similarity_score, breakdown) tuples per query,
+            aligned with query_events
+        """
+        if not self.events or self.index is None:
+            raise ValueError(
+                "Index not built. Call build_index() first with historical events."
             )
-            scored.append((candidate, score, breakdown))
+
+        import faiss
+
+        results: List[List[Tuple[Dict, float, Dict]]] = [[] for _ in query_events]
+
+        # Stage 1: one batch encode + one multi-row search
+        query_titles = [q.get('title', q.get('summary', '')) for q in query_events]
+        rows = [i for i, title in enumerate(query_titles) if title]
+        if not rows:
+            return results
+
+        query_embs = self.similarity._get_embeddings([query_titles[i] for i in rows])
+        faiss.normalize_L2(query_embs)
+
+        n_to_search = min(k * rerank_factor, len(self.events))
+        _, indices = self.index.search(query_embs, n_to_search)
+
+        # Stage 2: rerank each query's candidates
+        for row, candidate_row in zip(rows, indices):
+            candidate_indices = [int(i) for i in candidate_row if i >= 0]
+            results[row] = self._rerank(query_events[row], candidate_indices, k)
+
+        return results
+
+    def _rerank(
+        self,
+        query_event: Dict,
+        candidate_indices: List[int],
+        k: int
+    ) -> List[Tuple[Dict, float, Dict]]:
+        """
+        Stage 2: Score candidates with the full multi-faceted similarity.
+
+        Args:
+            query_event: Event to search for
+            candidate_indices: Stage-1 candidate rows into self.events
+            k: Number of results to return
+
+        Returns:
+            Top k (event, similarity_score, breakdown) tuples, best first
+        """
+        if not candidate_indices:
+            return []
+
+        # All candidates scored in one pass
+        candidates = [self.events[i] for i in candidate_indices]
+        batch_scores = self.similarity.compute_similarity_batch(
+            query_event,
+            candidates,
+            candidate_keywords=[self._keyword_sets[i] for i in candidate_indices],
+            candidate_word_counts=self._word_counts[candidate_indices]
+        )
+        scored = [
+            (candidate, score, breakdown)
+            for candidate, (score, breakdown) in zip(candidates, batch_scores)
+        ]
 
         # Sort by final score descending
         scored.sort(key=lambda x: x[1], reverse=True)
@@ -551,6 +917,19 @@ class TwoStageRetrieval:
         Returns:
             List of candidate events
         """
+        return [self.events[i] for i in self._fast_semantic_search_indices(query_event, n)]
+
+    def _fast_semantic_search_indices(self, query_event: Dict, n: int) -> List[int]:
+        """
+        Stage 1 search returning row indices into self.events.
+
+        Args:
+            query_event: Event to search for
+            n: Number of candidates to return
+
+        Returns:
+            List of candidate event indices, best first
+        """
         import faiss
 
         # Get query embedding
@@ -568,8 +947,8 @@ class TwoStageRetrieval:
         n_to_search = min(n, len(self.events))  # Don't search for more than we have
         distances, indices = self.index.search(query_emb, n_to_search)
 
-        # Return candidate events
-        return [self.events[i] for i in indices[0]]
+        # Return candidate indices (FAISS pads with -1 when short)
+        return [int(i) for i in indices[0] if i >= 0]
 
 
 class ProductionSimilaritySearch:
@@ -583,21 +962,28 @@ class ProductionSimilaritySearch:
     - Graceful error handling
     """
 
-    def __init__(self, similarity: Optional[CalendarEventSimilarity] = None):
+    def __init__(
+        self,
+        similarity: Optional[CalendarEventSimilarity] = None,
+        index_type: Optional[str] = None
+    ):
         """
         Initialize production similarity search.
 
         Args:
             similarity: CalendarEventSimilarity instance (creates one if None)
+            index_type: FAISS index type override (see TwoStageRetrieval)
         """
-        self.retrieval = TwoStageRetrieval(similarity)
+        self.retrieval = TwoStageRetrieval(similarity, index_type=index_type)
 
-        # Simple dict cache (can upgrade to LRU with collections.OrderedDict)
-        self._cache: Dict[str, List[Tuple[Dict, float, Dict]]] = {}
+        # LRU query cache (most recently used last)
+        self._cache: 'OrderedDict[str, List[Tuple[Dict, float, Dict]]]' = OrderedDict()
+        self._cache_lock = threading.Lock()
 
         # Performance tracking
         self.cache_hits = 0
         self.cache_misses = 0
+        self.cache_evictions = 0
         self._total_search_time_ms = 0.0
         self._search_count = 0
 
@@ -636,9 +1022,13 @@ class ProductionSimilaritySearch:
         cache_key = self._get_cache_key(query_event, k) if use_cache else None
 
         # Check cache
-        if use_cache and cache_key in self._cache:
-            self.cache_hits += 1
-            return self._cache[cache_key]
+        if use_cache:
+            with self._cache_lock:
+                cached = self._cache.get(cache_key)
+                if cached is not None:
+                    self._cache.move_to_end(cache_key)
+                    self.cache_hits += 1
+                    return cached
 
         # Cache miss - compute similarity
         self.cache_misses += 1
@@ -647,13 +1037,14 @@ class ProductionSimilaritySearch:
 
         # Cache results
         if use_cache and cache_key:
-            self._cache[cache_key] = results
+            with self._cache_lock:
+                self._cache[cache_key] = results
+                self._cache.move_to_end(cache_key)
 
-            # Simple cache size limit
-            if len(self._cache) > EmbeddingConfig.QUERY_CACHE_SIZE_LIMIT:
-                # Remove oldest (first) item
-                oldest_key = next(iter(self._cache))
-                del self._cache[oldest_key]
+                # Evict least recently used over the size limit
+                while len(self._cache) > EmbeddingConfig.QUERY_CACHE_SIZE_LIMIT:
+                    self._cache.popitem(last=False)
+                    self.cache_evictions += 1
 
         # Track performance
         elapsed_ms = (time.time() - start_time) * 1000
@@ -689,9 +1080,12 @@ class ProductionSimilaritySearch:
                 - cache_size: Number of cached queries
                 - cache_hits: Total cache hits
                 - cache_misses: Total cache misses
+                - cache_evictions: Queries evicted by the LRU size limit
                 - hit_rate: Cache hit rate (0-1)
                 - total_searches: Total searches performed
                 - avg_search_time_ms: Average search time
+                - embedding_cache: Shared embedding cache stats (size, bytes,
+                  hits, misses, evictions, hit_rate, ...)
         """
         total = self.cache_hits + self.cache_misses
         hit_rate = self.cache_hits / total if total > 0 else 0.0
@@ -701,16 +1095,20 @@ class ProductionSimilaritySearch:
             'cache_size': len(self._cache),
             'cache_hits': self.cache_hits,
             'cache_misses': self.cache_misses,
+            'cache_evictions': self.cache_evictions,
             'hit_rate': hit_rate,
             'total_searches': self._search_count,
-            'avg_search_time_ms': avg_time
+            'avg_search_time_ms': avg_time,
+            'embedding_cache': self.retrieval.similarity._embedding_cache.get_stats()
         }
 
     def clear_cache(self):
         """Clear the query cache."""
-        self._cache.clear()
+        with self._cache_lock:
+            self._cache.clear()
         self.cache_hits = 0
         self.cache_misses = 0
+        self.cache_evictions = 0
 
     def reset_stats(self):
         """Reset performance statistics."""
@@ -753,6 +1151,73 @@ class ProductionSimilaritySearch:
         # Get more candidates than needed
         candidates = self.find_similar(query_event, k=k * 3, use_cache=False)
 
+        return self._apply_diversity(candidates, k, diversity_threshold)
+
+    def find_similar_batch(
+        self,
+        query_events: List[Dict],
+        k: int = 7,
+        diversity_threshold: float = 0.85
+    ) -> List[List[Tuple[Dict, float, Dict]]]:
+        """
+        Find diverse similar events for many queries in one pass.
+
+        Batched equivalent of calling find_similar_with_diversity per query:
+        all query titles are encoded together and searched with a single
+        multi-row FAISS call, then diversity filtering runs per query.
+
+        Args:
+            query_events: Events to search for
+            k: Number of results desired per query
+            diversity_threshold: Min similarity between results (lower = more diverse)
+
+        Returns:
+            One list of diverse similar events per query, aligned with query_events
+
+        Example:
+            >>> per_event = search.find_similar_batch(
+            ...     [{'title': 'math homework'}, {'title': 'team sync'}],
+            ...     k=5
+            ... )
+        """
+        import time
+
+        if not query_events:
+            return []
+
+        start_time = time.time()
+
+        candidate_lists = self.retrieval.retrieve_similar_batch(query_events, k=k * 3)
+        results = [
+            self._apply_diversity(candidates, k, diversity_threshold)
+            for candidates in candidate_lists
+        ]
+
+        # Track performance (amortized per query)
+        elapsed_ms = (time.time() - start_time) * 1000
+        self._total_search_time_ms += elapsed_ms
+        self._search_count += len(query_events)
+        self.cache_misses += len(query_events)
+
+        return results
+
+    def _apply_diversity(
+        self,
+        candidates: List[Tuple[Dict, float, Dict]],
+        k: int,
+        diversity_threshold: float
+    ) -> List[Tuple[Dict, float, Dict]]:
+        """
+        Greedily keep candidates that aren't too similar to those already kept.
+
+        Args:
+            candidates: Ranked (event, score, breakdown) tuples
+            k: Number of results desired
+            diversity_threshold: Max similarity allowed to an already-kept result
+
+        Returns:
+            Up to k diverse results, in ranked order
+        """
         if not candidates:
             return []
 
@@ -939,6 +1404,69 @@ def get_embedding_model() -> SentenceTransformer:
     return _global_model
 
 
+def stored_embedding_text(event: Dict) -> str:
+    """
+    Text that EventService embeds into an event's 'event_embedding' column.
+
+    Args:
+        event: Event row dict (summary/description)
+
+    Returns:
+        "summary description" (or just summary when there is no description)
+    """
+    text = event.get('summary') or ''
+    if event.get('description'):
+        text += f" {event['description']}"
+    return text
+
+
+def parse_stored_embedding(value) -> Optional[np.ndarray]:
+    """
+    Parse a stored pgvector embedding into a float32 array.
+
+    PostgREST returns vector columns as their text form ("[0.1,0.2,...]");
+    rows built in-process may carry plain lists.
+
+    Args:
+        value: Raw 'event_embedding' value (str, list, array or None)
+
+    Returns:
+        1-D float32 array, or None if missing/unparseable
+    """
+    if value is None:
+        return None
+    try:
+        if isinstance(value, str):
+            # Parse the text form directly, without an intermediate Python list
+            return np.fromstring(value.strip().strip('[]'), dtype=np.float32, sep=',')
+        return np.asarray(value, dtype=np.float32)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_stored_embeddings_matrix(values: List, dimension: int) -> Tuple[np.ndarray, List[int]]:
+    """
+    Parse many stored embeddings into one preallocated float32 matrix.
+
+    Args:
+        values: Raw stored embedding values (see parse_stored_embedding)
+        dimension: Expected embedding dimension
+
+    Returns:
+        Tuple of (matrix, parsed_rows)
+            - matrix: (len(values), dimension) float32; unparsed rows are zero
+            - parsed_rows: Indices of rows filled from a valid stored embedding
+    """
+    matrix = np.zeros((len(values), dimension), dtype=np.float32)
+    parsed_rows = []
+    for i, value in enumerate(values):
+        embedding = parse_stored_embedding(value)
+        if embedding is not None and embedding.shape == (dimension,):
+            matrix[i] = embedding
+            parsed_rows.append(i)
+    return matrix, parsed_rows
+
+
 def compute_embedding(text: str) -> np.ndarray:
     """
     Compute embedding for text (utility for EventService).
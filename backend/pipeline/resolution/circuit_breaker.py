@@ -0,0 +1,145 @@
+"""
+Circuit breaker for sidecar HTTP services.
+
+After FAILURE_THRESHOLD consecutive failures the breaker opens: callers fail
+fast instead of each waiting out a request timeout. While open, a background
+thread runs the health probe every PROBE_INTERVAL_SECONDS and closes the
+breaker on the first success, so no request pays for probing.
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from config.processing import DucklingBreakerConfig
+
+logger = logging.getLogger(__name__)
+
+
+CLOSED = 'closed'
+OPEN = 'open'
+
+
+class CircuitBreaker:
+    """
+    Thread-safe consecutive-failure circuit breaker with background probing.
+
+    Example:
+        >>> breaker = CircuitBreaker('duckling', probe=client.is_available)
+        >>> if not breaker.allow_request():
+        ...     raise ServiceUnavailable()
+        >>> try:
+        ...     call()
+        ...     breaker.record_success()
+        ... except ConnectionError:
+        ...     breaker.record_failure()
+    """
+
+    def __init__(
+        self,
+        name: str,
+        probe: Callable[[], bool],
+        failure_threshold: Optional[int] = None,
+        probe_interval: Optional[float] = None,
+    ):
+        """
+        Initialize the breaker.
+
+        Args:
+            name: Service name (for logs)
+            probe: Health check; returns True when the service is reachable
+            failure_threshold: Consecutive failures before opening
+                               (default: DucklingBreakerConfig.FAILURE_THRESHOLD)
+            probe_interval: Seconds between probes while open
+                            (default: DucklingBreakerConfig.PROBE_INTERVAL_SECONDS)
+        """
+        self.name = name
+        self.probe = probe
+        self.failure_threshold = (
+            failure_threshold if failure_threshold is not None
+            else DucklingBreakerConfig.FAILURE_THRESHOLD
+        )
+        self.probe_interval = (
+            probe_interval if probe_interval is not None
+            else DucklingBreakerConfig.PROBE_INTERVAL_SECONDS
+        )
+
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._closed_event = threading.Event()
+        self._closed_event.set()
+
+        self.times_opened = 0
+        self.short_circuited = 0
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    @property
+    def is_open(self) -> bool:
+        return self._state == OPEN
+
+    def allow_request(self) -> bool:
+        """False while open (the caller should fail fast / degrade)."""
+        if self._state == CLOSED:
+            return True
+        with self._lock:
+            self.short_circuited += 1
+        return False
+
+    def record_success(self):
+        with self._lock:
+            self._consecutive_failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self._consecutive_failures += 1
+            if self._state == OPEN or self._consecutive_failures < self.failure_threshold:
+                return
+            self._state = OPEN
+            self._opened_at = time.monotonic()
+            self._closed_event.clear()
+            self.times_opened += 1
+
+        logger.warning(
+            f"{self.name} circuit opened after {self.failure_threshold} consecutive "
+            f"failures; probing every {self.probe_interval:.0f}s"
+        )
+        threading.Thread(target=self._probe_loop, name=f"{self.name}-probe", daemon=True).start()
+
+    def _probe_loop(self):
+        while not self._closed_event.wait(self.probe_interval):
+            try:
+                healthy = self.probe()
+            except Exception:
+                healthy = False
+            if healthy:
+                self._close()
+                return
+
+    def _close(self):
+        with self._lock:
+            opened_for = time.monotonic() - (self._opened_at or time.monotonic())
+            self._state = CLOSED
+            self._consecutive_failures = 0
+            self._opened_at = None
+            self._closed_event.set()
+        logger.info(f"{self.name} circuit closed after {opened_for:.1f}s")
+
+    def reset(self):
+        """Force the breaker closed (stops the probe thread)."""
+        self._close()
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                'state': self._state,
+                'consecutive_failures': self._consecutive_failures,
+                'open_for_seconds': time.monotonic() - self._opened_at if self._opened_at else 0.0,
+                'times_opened': self.times_opened,
+                'short_circuited': self.short_circuited,
+            }
@@ -0,0 +1,159 @@
+"""
+Duckling parse cache.
+
+Syllabi and schedules repeat the same date/time strings ("Monday", "3pm",
+"Sept 14") dozens of times per session; each used to be its own HTTP call.
+Results are memoized on (normalized text, dims, locale, timezone, reference
+time truncated to the grain that can change the result):
+
+  * Day tier — results that only depend on the reference *date* (every time
+    value has day-or-coarser grain, durations, or no match). Shared by all
+    parses of the same text on the same local day.
+  * Minute tier — everything else ("3pm", "tonight", "in 2 hours"), keyed on
+    the reference minute so a session resolving its events together still
+    shares them.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from zoneinfo import ZoneInfo
+
+from config.processing import DucklingCacheConfig
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize_text(text: str) -> str:
+    # Duckling matching is case-insensitive and whitespace-tolerant
+    return " ".join(text.split()).lower()
+
+
+def _local_date(reference_time: datetime, timezone: str) -> str:
+    """Reference date in the parse timezone (what day-grain results depend on)."""
+    try:
+        return datetime.fromtimestamp(reference_time.timestamp(), ZoneInfo(timezone)).date().isoformat()
+    except Exception:
+        return reference_time.date().isoformat()
+
+
+def _result_grains(result: Dict[str, Any]) -> List[Optional[str]]:
+    value = result.get("value") or {}
+    if value.get("type") == "interval":
+        return [(value.get(side) or {}).get("grain") for side in ("from", "to") if value.get(side)]
+    return [value.get("grain")]
+
+
+def _is_date_only(results: List[Dict[str, Any]]) -> bool:
+    """True if the results can't change with the reference time of day."""
+    for result in results:
+        if result.get("dim") == "duration":
+            continue
+        if result.get("dim") != "time":
+            return False
+        if not all(grain in DucklingCacheConfig.DAY_GRAINS for grain in _result_grains(result)):
+            return False
+    return True
+
+
+class DucklingParseCache:
+    """
+    Thread-safe LRU of Duckling parse results with hit-rate metrics.
+
+    Cached result lists are shared — callers must treat them as read-only.
+    body/start/end refer to the first text that produced the entry.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Max cached results (default: DucklingCacheConfig.MAX_ENTRIES)
+        """
+        self.max_entries = max_entries if max_entries is not None else DucklingCacheConfig.MAX_ENTRIES
+        self._entries: 'OrderedDict[Tuple, List[Dict[str, Any]]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.day_hits = 0
+        self.minute_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _keys(
+        text: str,
+        reference_time: datetime,
+        timezone: str,
+        locale: str,
+        dims: Sequence[str],
+    ) -> Tuple[Tuple, Tuple]:
+        base = (_normalize_text(text), tuple(sorted(dims)), locale, timezone)
+        minute = int(reference_time.timestamp()) // 60
+        return base + ('day', _local_date(reference_time, timezone)), base + ('minute', minute)
+
+    def get(
+        self,
+        text: str,
+        reference_time: datetime,
+        timezone: str,
+        locale: str,
+        dims: Sequence[str],
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Return cached results for this parse, or None on a miss."""
+        day_key, minute_key = self._keys(text, reference_time, timezone, locale, dims)
+        with self._lock:
+            for key in (day_key, minute_key):
+                results = self._entries.get(key)
+                if results is not None:
+                    self._entries.move_to_end(key)
+                    if key is day_key:
+                        self.day_hits += 1
+                    else:
+                        self.minute_hits += 1
+                    return results
+            self.misses += 1
+            return None
+
+    def put(
+        self,
+        text: str,
+        reference_time: datetime,
+        timezone: str,
+        locale: str,
+        dims: Sequence[str],
+        results: List[Dict[str, Any]],
+    ):
+        """Cache results under the coarsest reference grain they depend on."""
+        day_key, minute_key = self._keys(text, reference_time, timezone, locale, dims)
+        key = day_key if _is_date_only(results) else minute_key
+        with self._lock:
+            self._entries[key] = results
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop all cached results and reset counters."""
+        with self._lock:
+            self._entries.clear()
+            self.day_hits = self.minute_hits = self.misses = self.evictions = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache size and hit/miss counters."""
+        with self._lock:
+            hits = self.day_hits + self.minute_hits
+            total = hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': hits,
+                'day_hits': self.day_hits,
+                'minute_hits': self.minute_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': hits / total if total > 0 else 0.0,
+            }
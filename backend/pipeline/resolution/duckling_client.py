@@ -13,10 +13,22 @@ Usage:
 import os
 import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Sequence, Union
 
-import requests
+from config.processing import ProcessingConfig, DucklingTransportConfig
+from pipeline.resolution.circuit_breaker import CircuitBreaker
+from pipeline.resolution.duckling_cache import DucklingParseCache
+from pipeline.resolution.http_transport import (
+    AsyncHTTPTransport,
+    LatencyHistogram,
+    PooledHTTPTransport,
+    TransportConnectionError,
+    TransportError,
+    TransportResponse,
+    TransportTimeout,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -28,19 +40,44 @@ _REQUEST_TIMEOUT = 5
 # Dimensions we care about for calendar events
 _CALENDAR_DIMS = ["time", "duration"]
 
+# Max concurrent in-flight requests for one parse_batch on the threaded path
+_BATCH_MAX_IN_FLIGHT = ProcessingConfig.MAX_WORKERS
+
 
 class DucklingClient:
     """HTTP client for the Duckling temporal parsing service.
 
-    Uses requests.Session for TCP connection keep-alive, reducing overhead
-    when making many sequential or concurrent calls (e.g., resolving 10+
-    events in a session).
+    Requests go through a PooledHTTPTransport whose keep-alive pool is sized
+    for MAX_WORKERS × concurrent sessions, so parallel sessions reuse warm
+    connections instead of overflowing the pool. With
+    DucklingTransportConfig.USE_ASYNC, parse_batch gathers its requests on a
+    shared asyncio client instead of a thread per request. Repeated parses
+    are served from a DucklingParseCache.
+
+    A circuit breaker fails fast (DucklingUnavailableError) after consecutive
+    connection errors / timeouts / 5xx, and probes is_available() in the
+    background until the service is back.
     """
 
-    def __init__(self, base_url: Optional[str] = None):
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        cache: Optional[DucklingParseCache] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        use_async: Optional[bool] = None,
+    ):
         self.base_url = (base_url or DUCKLING_URL).rstrip("/")
         self._parse_url = f"{self.base_url}/parse"
-        self._session = requests.Session()
+        self.latency = LatencyHistogram()
+        self._transport = PooledHTTPTransport(histogram=self.latency)
+        self._async_transport = None
+        if DucklingTransportConfig.USE_ASYNC if use_async is None else use_async:
+            try:
+                self._async_transport = AsyncHTTPTransport(histogram=self.latency)
+            except ImportError:
+                logger.warning("httpx not installed — Duckling batches use the threaded transport")
+        self.cache = cache if cache is not None else DucklingParseCache()
+        self.breaker = breaker if breaker is not None else CircuitBreaker('duckling', probe=self.is_available)
 
     def parse(
         self,
@@ -62,7 +99,8 @@ class DucklingClient:
             dims: Dimensions to extract. Defaults to ["time", "duration"].
 
         Returns:
-            List of Duckling result dicts, each containing:
+            List of Duckling result dicts (possibly shared from the parse
+            cache — do not mutate), each containing:
                 - body: matched text substring
                 - start/end: character offsets
                 - dim: "time" or "duration"
@@ -70,49 +108,181 @@ class DucklingClient:
                 - latent: whether the match is implicit
 
         Raises:
-            DucklingError: If the service is unavailable or returns an error.
+            DucklingUnavailableError: If the service is down, timing out, or
+                the circuit breaker is open (fails fast without a request).
+            DucklingError: If the service returns an invalid response.
         """
         if not text or not text.strip():
             return []
 
         ref_time = reference_time or datetime.now()
+        dims = dims or _CALENDAR_DIMS
+
+        cached = self.cache.get(text, ref_time, timezone, locale, dims)
+        if cached is not None:
+            return cached
+
+        if not self.breaker.allow_request():
+            raise DucklingUnavailableError("Duckling circuit open — skipping request")
+
+        try:
+            results = self._post_parse(text, ref_time, timezone, locale, dims)
+        except DucklingUnavailableError:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        self.cache.put(text, ref_time, timezone, locale, dims, results)
+        return results
+
+    def _post_parse(
+        self,
+        text: str,
+        ref_time: datetime,
+        timezone: str,
+        locale: str,
+        dims: List[str],
+    ) -> List[Dict[str, Any]]:
+        """POST a single parse request to Duckling (uncached)."""
+        try:
+            response = self._transport.post(
+                self._parse_url,
+                data=self._payload(text, ref_time, timezone, locale, dims),
+                timeout=_REQUEST_TIMEOUT,
+            )
+        except TransportError as e:
+            raise self._transport_error(e) from e
+        return self._decode(response)
+
+    @staticmethod
+    def _payload(
+        text: str,
+        ref_time: datetime,
+        timezone: str,
+        locale: str,
+        dims: List[str],
+    ) -> Dict[str, str]:
         # Duckling expects reference time as Unix epoch in milliseconds
         reftime_ms = int(ref_time.timestamp() * 1000)
-
-        payload = {
+        return {
             "text": text,
             "locale": locale,
             "tz": timezone,
             "reftime": str(reftime_ms),
-            "dims": json.dumps(dims or _CALENDAR_DIMS),
+            "dims": json.dumps(dims),
         }
 
-        try:
-            response = self._session.post(
-                self._parse_url,
-                data=payload,
-                timeout=_REQUEST_TIMEOUT,
-            )
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.ConnectionError as e:
-            raise DucklingError(
+    def _transport_error(self, error: TransportError) -> "DucklingError":
+        if isinstance(error, TransportConnectionError):
+            return DucklingUnavailableError(
                 f"Cannot connect to Duckling at {self.base_url}. "
                 f"Is the Duckling service running? (docker-compose up duckling)"
-            ) from e
-        except requests.exceptions.Timeout as e:
-            raise DucklingError(
+            )
+        if isinstance(error, TransportTimeout):
+            return DucklingUnavailableError(
                 f"Duckling request timed out after {_REQUEST_TIMEOUT}s"
-            ) from e
-        except requests.exceptions.HTTPError as e:
-            raise DucklingError(
+            )
+        return DucklingUnavailableError(f"Duckling request failed: {error}")
+
+    @staticmethod
+    def _decode(response: TransportResponse) -> List[Dict[str, Any]]:
+        if response.status_code >= 400:
+            error_class = DucklingUnavailableError if response.status_code >= 500 else DucklingError
+            raise error_class(
                 f"Duckling returned HTTP {response.status_code}: {response.text}"
-            ) from e
-        except (json.JSONDecodeError, ValueError) as e:
+            )
+        try:
+            return response.json()
+        except ValueError as e:
             raise DucklingError(
                 f"Invalid response from Duckling: {response.text[:200]}"
             ) from e
 
+    def parse_batch(
+        self,
+        texts: Sequence[str],
+        reference_time: Optional[datetime] = None,
+        timezone: str = "America/New_York",
+        locale: str = "en_US",
+        dims: Optional[List[str]] = None,
+    ) -> Dict[str, Union[List[Dict[str, Any]], "DucklingError"]]:
+        """
+        Parse many expressions against one reference time.
+
+        Duplicates and cached strings cost nothing; the remaining requests are
+        sent concurrently over pooled keep-alive connections (gathered on the
+        async transport when enabled, else a small thread pool), so a whole
+        session costs about one round trip. Each text is parsed on its own — results
+        are identical to calling parse() per text.
+
+        Args:
+            texts: Expressions to parse (e.g., every date/time string in a session)
+            reference_time: Shared reference time. Defaults to now.
+            timezone: IANA timezone string for the reference time.
+            locale: Locale string.
+            dims: Dimensions to extract. Defaults to ["time", "duration"].
+
+        Returns:
+            Dict of text → result list, or → DucklingError if that parse failed.
+        """
+        ref_time = reference_time or datetime.now()
+        unique = list(dict.fromkeys(t for t in texts if t and t.strip()))
+
+        if self._async_transport is not None and len(unique) > 1:
+            return self._parse_batch_async(unique, ref_time, timezone, locale, dims or _CALENDAR_DIMS)
+
+        def _parse_one(text: str):
+            try:
+                return self.parse(text, ref_time, timezone, locale, dims)
+            except DucklingError as e:
+                return e
+
+        if len(unique) <= 1:
+            return {text: _parse_one(text) for text in unique}
+
+        with ThreadPoolExecutor(max_workers=min(len(unique), _BATCH_MAX_IN_FLIGHT)) as pool:
+            return dict(zip(unique, pool.map(_parse_one, unique)))
+
+    def _parse_batch_async(
+        self,
+        texts: List[str],
+        ref_time: datetime,
+        timezone: str,
+        locale: str,
+        dims: List[str],
+    ) -> Dict[str, Union[List[Dict[str, Any]], "DucklingError"]]:
+        """parse_batch over the async transport: one gather, no thread per request."""
+        parsed: Dict[str, Union[List[Dict[str, Any]], DucklingError]] = {}
+        pending = []
+        for text in texts:
+            cached = self.cache.get(text, ref_time, timezone, locale, dims)
+            if cached is not None:
+                parsed[text] = cached
+            elif not self.breaker.allow_request():
+                parsed[text] = DucklingUnavailableError("Duckling circuit open — skipping request")
+            else:
+                pending.append(text)
+
+        responses = self._async_transport.post_many(
+            [(self._parse_url, self._payload(text, ref_time, timezone, locale, dims)) for text in pending],
+            timeout=_REQUEST_TIMEOUT,
+        ) if pending else []
+        for text, response in zip(pending, responses):
+            try:
+                if isinstance(response, TransportError):
+                    raise self._transport_error(response) from response
+                results = self._decode(response)
+            except DucklingUnavailableError as e:
+                self.breaker.record_failure()
+                parsed[text] = e
+            except DucklingError as e:
+                parsed[text] = e
+            else:
+                self.breaker.record_success()
+                self.cache.put(text, ref_time, timezone, locale, dims, results)
+                parsed[text] = results
+
+        return {text: parsed[text] for text in texts}
+
     def parse_time(
         self,
         text: str,
@@ -141,19 +311,36 @@ class DucklingClient:
             dims=["duration"],
         )
 
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get parse cache hit/miss counters."""
+        return self.cache.get_stats()
+
+    def get_latency_stats(self) -> Dict[str, Any]:
+        """Get per-request Duckling latency histogram (count, p50/p95/p99, buckets)."""
+        return self.latency.get_stats()
+
+    def get_health(self) -> Dict[str, Any]:
+        """Get circuit breaker state (closed = healthy, open = degraded)."""
+        return self.breaker.get_stats()
+
     def is_available(self) -> bool:
         """Check if the Duckling service is reachable."""
         try:
-            response = self._session.post(
+            response = self._transport.post(
                 self._parse_url,
                 data={"text": "today", "locale": "en_US", "tz": "UTC", "dims": '["time"]'},
                 timeout=2,
             )
             return response.status_code == 200
-        except requests.exceptions.RequestException:
+        except TransportError:
             return False
 
 
 class DucklingError(Exception):
     """Raised when Duckling service is unavailable or returns an error."""
     pass
+
+
+class DucklingUnavailableError(DucklingError):
+    """Raised when Duckling is down or slow, or its circuit breaker is open."""
+    pass
@@ -0,0 +1,326 @@
+"""
+Fast-path temporal parser — local, deterministic parsing of canonical strings.
+
+Most strings the extractor emits are already near-canonical ("2026-02-05",
+"February 5, 2026", "3:00 PM", "Monday"). Those are parsed here with
+precompiled regexes, with the same semantics Duckling applies, so they never
+pay a sidecar round trip. Anything not matched exactly — or whose meaning
+depends on Duckling's heuristics (e.g. "Monday" on a Monday, "3:00" without
+am/pm) — returns None and falls back to DucklingClient.
+
+When Duckling is unavailable, fallback_parse gives a best-effort local
+resolution (degraded mode): it also settles the cases fast_parse defers,
+with simple rules, then tries dateutil.
+
+Usage:
+    dt = fast_parse("3:00 PM", tz_obj, now)   # aware datetime, or None on a miss
+    dt = fallback_parse("next Tuesday", tz_obj, now)  # degraded mode only
+"""
+
+import logging
+import re
+import threading
+from datetime import date, datetime, time, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+_MONTHS = {
+    'jan': 1, 'january': 1, 'feb': 2, 'february': 2, 'mar': 3, 'march': 3,
+    'apr': 4, 'april': 4, 'may': 5, 'jun': 6, 'june': 6, 'jul': 7, 'july': 7,
+    'aug': 8, 'august': 8, 'sep': 9, 'sept': 9, 'september': 9,
+    'oct': 10, 'october': 10, 'nov': 11, 'november': 11, 'dec': 12, 'december': 12,
+}
+
+_WEEKDAYS = {
+    'monday': 0, 'mon': 0, 'tuesday': 1, 'tue': 1, 'tues': 1, 'wednesday': 2, 'wed': 2,
+    'thursday': 3, 'thu': 3, 'thur': 3, 'thurs': 3, 'friday': 4, 'fri': 4,
+    'saturday': 5, 'sat': 5, 'sunday': 6, 'sun': 6,
+}
+
+_MONTH_NAME = r'(?P<month>' + '|'.join(sorted(_MONTHS, key=len, reverse=True)) + r')\.?'
+_WEEKDAY_PREFIX = r'(?:(?:' + '|'.join(sorted(_WEEKDAYS, key=len, reverse=True)) + r')\.?,?\s+)?'
+_DAY = r'(?P<day>\d{1,2})(?:st|nd|rd|th)?'
+_MERIDIEM = r'(?P<meridiem>[ap])\.?\s?m\.?'
+
+_ISO_DATE = re.compile(r'(?P<year>\d{4})-(?P<month>\d{2})-(?P<day>\d{2})')
+_ISO_DATETIME = re.compile(
+    r'(?P<year>\d{4})-(?P<month>\d{2})-(?P<day>\d{2})[t ]'
+    r'(?P<hour>\d{2}):(?P<minute>\d{2})(?::(?P<second>\d{2}))?'
+)
+_US_NUMERIC_DATE = re.compile(r'(?P<month>\d{1,2})/(?P<day>\d{1,2})/(?P<year>\d{4})')
+_MONTH_DAY_YEAR = re.compile(_WEEKDAY_PREFIX + _MONTH_NAME + r'\s+' + _DAY + r',?\s+(?P<year>\d{4})')
+_DAY_MONTH_YEAR = re.compile(_WEEKDAY_PREFIX + _DAY + r'\s+(?:of\s+)?' + _MONTH_NAME + r',?\s+(?P<year>\d{4})')
+_RELATIVE_DAY = re.compile(r'(?P<word>today|tomorrow)')
+_WEEKDAY = re.compile(r'(?P<weekday>' + '|'.join(sorted(_WEEKDAYS, key=len, reverse=True)) + r')\.?')
+_TIME_12H = re.compile(r'(?:at\s+)?(?P<hour>\d{1,2})(?::(?P<minute>\d{2}))?\s*' + _MERIDIEM)
+_TIME_24H = re.compile(r'(?:at\s+)?(?P<hour>\d{2}):(?P<minute>\d{2})')
+_NOON = re.compile(r'(?:at\s+)?(?:noon|12\s+noon)')
+
+
+def _localize(tz_obj, naive: datetime) -> datetime:
+    if hasattr(tz_obj, 'localize'):
+        return tz_obj.localize(naive)
+    return naive.replace(tzinfo=tz_obj)
+
+
+def _at_midnight(tz_obj, day: date) -> datetime:
+    return _localize(tz_obj, datetime.combine(day, time()))
+
+
+def _next_time(tz_obj, now: datetime, hour: int, minute: int, grain_minutes: bool) -> datetime:
+    """Next occurrence of a wall-clock time, like Duckling: today unless its grain is already past."""
+    local_now = now.astimezone(tz_obj)
+    current = local_now.replace(second=0, microsecond=0, tzinfo=None)
+    if not grain_minutes:
+        current = current.replace(minute=0)
+    candidate = datetime.combine(local_now.date(), time(hour, minute))
+    if candidate < current:
+        candidate += timedelta(days=1)
+    return _localize(tz_obj, candidate)
+
+
+# Each handler returns an aware datetime, or None to fall back to Duckling
+
+def _iso_date(m, tz_obj, now):
+    return _at_midnight(tz_obj, date(int(m['year']), int(m['month']), int(m['day'])))
+
+
+def _iso_datetime(m, tz_obj, now):
+    return _localize(tz_obj, datetime(
+        int(m['year']), int(m['month']), int(m['day']),
+        int(m['hour']), int(m['minute']), int(m['second'] or 0),
+    ))
+
+
+def _named_month_date(m, tz_obj, now):
+    return _at_midnight(tz_obj, date(int(m['year']), _MONTHS[m['month']], int(m['day'])))
+
+
+def _relative_day(m, tz_obj, now):
+    today = now.astimezone(tz_obj).date()
+    return _at_midnight(tz_obj, today + timedelta(days=1 if m['word'] == 'tomorrow' else 0))
+
+
+def _weekday(m, tz_obj, now):
+    today = now.astimezone(tz_obj).date()
+    days_ahead = (_WEEKDAYS[m['weekday']] - today.weekday()) % 7
+    if days_ahead == 0:
+        return None  # "Monday" on a Monday — leave to Duckling
+    return _at_midnight(tz_obj, today + timedelta(days=days_ahead))
+
+
+def _time_12h(m, tz_obj, now):
+    hour = int(m['hour'])
+    minute = int(m['minute'] or 0)
+    if not 1 <= hour <= 12 or minute > 59:
+        return None
+    hour = hour % 12 + (12 if m['meridiem'] == 'p' else 0)
+    return _next_time(tz_obj, now, hour, minute, grain_minutes=m['minute'] is not None)
+
+
+def _time_24h(m, tz_obj, now):
+    hour, minute = int(m['hour']), int(m['minute'])
+    if not 13 <= hour <= 23 or minute > 59:
+        return None  # Hours that read as 12-hour are ambiguous for Duckling
+    return _next_time(tz_obj, now, hour, minute, grain_minutes=True)
+
+
+def _noon(m, tz_obj, now):
+    return _next_time(tz_obj, now, 12, 0, grain_minutes=False)
+
+
+# (format name, pattern, handler) — tried in order, full-string matches only
+_FORMATS: List[Tuple[str, 're.Pattern', Callable]] = [
+    ('iso_date', _ISO_DATE, _iso_date),
+    ('iso_datetime', _ISO_DATETIME, _iso_datetime),
+    ('us_numeric_date', _US_NUMERIC_DATE, _iso_date),
+    ('month_day_year', _MONTH_DAY_YEAR, _named_month_date),
+    ('day_month_year', _DAY_MONTH_YEAR, _named_month_date),
+    ('relative_day', _RELATIVE_DAY, _relative_day),
+    ('weekday', _WEEKDAY, _weekday),
+    ('time_12h', _TIME_12H, _time_12h),
+    ('time_24h', _TIME_24H, _time_24h),
+    ('noon', _NOON, _noon),
+]
+
+
+class FastPathStats:
+    """Thread-safe per-format hit counters for the fast path."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.format_hits: Dict[str, int] = {name: 0 for name, _, _ in _FORMATS}
+        self.misses = 0
+
+    def record(self, format_name: Optional[str]):
+        with self._lock:
+            if format_name is None:
+                self.misses += 1
+            else:
+                self.format_hits[format_name] += 1
+
+    def reset(self):
+        with self._lock:
+            self.format_hits = {name: 0 for name in self.format_hits}
+            self.misses = 0
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            hits = sum(self.format_hits.values())
+            total = hits + self.misses
+            return {
+                'hits': hits,
+                'misses': self.misses,
+                'hit_rate': hits / total if total > 0 else 0.0,
+                'format_hits': dict(self.format_hits),
+            }
+
+
+_stats = FastPathStats()
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.split()).lower()
+
+
+def _match(text: str):
+    normalized = _normalize(text)
+    for name, pattern, handler in _FORMATS:
+        m = pattern.fullmatch(normalized)
+        if m:
+            return name, m, handler
+    return None
+
+
+def fast_parse(text: str, tz_obj, now: datetime, record: bool = True) -> Optional[datetime]:
+    """
+    Parse a canonical date/time string locally.
+
+    Args:
+        text: Date or time expression
+        tz_obj: Timezone to interpret it in (pytz or zoneinfo)
+        now: Aware reference time
+        record: Count the outcome in the fast-path stats
+
+    Returns:
+        Timezone-aware datetime (same value Duckling would resolve), or None
+        if the string should go to Duckling.
+    """
+    if not text:
+        return None
+    found = _match(text)
+    if found is None:
+        if record:
+            _stats.record(None)
+        return None
+
+    name, m, handler = found
+    try:
+        result = handler(m, tz_obj, now)
+    except ValueError:
+        result = None  # e.g. "2026-02-30" — let Duckling decide
+    if record:
+        _stats.record(name if result is not None else None)
+    return result
+
+
+# =====================================================================
+# Degraded mode (Duckling unavailable)
+# =====================================================================
+
+_RELATIVE_WEEKDAY = re.compile(r'(?:(?P<modifier>this|next|on)\s+)?' + _WEEKDAY.pattern)
+_MONTH_DAY = re.compile(_WEEKDAY_PREFIX + _MONTH_NAME + r'\s+' + _DAY)
+_DAY_MONTH = re.compile(_WEEKDAY_PREFIX + r'(?:the\s+)?' + _DAY + r'\s+(?:of\s+)?' + _MONTH_NAME)
+_BARE_TIME = re.compile(r'(?:at\s+)?(?P<hour>\d{1,2}):(?P<minute>\d{2})')
+
+_degraded_count = 0
+_degraded_lock = threading.Lock()
+
+
+def _lenient_parse(normalized: str, tz_obj, now: datetime) -> Optional[datetime]:
+    today = now.astimezone(tz_obj).date()
+
+    m = _RELATIVE_WEEKDAY.fullmatch(normalized)
+    if m:
+        days_ahead = (_WEEKDAYS[m['weekday']] - today.weekday()) % 7
+        if m['modifier'] == 'next' and days_ahead == 0:
+            days_ahead = 7
+        return _at_midnight(tz_obj, today + timedelta(days=days_ahead))
+
+    m = _MONTH_DAY.fullmatch(normalized) or _DAY_MONTH.fullmatch(normalized)
+    if m:
+        # Next occurrence, today included
+        candidate = date(today.year, _MONTHS[m['month']], int(m['day']))
+        if candidate < today:
+            candidate = candidate.replace(year=today.year + 1)
+        return _at_midnight(tz_obj, candidate)
+
+    m = _BARE_TIME.fullmatch(normalized)
+    if m:
+        hour, minute = int(m['hour']), int(m['minute'])
+        if hour > 23 or minute > 59:
+            return None
+        # Without am/pm, 1:00-6:59 is almost always afternoon for events
+        if 1 <= hour <= 6 and not m['hour'].startswith('0'):
+            hour += 12
+        return _next_time(tz_obj, now, hour, minute, grain_minutes=True)
+
+    return None
+
+
+def fallback_parse(text: str, tz_obj, now: datetime) -> Optional[datetime]:
+    """
+    Best-effort local resolution for when Duckling is unavailable.
+
+    Tries the fast path, then lenient rules (relative weekdays, month/day
+    without a year, times without am/pm), then dateutil. Less precise than
+    Duckling for free-form phrases, but keeps the pipeline responsive.
+
+    Returns:
+        Timezone-aware datetime, or None if nothing could be parsed.
+    """
+    global _degraded_count
+    if not text or not text.strip():
+        return None
+    with _degraded_lock:
+        _degraded_count += 1
+
+    result = fast_parse(text, tz_obj, now, record=False)
+    if result is not None:
+        return result
+
+    normalized = _normalize(text)
+    try:
+        result = _lenient_parse(normalized, tz_obj, now)
+    except ValueError:
+        result = None
+    if result is not None:
+        return result
+
+    from dateutil import parser as dateutil_parser
+    try:
+        local_midnight = datetime.combine(now.astimezone(tz_obj).date(), time())
+        parsed = dateutil_parser.parse(normalized, default=local_midnight)
+    except (ValueError, OverflowError):
+        return None
+    if parsed.tzinfo is not None:
+        return parsed.astimezone(tz_obj)
+    return _localize(tz_obj, parsed)
+
+
+def get_fast_path_stats() -> Dict:
+    """Per-format hit counts and overall hit rate of the fast path."""
+    stats = _stats.get_stats()
+    with _degraded_lock:
+        stats['degraded_parses'] = _degraded_count
+    return stats
+
+
+def reset_fast_path_stats():
+    """Reset fast-path counters."""
+    global _degraded_count
+    _stats.reset()
+    with _degraded_lock:
+        _degraded_count = 0
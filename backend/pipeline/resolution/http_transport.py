@@ -0,0 +1,266 @@
+"""
+HTTP transport for sidecar services (Duckling).
+
+PooledHTTPTransport wraps a requests.Session whose HTTPAdapter pool is sized
+for the worker's real concurrency (MAX_WORKERS × concurrent sessions) instead
+of requests' default 10, with TCP keep-alive on pooled sockets.
+
+AsyncHTTPTransport (opt-in, uses httpx) runs one event loop on a daemon
+thread with a shared httpx.AsyncClient, so a batch of requests is gathered
+concurrently without a thread per request and connections stay warm across
+sessions.
+
+Both record per-request latency into a LatencyHistogram.
+"""
+
+import asyncio
+import bisect
+import json
+import logging
+import socket
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+
+from config.processing import DucklingTransportConfig
+
+logger = logging.getLogger(__name__)
+
+
+class TransportError(Exception):
+    """Request failed before an HTTP response was received."""
+    pass
+
+
+class TransportTimeout(TransportError):
+    """Request timed out."""
+    pass
+
+
+class TransportConnectionError(TransportError):
+    """Could not connect to the service."""
+    pass
+
+
+class TransportResponse:
+    """Transport-neutral HTTP response."""
+
+    def __init__(self, status_code: int, text: str):
+        self.status_code = status_code
+        self.text = text
+
+    def json(self) -> Any:
+        return json.loads(self.text)
+
+
+class LatencyHistogram:
+    """Thread-safe fixed-bucket latency histogram (milliseconds)."""
+
+    BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+    def __init__(self, buckets_ms: Optional[Sequence[float]] = None):
+        if buckets_ms is not None:
+            self.BUCKETS_MS = tuple(buckets_ms)
+        self._lock = threading.Lock()
+        self._counts = [0] * (len(self.BUCKETS_MS) + 1)
+        self._errors = 0
+        self._total_ms = 0.0
+        self._max_ms = 0.0
+
+    def observe(self, elapsed_ms: float, error: bool = False):
+        with self._lock:
+            self._counts[bisect.bisect_left(self.BUCKETS_MS, elapsed_ms)] += 1
+            self._total_ms += elapsed_ms
+            self._max_ms = max(self._max_ms, elapsed_ms)
+            if error:
+                self._errors += 1
+
+    def _percentile(self, counts: List[int], total: int, q: float) -> float:
+        """Upper bound of the bucket holding the q-th percentile."""
+        target = q * total
+        running = 0
+        for i, count in enumerate(counts):
+            running += count
+            if running >= target:
+                return float(self.BUCKETS_MS[i]) if i < len(self.BUCKETS_MS) else self._max_ms
+        return self._max_ms
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = list(self._counts)
+            total = sum(counts)
+            labels = [f"le_{b}ms" for b in self.BUCKETS_MS] + ['le_inf']
+            return {
+                'count': total,
+                'errors': self._errors,
+                'avg_ms': self._total_ms / total if total else 0.0,
+                'max_ms': self._max_ms,
+                'p50_ms': self._percentile(counts, total, 0.50) if total else 0.0,
+                'p95_ms': self._percentile(counts, total, 0.95) if total else 0.0,
+                'p99_ms': self._percentile(counts, total, 0.99) if total else 0.0,
+                'buckets': dict(zip(labels, counts)),
+            }
+
+    def reset(self):
+        with self._lock:
+            self._counts = [0] * (len(self.BUCKETS_MS) + 1)
+            self._errors = 0
+            self._total_ms = 0.0
+            self._max_ms = 0.0
+
+
+class _KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter with TCP keep-alive on pooled connections and no retries."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs['socket_options'] = HTTPConnection.default_socket_options + [
+            (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+        ]
+        super().init_poolmanager(*args, **kwargs)
+
+
+class PooledHTTPTransport:
+    """Thread-safe pooled, keep-alive HTTP transport (blocking)."""
+
+    def __init__(self, pool_maxsize: Optional[int] = None, histogram: Optional[LatencyHistogram] = None):
+        """
+        Initialize the transport.
+
+        Args:
+            pool_maxsize: Max pooled connections per host
+                          (default: DucklingTransportConfig.POOL_MAXSIZE)
+            histogram: Latency histogram to record into (default: a new one)
+        """
+        self.pool_maxsize = pool_maxsize or DucklingTransportConfig.POOL_MAXSIZE
+        self.histogram = histogram or LatencyHistogram()
+
+        adapter = _KeepAliveAdapter(
+            pool_connections=1,  # One sidecar host
+            pool_maxsize=self.pool_maxsize,
+            max_retries=0,
+        )
+        self._session = requests.Session()
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+        self._session.headers['Connection'] = 'keep-alive'
+
+    def post(self, url: str, data: Dict[str, str], timeout: float) -> TransportResponse:
+        """
+        POST form data.
+
+        Raises:
+            TransportTimeout: If the request timed out
+            TransportConnectionError: If the connection failed
+            TransportError: For any other request failure
+        """
+        start = time.perf_counter()
+        try:
+            response = self._session.post(url, data=data, timeout=timeout)
+        except requests.exceptions.Timeout as e:
+            self.histogram.observe((time.perf_counter() - start) * 1000, error=True)
+            raise TransportTimeout(str(e)) from e
+        except requests.exceptions.ConnectionError as e:
+            self.histogram.observe((time.perf_counter() - start) * 1000, error=True)
+            raise TransportConnectionError(str(e)) from e
+        except requests.exceptions.RequestException as e:
+            self.histogram.observe((time.perf_counter() - start) * 1000, error=True)
+            raise TransportError(str(e)) from e
+
+        self.histogram.observe((time.perf_counter() - start) * 1000, error=response.status_code >= 500)
+        return TransportResponse(response.status_code, response.text)
+
+    def close(self):
+        self._session.close()
+
+
+class AsyncHTTPTransport:
+    """
+    Shared httpx.AsyncClient on a background event loop.
+
+    Callers stay synchronous: post_many() submits all requests to the loop,
+    gathers them concurrently and blocks until they finish.
+    """
+
+    def __init__(self, max_connections: Optional[int] = None, histogram: Optional[LatencyHistogram] = None):
+        """
+        Initialize the transport.
+
+        Args:
+            max_connections: Max open connections
+                             (default: DucklingTransportConfig.POOL_MAXSIZE)
+            histogram: Latency histogram to record into (default: a new one)
+
+        Raises:
+            ImportError: If httpx is not installed
+        """
+        import httpx  # Imported lazily — only needed when async transport is enabled
+
+        self._httpx = httpx
+        self.max_connections = max_connections or DucklingTransportConfig.POOL_MAXSIZE
+        self.histogram = histogram or LatencyHistogram()
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='http-transport-loop', daemon=True)
+        self._thread.start()
+        self._client = asyncio.run_coroutine_threadsafe(self._create_client(), self._loop).result()
+
+    async def _create_client(self):
+        return self._httpx.AsyncClient(
+            limits=self._httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+                keepalive_expiry=DucklingTransportConfig.KEEPALIVE_EXPIRY_SECONDS,
+            ),
+            headers={'Connection': 'keep-alive'},
+        )
+
+    async def _post(self, url: str, data: Dict[str, str], timeout: float) -> Union[TransportResponse, TransportError]:
+        start = time.perf_counter()
+        try:
+            response = await self._client.post(url, data=data, timeout=timeout)
+        except self._httpx.TimeoutException as e:
+            self.histogram.observe((time.perf_counter() - start) * 1000, error=True)
+            return TransportTimeout(str(e))
+        except self._httpx.ConnectError as e:
+            self.histogram.observe((time.perf_counter() - start) * 1000, error=True)
+            return TransportConnectionError(str(e))
+        except self._httpx.HTTPError as e:
+            self.histogram.observe((time.perf_counter() - start) * 1000, error=True)
+            return TransportError(str(e))
+
+        self.histogram.observe((time.perf_counter() - start) * 1000, error=response.status_code >= 500)
+        return TransportResponse(response.status_code, response.text)
+
+    async def _gather(self, requests_: Sequence[Tuple[str, Dict[str, str]]], timeout: float):
+        return await asyncio.gather(*(self._post(url, data, timeout) for url, data in requests_))
+
+    def post_many(
+        self,
+        requests_: Sequence[Tuple[str, Dict[str, str]]],
+        timeout: float,
+    ) -> List[Union[TransportResponse, TransportError]]:
+        """
+        POST many (url, form data) requests concurrently.
+
+        Returns:
+            One TransportResponse or TransportError per request, in order
+        """
+        if not requests_:
+            return []
+        future = asyncio.run_coroutine_threadsafe(self._gather(requests_, timeout), self._loop)
+        return future.result()
+
+    def post(self, url: str, data: Dict[str, str], timeout: float) -> TransportResponse:
+        """Blocking single POST (same errors as PooledHTTPTransport.post)."""
+        result = self.post_many([(url, data)], timeout)[0]
+        if isinstance(result, TransportError):
+            raise result
+        return result
+
+    def close(self):
+        asyncio.run_coroutine_threadsafe(self._client.aclose(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
@@ -0,0 +1,157 @@
+"""
+Pre-expanded recurring events for conflict checks.
+
+RecurringOccurrenceIndex expands a user's recurring events once (same
+expand_rrule horizon and cap) and stores the occurrences as sorted int64
+epoch-microsecond start/end arrays. An overlap query is two searchsorted
+calls plus a vectorized end-time mask, instead of re-expanding every RRULE
+and looping over up to MAX_OCCURRENCES pairs per candidate event.
+
+Indexes are cached per user in the UserContextCache (RECURRING_OCCURRENCES)
+and dropped on event writes.
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from dateutil.parser import isoparse
+
+from pipeline.resolution.rrule_utils import expand_rrule
+
+logger = logging.getLogger(__name__)
+
+
+_EPOCH_AWARE = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_EPOCH_NAIVE = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _is_aware(dt: datetime) -> bool:
+    return dt.utcoffset() is not None
+
+
+def _to_epoch_us(dt: datetime) -> int:
+    """Exact epoch microseconds (naive datetimes are read as wall-clock UTC)."""
+    return (dt - (_EPOCH_AWARE if _is_aware(dt) else _EPOCH_NAIVE)) // _MICROSECOND
+
+
+class _Partition:
+    """Occurrences of one datetime kind (aware or naive), sorted by start."""
+
+    def __init__(self, rows: List[Tuple[int, int, int, int]]):
+        # rows: (start_us, end_us, event_pos, occ_pos)
+        table = np.array(rows, dtype=np.int64).reshape(-1, 4)
+        table = table[np.argsort(table[:, 0], kind='stable')]
+        self.starts = np.ascontiguousarray(table[:, 0])
+        self.ends = np.ascontiguousarray(table[:, 1])
+        self.event_pos = np.ascontiguousarray(table[:, 2])
+        self.occ_pos = np.ascontiguousarray(table[:, 3])
+        self.max_duration = int((self.ends - self.starts).max()) if len(table) else 0
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def overlapping(self, start_us: int, end_us: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(event_pos, occ_pos) of occurrences with start < end_us and end > start_us."""
+        # Any overlap has start > start_us - max_duration, and every start < end_us
+        lo = np.searchsorted(self.starts, start_us - self.max_duration, side='right')
+        hi = np.searchsorted(self.starts, end_us, side='left')
+        if hi <= lo:
+            return self.event_pos[:0], self.occ_pos[:0]
+        hits = lo + np.flatnonzero(self.ends[lo:hi] > start_us)
+        return self.event_pos[hits], self.occ_pos[hits]
+
+
+class RecurringOccurrenceIndex:
+    """
+    Sorted occurrence arrays for a user's recurring events.
+
+    Example:
+        >>> index = RecurringOccurrenceIndex(Event.get_recurring_events(user_id))
+        >>> for rec_event, occ_start, occ_end in index.overlapping(start, end, exclude_ids):
+        ...     print(rec_event['summary'], occ_start)
+    """
+
+    def __init__(self, recurring_events: Iterable[Dict[str, Any]]):
+        """
+        Expand and index recurring events.
+
+        Args:
+            recurring_events: Rows with id, summary, start_time, end_time,
+                              recurrence (as from Event.get_recurring_events)
+        """
+        self.events: List[Dict[str, Any]] = []
+        self._occurrences: List[List[Tuple[datetime, datetime]]] = []
+        rows: Dict[bool, List[Tuple[int, int, int, int]]] = {True: [], False: []}
+
+        for rec_event in recurring_events:
+            rec_start = rec_event.get('start_time')
+            rec_end = rec_event.get('end_time')
+            rec_rules = rec_event.get('recurrence')
+            if not rec_start or not rec_end or not rec_rules:
+                continue
+
+            try:
+                rec_dt_start = isoparse(rec_start)
+                rec_dt_end = isoparse(rec_end)
+                occurrences = expand_rrule(rec_rules, rec_dt_start, rec_dt_end - rec_dt_start)
+            except (ValueError, TypeError):
+                continue
+            if not occurrences:
+                continue
+
+            event_pos = len(self.events)
+            self.events.append(rec_event)
+            self._occurrences.append(occurrences)
+            aware = _is_aware(rec_dt_start)
+            for occ_pos, (occ_start, occ_end) in enumerate(occurrences):
+                rows[aware].append((_to_epoch_us(occ_start), _to_epoch_us(occ_end), event_pos, occ_pos))
+
+        self._aware = _Partition(rows[True])
+        self._naive = _Partition(rows[False])
+
+    def __len__(self) -> int:
+        """Total indexed occurrences."""
+        return len(self._aware) + len(self._naive)
+
+    def overlapping(
+        self,
+        start: datetime,
+        end: datetime,
+        exclude_ids: Optional[Iterable[str]] = None,
+    ) -> List[Tuple[Dict[str, Any], datetime, datetime]]:
+        """
+        Find occurrences overlapping [start, end).
+
+        Matches rrule_utils.times_overlap over every expanded occurrence,
+        including its handling of naive vs aware datetimes (they never
+        overlap each other).
+
+        Args:
+            start: Candidate start
+            end: Candidate end
+            exclude_ids: Recurring event IDs to skip (e.g. the session's own events)
+
+        Returns:
+            (recurring event row, occurrence start, occurrence end) tuples,
+            ordered by event then by expansion order
+        """
+        aware = _is_aware(start)
+        if _is_aware(end) != aware:
+            return []
+        partition = self._aware if aware else self._naive
+        if not len(partition):
+            return []
+
+        event_pos, occ_pos = partition.overlapping(_to_epoch_us(start), _to_epoch_us(end))
+        exclude_ids = set(exclude_ids or ())
+        results = []
+        for i in np.lexsort((occ_pos, event_pos)):
+            rec_event = self.events[event_pos[i]]
+            if rec_event.get('id') in exclude_ids:
+                continue
+            occ_start, occ_end = self._occurrences[event_pos[i]][occ_pos[i]]
+            results.append((rec_event, occ_start, occ_end))
+        return results
@@ -2,7 +2,8 @@
 RESOLVE stage — deterministic temporal resolution.
 
 Converts ExtractedEvent (with NL date/time strings) into CalendarEvent
-(with ISO 8601 CalendarDateTime) using Duckling for parsing.
+(with ISO 8601 CalendarDateTime). Canonical strings are parsed locally by
+the fast path (fast_parser); everything else goes to Duckling.
 
 Only resolves fields that were explicitly extracted. If a field is None,
 it stays None for PERSONALIZE to handle later.
@@ -12,17 +13,21 @@ Usage:
 
     extracted = extractor.execute(...)  # Returns List[ExtractedEvent]
     calendar_event = resolve_temporal(extracted[0], user_timezone="America/New_York")
+
+    # Whole session: one batched Duckling pass, then no further I/O
+    results = resolve_temporal_batch(extracted, user_timezone="America/New_York")
 """
 
 import logging
 import re
 from datetime import datetime, timedelta
-from typing import Optional, Tuple, List
+from typing import Optional, Tuple, List, Dict, Union
 
 import pytz
 
 from pipeline.models import ExtractedEvent, CalendarEvent, CalendarDateTime
-from pipeline.resolution.duckling_client import DucklingClient, DucklingError
+from pipeline.resolution.duckling_client import DucklingClient, DucklingError, DucklingUnavailableError
+from pipeline.resolution.fast_parser import fast_parse, fallback_parse
 
 logger = logging.getLogger(__name__)
 
@@ -37,6 +42,21 @@ def _get_client() -> DucklingClient:
     return _duckling_client
 
 
+def get_duckling_cache_stats() -> dict:
+    """Hit/miss counters of the shared client's Duckling parse cache."""
+    return _get_client().get_cache_stats()
+
+
+def get_duckling_latency_stats() -> dict:
+    """Per-request latency histogram of the shared Duckling client."""
+    return _get_client().get_latency_stats()
+
+
+def get_duckling_health() -> dict:
+    """Circuit breaker state of the shared Duckling client."""
+    return _get_client().get_health()
+
+
 # Timezone alias map: common abbreviations → IANA names
 _TZ_ALIASES = {
     "est": "America/New_York",
@@ -81,12 +101,87 @@ def resolve_temporal(
     - Recurring with exclusions: excluded_dates → EXDATE entries
     """
     tz_obj = pytz.timezone(user_timezone)
+    now = _reference_now(tz_obj, reference_time)
+    return _resolve_event(extracted, user_timezone, tz_obj, now, _get_client())
+
+
+def resolve_temporal_batch(
+    extracted_events: List[ExtractedEvent],
+    user_timezone: str = "America/New_York",
+    reference_time: Optional[datetime] = None,
+) -> List[Union[CalendarEvent, Exception]]:
+    """
+    Resolve a whole session's events with one batched Duckling pass.
+
+    Every temporal string (dates, times, excluded dates) across the events
+    that the fast path doesn't cover is deduplicated and parsed up front via
+    DucklingClient.parse_batch; the per-event resolution then runs without
+    further I/O.
+
+    Returns:
+        One entry per input event, in order: the CalendarEvent, or the
+        exception resolve_temporal would have raised for it.
+    """
+    tz_obj = pytz.timezone(user_timezone)
+    now = _reference_now(tz_obj, reference_time)
+
+    texts = []
+    for extracted in extracted_events:
+        texts.extend([extracted.start_date, extracted.end_date, extracted.start_time, extracted.end_time])
+        texts.extend(extracted.excluded_dates or [])
+    # Canonical strings are parsed locally; only the rest go to Duckling
+    texts = [
+        t.strip() for t in texts
+        if t and t.strip() and fast_parse(t.strip(), tz_obj, now, record=False) is None
+    ]
+
+    client = _get_client()
+    prefetched = _PrefetchedParses(
+        client.parse_batch(texts, reference_time=now, timezone=str(tz_obj), dims=["time"]),
+        client,
+    )
+
+    results: List[Union[CalendarEvent, Exception]] = []
+    for extracted in extracted_events:
+        try:
+            results.append(_resolve_event(extracted, user_timezone, tz_obj, now, prefetched))
+        except Exception as e:
+            results.append(e)
+    return results
+
+
+class _PrefetchedParses:
+    """Duck-typed stand-in for DucklingClient serving parse_batch results."""
+
+    def __init__(self, parsed: Dict[str, Union[list, DucklingError]], client: DucklingClient):
+        self._parsed = parsed
+        self._client = client
+
+    def parse_time(self, text: str, reference_time: datetime, timezone: str) -> list:
+        result = self._parsed.get(text)
+        if result is None:
+            # Not part of the batch — fall back to a (cached) single parse
+            return self._client.parse_time(text, reference_time=reference_time, timezone=timezone)
+        if isinstance(result, DucklingError):
+            raise result
+        return result
+
+
+def _reference_now(tz_obj, reference_time: Optional[datetime]) -> datetime:
     now = reference_time or datetime.now(tz_obj)
     if now.tzinfo is None:
         now = tz_obj.localize(now)
+    return now
 
-    client = _get_client()
 
+def _resolve_event(
+    extracted: ExtractedEvent,
+    user_timezone: str,
+    tz_obj,
+    now: datetime,
+    client: DucklingClient,
+) -> CalendarEvent:
+    """Resolve one event against a reference time (see resolve_temporal)."""
     # ── Resolve start date ────────────────────────────────────────────
     start_resolved = _resolve_date(extracted.start_date, client, tz_obj, now)
     if start_resolved is None:
@@ -220,13 +315,21 @@ def _duckling_parse_datetime(
     tz_obj,
     now: datetime,
 ) -> Optional[datetime]:
-    """Parse a datetime expression via Duckling."""
+    """Parse a datetime expression locally if canonical, else via Duckling."""
+    fast = fast_parse(text, tz_obj, now)
+    if fast is not None:
+        return fast
+
     try:
         results = client.parse_time(
             text=text,
             reference_time=now,
             timezone=str(tz_obj),
         )
+    except DucklingUnavailableError as e:
+        # Degraded mode: resolve locally rather than block or drop the field
+        logger.warning(f"Duckling unavailable, resolving '{text}' locally: {e}")
+        return fallback_parse(text, tz_obj, now)
     except DucklingError as e:
         logger.error(f"Duckling error parsing '{text}': {e}")
         return None
@@ -0,0 +1,349 @@
+"""
+Pipeline job scheduler.
+
+Session pipelines (text, file upload, inbound email) and background
+maintenance (embeddings, calendar enrichment, pattern refresh) all run on
+one bounded pool of worker threads instead of a thread per request, so a
+burst queues up rather than piling threads onto the GIL and the embedding
+model.
+
+Jobs are submitted to a lane (see SessionSchedulerConfig.LANES). Lanes are
+served in priority order — interactive, then email, then maintenance — and
+each has its own concurrency cap and queue limit. Interactive and email
+sessions share WORKERS slots; maintenance has its own slots but yields:
+it only starts when no higher lane is waiting and sessions leave a slot
+idle, so enrichment and refresh LLM calls never delay an upload.
+
+Within a lane, waiting jobs are kept in per-user FIFO queues served
+round-robin, so one user's burst can't starve everyone else. When a lane is
+full, or a user already has their share waiting, submit() raises
+SchedulerSaturated and session routes answer 429. While a session waits,
+its position is pushed to the SSE stream as stage 'queued'.
+
+The scheduler is per process: with several gunicorn workers, fairness,
+admission limits and queue positions each cover one worker's jobs only.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from config.processing import LaneLimits, SessionSchedulerConfig
+from pipeline.resolution.http_transport import LatencyHistogram
+from pipeline.stream import get_stream
+
+logger = logging.getLogger(__name__)
+
+# Lanes (priority order is the order of SessionSchedulerConfig.LANES)
+INTERACTIVE = 'interactive'
+EMAIL = 'email'
+MAINTENANCE = 'maintenance'
+
+
+class SchedulerSaturated(Exception):
+    """A lane's queue is full (globally or for this user)."""
+
+    def __init__(self, message: str, retry_after: int = SessionSchedulerConfig.RETRY_AFTER_SECONDS):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class _Job:
+    __slots__ = ('job_id', 'user_id', 'fn', 'args', 'lane', 'enqueued_at')
+
+    def __init__(self, job_id: str, user_id: str, fn: Callable, args: tuple, lane: '_Lane'):
+        self.job_id = job_id
+        self.user_id = user_id
+        self.fn = fn
+        self.args = args
+        self.lane = lane
+        self.enqueued_at = time.monotonic()
+
+
+class _Lane:
+    """Per-user round-robin queues, limits and stats for one lane."""
+
+    def __init__(self, name: str, limits: LaneLimits):
+        self.name = name
+        self.limits = limits
+        # user_id → waiting jobs; a user moves to the back after each dispatch
+        self.queues: 'OrderedDict[str, Deque[_Job]]' = OrderedDict()
+        self.queued = 0
+        self.running = 0
+        self.wait_ms = LatencyHistogram(SessionSchedulerConfig.WAIT_BUCKETS_MS)
+        self.run_ms = LatencyHistogram(SessionSchedulerConfig.WAIT_BUCKETS_MS)
+        self.submitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+
+    def pop(self) -> _Job:
+        user_id, user_queue = next(iter(self.queues.items()))
+        job = user_queue.popleft()
+        if user_queue:
+            self.queues.move_to_end(user_id)
+        else:
+            del self.queues[user_id]
+        self.queued -= 1
+        return job
+
+    def dispatch_order(self) -> List[_Job]:
+        """Waiting jobs in the order this lane would start them."""
+        rounds = [list(q) for q in self.queues.values()]
+        depth = max((len(r) for r in rounds), default=0)
+        return [jobs[i] for i in range(depth) for jobs in rounds if i < len(jobs)]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'workers': self.limits.workers,
+            'running': self.running,
+            'queued': self.queued,
+            'queued_users': len(self.queues),
+            'max_queued': self.limits.max_queued,
+            'submitted': self.submitted,
+            'rejected': self.rejected,
+            'completed': self.completed,
+            'failed': self.failed,
+            'wait': self.wait_ms.get_stats(),
+            'run': self.run_ms.get_stats(),
+        }
+
+
+class SessionScheduler:
+    """Bounded worker pool with priority lanes, per-user fairness and admission control."""
+
+    def __init__(
+        self,
+        workers: int = SessionSchedulerConfig.WORKERS,
+        lanes: Optional[Dict[str, LaneLimits]] = None,
+    ):
+        lanes = SessionSchedulerConfig.LANES if lanes is None else lanes
+        self.workers = max(1, workers)
+        self._lanes: Dict[str, _Lane] = {
+            name: _Lane(name, limits) for name, limits in lanes.items()
+        }
+        # Session lanes share `workers` slots; yielding lanes get their own
+        self._threads_needed = self.workers + sum(
+            lane.limits.workers for lane in self._lanes.values() if lane.limits.yields
+        )
+        self._waiting: Dict[str, _Lane] = {}  # job_id → lane, for dedup
+        self._condition = threading.Condition()
+        # Last position pushed to each waiting job's stream; guarded by _publish_lock
+        self._published: Dict[str, int] = {}
+        self._publish_lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+
+    # ------------------------------------------------------------------
+    # Submission
+    # ------------------------------------------------------------------
+
+    def _lane(self, lane: str) -> _Lane:
+        try:
+            return self._lanes[lane]
+        except KeyError:
+            raise ValueError(f"Unknown scheduler lane: {lane}")
+
+    def check_admission(self, user_id: str, lane: str = INTERACTIVE):
+        """
+        Raise SchedulerSaturated if a new job for this user would be rejected.
+
+        Lets routes fail fast before uploading files or creating the session
+        row. submit() checks again, so a race between the two is still safe.
+        """
+        with self._condition:
+            self._check_admission_locked(self._lane(lane), user_id)
+
+    def submit(self, job_id: str, user_id: str, fn: Callable, *args: Any, lane: str = INTERACTIVE) -> int:
+        """
+        Queue fn(*args) to run on a worker.
+
+        Args:
+            job_id: Session ID (its SSE stream gets queue updates) or a key
+                    for background work. A job_id that is already waiting is
+                    not queued twice.
+            user_id: Owner, for per-user fairness and limits
+            fn: Callable to run (e.g. SessionProcessor.process_text_session)
+            *args: Arguments for fn
+            lane: INTERACTIVE, EMAIL or MAINTENANCE
+
+        Returns:
+            Number of jobs that will start before this one (0 = next)
+
+        Raises:
+            SchedulerSaturated: The lane is full globally or for this user
+        """
+        target = self._lane(lane)
+        with self._condition:
+            if job_id not in self._waiting:
+                self._check_admission_locked(target, user_id)
+                self._ensure_workers()
+                target.queues.setdefault(user_id, deque()).append(_Job(job_id, user_id, fn, args, target))
+                target.queued += 1
+                target.submitted += 1
+                self._waiting[job_id] = target
+                self._condition.notify_all()
+            position = self._positions().get(job_id, 0)
+
+        self._publish_positions()
+        return position
+
+    def _check_admission_locked(self, lane: _Lane, user_id: str):
+        # Idle workers pick up new jobs immediately, so only a real backlog counts
+        if lane.queued >= lane.limits.max_queued:
+            lane.rejected += 1
+            raise SchedulerSaturated(f"{lane.name} queue full ({lane.queued} waiting)")
+        user_queue = lane.queues.get(user_id)
+        if user_queue and len(user_queue) >= lane.limits.max_queued_per_user:
+            lane.rejected += 1
+            raise SchedulerSaturated(f"Too many {lane.name} jobs waiting for user ({len(user_queue)})")
+
+    # ------------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------------
+
+    def _ensure_workers(self):
+        """Start the worker threads on first use (caller holds the lock)."""
+        if self._threads:
+            return
+        for i in range(self._threads_needed):
+            thread = threading.Thread(
+                target=self._worker_loop,
+                daemon=True,
+                name=f"pipeline-worker-{i}"
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def _next_job(self) -> Optional[_Job]:
+        """Pick the next job by lane priority, or None if nothing may start (caller holds the lock)."""
+        sessions_running = sum(
+            lane.running for lane in self._lanes.values() if not lane.limits.yields
+        )
+        higher_waiting = False
+        for lane in self._lanes.values():
+            if lane.queued and lane.running < lane.limits.workers and sessions_running < self.workers:
+                if not (lane.limits.yields and higher_waiting):
+                    return lane.pop()
+            higher_waiting = higher_waiting or lane.queued > 0
+        return None
+
+    def _worker_loop(self):
+        while True:
+            with self._condition:
+                job = self._next_job()
+                while job is None:
+                    self._condition.wait()
+                    job = self._next_job()
+                lane = job.lane
+                lane.running += 1
+                del self._waiting[job.job_id]
+
+            self._publish_positions()
+            started = time.monotonic()
+            lane.wait_ms.observe((started - job.enqueued_at) * 1000)
+            stream = get_stream(job.job_id)
+            if stream:
+                stream.set_stage('starting')
+
+            failed = False
+            try:
+                job.fn(*job.args)
+            except Exception as e:
+                # Jobs record their own errors; this only keeps the worker alive
+                failed = True
+                logger.error(f"{lane.name} job {job.job_id} raised in scheduler: {e}", exc_info=True)
+            finally:
+                lane.run_ms.observe((time.monotonic() - started) * 1000, error=failed)
+                with self._condition:
+                    lane.running -= 1
+                    lane.completed += 1
+                    if failed:
+                        lane.failed += 1
+                    # A slot freed up: capped or yielding lanes may be able to start now
+                    self._condition.notify_all()
+
+    # ------------------------------------------------------------------
+    # Queue position
+    # ------------------------------------------------------------------
+
+    def _positions(self) -> Dict[str, int]:
+        """Start order of every waiting job across lanes (caller holds the lock)."""
+        order = [job for lane in self._lanes.values() for job in lane.dispatch_order()]
+        return {job.job_id: position for position, job in enumerate(order)}
+
+    def _publish_positions(self):
+        """Push changed queue positions to their SSE streams (caller must NOT hold the lock).
+
+        Stream writes can be Redis round trips, so they happen outside the
+        scheduler lock and only for jobs whose position moved. Publishers are
+        serialized on _publish_lock and snapshot positions inside it, so a
+        stale position can never overwrite a newer one, and a dispatched job
+        gets no late 'queued' after its worker marks it 'starting'.
+        """
+        with self._publish_lock:
+            with self._condition:
+                positions = self._positions()
+
+            # Dispatched jobs drop out; jobs without a stream yet are retried next time
+            published = {}
+            for job_id, position in positions.items():
+                if self._published.get(job_id) != position:
+                    stream = get_stream(job_id)
+                    if not stream:
+                        continue
+                    stream.set_queued(position)
+                published[job_id] = position
+            self._published = published
+
+    def get_position(self, job_id: str) -> Optional[int]:
+        """Jobs that will start before this one, or None if it isn't waiting."""
+        with self._condition:
+            return self._positions().get(job_id)
+
+    # ------------------------------------------------------------------
+    # Stats
+    # ------------------------------------------------------------------
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._condition:
+            lanes = {name: lane.get_stats() for name, lane in self._lanes.items()}
+        return {
+            'workers': self.workers,
+            'running': sum(lane['running'] for lane in lanes.values()),
+            'queued': sum(lane['queued'] for lane in lanes.values()),
+            'rejected': sum(lane['rejected'] for lane in lanes.values()),
+            'lanes': lanes,
+        }
+
+
+# Module-level singleton
+_scheduler: Optional[SessionScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_session_scheduler() -> SessionScheduler:
+    """Get or create the process-wide scheduler."""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = SessionScheduler()
+    return _scheduler
+
+
+def submit_maintenance(job_id: str, user_id: str, fn: Callable, *args: Any) -> bool:
+    """
+    Queue background work on the maintenance lane.
+
+    Best effort: if the lane is saturated the job is dropped with a warning
+    (the work is retried on a later session or backfilled). Returns True if
+    queued.
+    """
+    try:
+        get_session_scheduler().submit(job_id, user_id, fn, *args, lane=MAINTENANCE)
+        return True
+    except SchedulerSaturated as e:
+        logger.warning(f"Dropping background job {job_id}: {e}")
+        return False
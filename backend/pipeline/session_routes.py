@@ -2,13 +2,16 @@
 Session routes for real-time updates via Server-Sent Events (SSE).
 
 Streams events, titles, and status updates directly from the pipeline
-to the frontend — no polling or DB round-trips needed.
+to the frontend — no polling or DB round-trips needed. Each connection
+subscribes to its session stream and sleeps until the pipeline writes, so an
+idle tab costs no CPU (and, under the gevent worker, no thread either).
 """
 
-from flask import Blueprint, Response, jsonify
+from flask import Blueprint, Response, jsonify, request
 from database.models import Session as DBSession
 from pipeline.stream import get_stream, cleanup_stream
 from pipeline.events import EventService
+from config.database import StreamConfig
 import json
 import time
 
@@ -20,22 +23,37 @@ def stream_session_updates(session_id: str):
     """
     SSE endpoint for real-time session updates.
 
-    Reads from the in-memory stream (pushed by the pipeline) and sends
-    events to the frontend as they become ready. Falls back to DB polling
-    if no stream exists (e.g., reconnecting to an already-running session).
+    Reads from the session stream (pushed by the pipeline; in-process or
+    Redis, see pipeline/stream.py) and sends events to the frontend as they
+    become ready. Falls back to DB polling if no stream exists (e.g., the
+    in-process backend and the pipeline is running on another worker).
 
     Event types:
         - init: Initial session state
+        - stage: Pipeline stage changed ('queued' includes the queue position)
         - event: A calendar event is ready (sent as list of all current events)
         - title: Title has been generated
         - complete: Pipeline finished, events saved to DB
         - error: Pipeline failed
 
+    Delta mode (?delta=1, or when resuming with Last-Event-ID / ?last_event_id=):
+    instead of resending the whole list on every change, each change is sent
+    once with the stream revision as its SSE id:
+        - event_added: {rev, index, event}
+        - event_replaced: {rev, index, event}
+        - events_cleared: {rev}
+    A reconnect with Last-Event-ID gets only the changes after that revision.
+    'event' frames still appear as full snapshots (carrying 'rev') when the
+    changes can't be replayed or the session already finished.
+
     Frontend usage:
         const es = new EventSource(`/api/sessions/${id}/stream`);
         es.addEventListener('event', (e) => setEvents(JSON.parse(e.data).events));
         es.addEventListener('complete', () => { es.close(); });
     """
+    resume_from = _resume_revision()
+    delta = resume_from is not None or request.args.get('delta') in ('1', 'true')
+
     def generate():
         session = DBSession.get_by_id_lite(session_id)
         if not session:
@@ -55,84 +73,18 @@ def stream_session_updates(session_id: str):
             yield f"event: error\ndata: {json.dumps({'error': session.get('error_message', 'Processing failed')})}\n\n"
             return
 
-        # Stream from in-memory pipeline
+        # Stream from the pipeline's session stream
         stream = get_stream(session_id)
         if not stream:
             # No stream — fall back to DB polling
             yield from _poll_db_fallback(session_id, session)
             return
 
-        last_revision = 0
-        last_title = session.get('title')
-        last_icon = session.get('icon')
-        last_event_count = None  # Track event_count (from extraction)
-        last_stage = None  # Track pipeline stage
-        max_wait = 300  # 5 min max
-        heartbeat_interval = 15  # Send keepalive every 15s
-        last_heartbeat = time.time()
-
-        start = time.time()
-        while time.time() - start < max_wait:
-            stream.wait_for_update(timeout=0.5)
-
-            sent_data = False
-
-            # Stage update
-            if stream.stage and stream.stage != last_stage:
-                yield f"event: stage\ndata: {json.dumps({'stage': stream.stage})}\n\n"
-                last_stage = stream.stage
-                sent_data = True
-
-            # Title update
-            if stream.title and stream.title != last_title:
-                yield f"event: title\ndata: {json.dumps({'title': stream.title})}\n\n"
-                last_title = stream.title
-                sent_data = True
-
-            # Icon update
-            if stream.icon and stream.icon != last_icon:
-                yield f"event: icon\ndata: {json.dumps({'icon': stream.icon})}\n\n"
-                last_icon = stream.icon
-                sent_data = True
-
-            # Event count (known after extraction, before resolution)
-            if stream.event_count is not None and stream.event_count != last_event_count:
-                yield f"event: count\ndata: {json.dumps({'count': stream.event_count})}\n\n"
-                last_event_count = stream.event_count
-                sent_data = True
-
-            # Events changed (uses revision to detect both additions and replacements)
-            current_revision = stream._revision
-            if current_revision > last_revision and len(stream.events) > 0:
-                yield f"event: event\ndata: {json.dumps({'events': list(stream.events)})}\n\n"
-                last_revision = current_revision
-                sent_data = True
-
-            # Error
-            if stream.error:
-                yield f"event: error\ndata: {json.dumps({'error': stream.error})}\n\n"
-                cleanup_stream(session_id)
-                return
-
-            # Done
-            if stream.done:
-                # Always send final events — personalization may have replaced
-                # them without changing the count
-                if stream.events:
-                    yield f"event: event\ndata: {json.dumps({'events': list(stream.events)})}\n\n"
-                yield f"event: complete\ndata: {json.dumps({'status': 'processed'})}\n\n"
-                cleanup_stream(session_id)
-                return
-
-            # Heartbeat to keep connection alive through ALB/Nginx
-            now = time.time()
-            if not sent_data and now - last_heartbeat >= heartbeat_interval:
-                yield ":heartbeat\n\n"
-                last_heartbeat = now
-
-        # Timeout
-        yield f"event: timeout\ndata: {json.dumps({'message': 'Stream timeout'})}\n\n"
-        cleanup_stream(session_id)
+        subscription = stream.subscribe()
+        try:
+            yield from _stream_live(session_id, session, stream, subscription, delta, resume_from or 0)
+        finally:
+            subscription.close()
 
     return Response(
         generate(),
@@ -144,18 +96,145 @@ def stream_session_updates(session_id: str):
     )
 
 
+def _resume_revision():
+    """Revision the client already has (Last-Event-ID header, or ?last_event_id=)."""
+    raw = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    if raw is None:
+        return None
+    try:
+        return max(0, int(raw))
+    except ValueError:
+        return 0
+
+
+def _event_frames(stream, last_revision):
+    """
+    Delta frames for event-list changes after last_revision.
+
+    Returns (frames, new_revision). Falls back to one full 'event' snapshot
+    when the stream can't replay from last_revision.
+    """
+    changes = stream.changes_since(last_revision)
+    if changes is None:
+        revision, events = stream.snapshot()
+        frame = f"id: {revision}\nevent: event\ndata: {json.dumps({'events': events, 'rev': revision})}\n\n"
+        return [frame], revision
+    frames = [
+        f"id: {change['rev']}\nevent: {change['type']}\ndata: {json.dumps(change)}\n\n"
+        for change in changes
+    ]
+    return frames, (changes[-1]['rev'] if changes else last_revision)
+
+
+def _stream_live(session_id, session, stream, subscription, delta=False, last_revision=0):
+    """Relay stream updates until the pipeline finishes, errors or times out.
+
+    Args:
+        subscription: From stream.subscribe(); wait() blocks until the next write
+        delta: Send event_added/event_replaced/events_cleared frames instead
+               of the full list on every change
+        last_revision: Event-list revision the client already has (delta mode)
+    """
+    last_title = session.get('title')
+    last_icon = session.get('icon')
+    last_event_count = None  # Track event_count (from extraction)
+    last_stage = None  # Track pipeline stage (and queue position while queued)
+    deadline = time.monotonic() + StreamConfig.MAX_STREAM_SECONDS
+
+    # First pass sends the state as of subscribing; after that, only wake on writes
+    changed = True
+    while True:
+        sent_data = False
+
+        # Stage update
+        stage = (stream.stage, stream.queue_position)
+        if stream.stage and stage != last_stage:
+            payload = {'stage': stream.stage}
+            if stream.queue_position is not None:
+                payload['position'] = stream.queue_position
+            yield f"event: stage\ndata: {json.dumps(payload)}\n\n"
+            last_stage = stage
+            sent_data = True
+
+        # Title update
+        if stream.title and stream.title != last_title:
+            yield f"event: title\ndata: {json.dumps({'title': stream.title})}\n\n"
+            last_title = stream.title
+            sent_data = True
+
+        # Icon update
+        if stream.icon and stream.icon != last_icon:
+            yield f"event: icon\ndata: {json.dumps({'icon': stream.icon})}\n\n"
+            last_icon = stream.icon
+            sent_data = True
+
+        # Event count (known after extraction, before resolution)
+        if stream.event_count is not None and stream.event_count != last_event_count:
+            yield f"event: count\ndata: {json.dumps({'count': stream.event_count})}\n\n"
+            last_event_count = stream.event_count
+            sent_data = True
+
+        # Events changed (uses revision to detect both additions and replacements)
+        current_revision = stream.revision
+        if delta and current_revision != last_revision:
+            frames, last_revision = _event_frames(stream, last_revision)
+            for frame in frames:
+                yield frame
+            sent_data = True
+        elif current_revision > last_revision and len(stream.events) > 0:
+            yield f"event: event\ndata: {json.dumps({'events': list(stream.events)})}\n\n"
+            last_revision = current_revision
+            sent_data = True
+
+        # Error
+        if stream.error:
+            yield f"event: error\ndata: {json.dumps({'error': stream.error})}\n\n"
+            cleanup_stream(session_id)
+            return
+
+        # Done
+        if stream.done:
+            # Always send final events — personalization may have replaced
+            # them without changing the count. Delta clients only need
+            # changes that landed after the check above.
+            if delta:
+                if stream.revision != last_revision:
+                    frames, last_revision = _event_frames(stream, last_revision)
+                    for frame in frames:
+                        yield frame
+            elif stream.events:
+                yield f"event: event\ndata: {json.dumps({'events': list(stream.events)})}\n\n"
+            yield f"event: complete\ndata: {json.dumps({'status': 'processed'})}\n\n"
+            cleanup_stream(session_id)
+            return
+
+        # Heartbeat to keep connection alive through ALB/Nginx (the wait
+        # timed out: nothing was written for HEARTBEAT_SECONDS)
+        if not changed and not sent_data:
+            yield ":heartbeat\n\n"
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        changed = subscription.wait(timeout=min(StreamConfig.HEARTBEAT_SECONDS, remaining))
+
+    # Timeout
+    yield f"event: timeout\ndata: {json.dumps({'message': 'Stream timeout'})}\n\n"
+    cleanup_stream(session_id)
+
+
 def _poll_db_fallback(session_id, session):
     """Fallback: poll DB for status changes (no in-memory stream available)."""
     last_title = session.get('title')
     last_icon = session.get('icon')
     last_status = session.get('status')
-    from config.database import StreamConfig
-    max_polls = StreamConfig.MAX_POLLS
-    heartbeat_interval = 15
-    last_heartbeat = time.time()
+    deadline = time.monotonic() + StreamConfig.MAX_POLLS * StreamConfig.POLL_INTERVAL_SECONDS
+    interval = StreamConfig.POLL_INTERVAL_SECONDS
+    last_heartbeat = time.monotonic()
 
-    for _ in range(max_polls):
-        time.sleep(StreamConfig.POLL_INTERVAL_SECONDS)
+    while time.monotonic() < deadline:
+        time.sleep(interval)
+        interval = min(interval * 2, StreamConfig.POLL_MAX_INTERVAL_SECONDS)
 
         session = DBSession.get_by_id_lite(session_id)
         if not session:
@@ -192,8 +271,11 @@ def _poll_db_fallback(session_id, session):
                 return
 
         # Heartbeat to keep connection alive through ALB/Nginx
-        now = time.time()
-        if not sent_data and now - last_heartbeat >= heartbeat_interval:
+        now = time.monotonic()
+        if sent_data:
+            # Something is happening — poll quickly again
+            interval = StreamConfig.POLL_INTERVAL_SECONDS
+        elif now - last_heartbeat >= StreamConfig.HEARTBEAT_SECONDS:
             yield ":heartbeat\n\n"
             last_heartbeat = now
 
@@ -1,8 +1,27 @@
 """
-In-memory event stream for real-time session updates via SSE.
+Event stream for real-time session updates via SSE.
 
 The pipeline pushes events here as they're resolved/personalized.
 The SSE endpoint reads from here and streams to the frontend.
+
+The backend is pluggable (StreamConfig.BACKEND):
+  - 'memory' (default): process-local streams. The SSE request must land on
+    the worker running the pipeline, hence gunicorn -w 1.
+  - 'redis': stream state in Redis with pub/sub wake-ups (see
+    pipeline/stream_redis.py), so any worker can serve any session's SSE.
+
+Both hand out stream objects with the same push/subscribe API as SessionStream.
+
+Readers don't poll: subscribe() gives each SSE connection its own wake-up
+signal, set by every write, so an idle connection sleeps until the pipeline
+changes something (or a heartbeat is due). The waits are plain threading /
+socket waits, so under a gevent worker an idle connection is a parked
+greenlet rather than a thread.
+
+Every change to the events list bumps the stream's revision and is logged,
+so the SSE endpoint can send deltas (event_added / event_replaced /
+events_cleared, each carrying its revision as the SSE id) and resume a
+reconnecting client from Last-Event-ID instead of resending the full list.
 """
 
 import threading
@@ -10,10 +29,34 @@ import time
 import logging
 from typing import Optional, Dict, List, Any
 
+from config.database import StreamConfig
+
 logger = logging.getLogger(__name__)
 
-# Streams older than this (in seconds) are cleaned up automatically
-_STREAM_TTL_SECONDS = 600  # 10 minutes
+
+class StreamSubscription:
+    """One reader's wake-up signal for a SessionStream."""
+
+    def __init__(self, stream: 'SessionStream'):
+        self._stream = stream
+        self._pending = threading.Event()
+
+    def notify(self):
+        self._pending.set()
+
+    def wait(self, timeout: float) -> bool:
+        """Block until the stream changes or timeout. Returns True if it changed.
+
+        Writes that land while the reader is busy are not lost: the signal
+        stays set until the next wait.
+        """
+        changed = self._pending.wait(timeout)
+        # Clear before the caller reads state, so a later write re-sets it
+        self._pending.clear()
+        return changed
+
+    def close(self):
+        self._stream._unsubscribe(self)
 
 
 class SessionStream:
@@ -25,111 +68,229 @@ class SessionStream:
         self.icon: Optional[str] = None
         self.event_count: Optional[int] = None  # Known count before resolution
         self.stage: Optional[str] = None  # Current pipeline stage
+        self.queue_position: Optional[int] = None  # Sessions ahead while stage == 'queued'
         self.done = False
         self.error: Optional[str] = None
         self._revision = 0  # Bumped on any event list change
+        # Change log: _changes[i] is the change that produced revision _log_start + i + 1
+        self._changes: List[Dict[str, Any]] = []
+        self._log_start = 0
+        self._subscribers: List[StreamSubscription] = []
         self._condition = threading.Condition()
         self._created_at = time.monotonic()
 
+    def _log_change(self, change_type: str, index: Optional[int] = None, event: Optional[Dict[str, Any]] = None):
+        """Bump the revision and record the change (caller holds the condition)."""
+        self._revision += 1
+        change = {'rev': self._revision, 'type': change_type}
+        if index is not None:
+            change['index'] = index
+            change['event'] = event
+        self._changes.append(change)
+        if len(self._changes) > StreamConfig.MAX_CHANGE_LOG:
+            drop = len(self._changes) - StreamConfig.MAX_CHANGE_LOG
+            del self._changes[:drop]
+            self._log_start += drop
+        self._changed()
+
+    def _changed(self):
+        """Wake waiters and subscribers (caller holds the condition)."""
+        self._condition.notify_all()
+        for subscriber in self._subscribers:
+            subscriber.notify()
+
+    def subscribe(self) -> StreamSubscription:
+        """Register a reader; its subscription is signalled on every change."""
+        subscription = StreamSubscription(self)
+        with self._condition:
+            self._subscribers.append(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription: StreamSubscription):
+        with self._condition:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+
     def push_event(self, event_data: Dict[str, Any]):
         with self._condition:
             self.events.append(event_data)
-            self._revision += 1
-            self._condition.notify_all()
+            self._log_change('event_added', len(self.events) - 1, event_data)
+
+    def replace_event(self, index: int, event_data: Dict[str, Any]):
+        """Replace the event at `index` (e.g. with its personalized version)."""
+        with self._condition:
+            self.events[index] = event_data
+            self._log_change('event_replaced', index, event_data)
 
     def clear_events(self):
         """Clear events list (thread-safe). Use instead of events.clear()."""
         with self._condition:
             self.events.clear()
-            self._revision += 1
-            self._condition.notify_all()
+            self._log_change('events_cleared')
+
+    def changes_since(self, revision: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Event-list changes after `revision`, oldest first.
+
+        Returns None if they can't be replayed (revision unknown to this
+        stream, or older than the retained log) — send a snapshot instead.
+        """
+        with self._condition:
+            if revision < self._log_start or revision > self._revision:
+                return None
+            return list(self._changes[revision - self._log_start:])
+
+    def snapshot(self):
+        """(revision, events) read together."""
+        with self._condition:
+            return self._revision, list(self.events)
 
     def set_event_count(self, count: int):
         """Set the known event count (from extraction, before resolution)."""
         with self._condition:
             self.event_count = count
-            self._condition.notify_all()
+            self._changed()
 
     def set_title(self, title: str):
         with self._condition:
             self.title = title
-            self._condition.notify_all()
+            self._changed()
 
     def set_stage(self, stage: str):
         """Set the current pipeline stage (extracting, resolving, personalizing)."""
         with self._condition:
             self.stage = stage
-            self._condition.notify_all()
+            self.queue_position = None
+            self._changed()
+
+    def set_queued(self, position: int):
+        """Mark the session as waiting for a worker, with `position` sessions ahead."""
+        with self._condition:
+            self.stage = 'queued'
+            self.queue_position = position
+            self._changed()
 
     def set_icon(self, icon: str):
         with self._condition:
             self.icon = icon
-            self._condition.notify_all()
+            self._changed()
 
     def mark_done(self):
         with self._condition:
             self.done = True
-            self._condition.notify_all()
+            self._changed()
 
     def mark_error(self, error: str):
         with self._condition:
             self.error = error
             self.done = True
-            self._condition.notify_all()
+            self._changed()
 
     def wait_for_update(self, timeout: float = 1.0) -> bool:
         """Block until notified or timeout. Returns True if notified."""
         with self._condition:
             return self._condition.wait(timeout=timeout)
 
+    def close(self):
+        """Release reader resources (nothing to release in-process)."""
+        pass
+
+    @property
+    def revision(self) -> int:
+        """Bumped on any change to the events list."""
+        return self._revision
+
     @property
     def age_seconds(self) -> float:
         """How many seconds since this stream was created."""
         return time.monotonic() - self._created_at
 
 
-# Global registry of active session streams
-_streams: Dict[str, SessionStream] = {}
-_lock = threading.Lock()
+class InMemoryStreamBackend:
+    """Process-local registry of session streams."""
+
+    def __init__(self):
+        self._streams: Dict[str, SessionStream] = {}
+        self._lock = threading.Lock()
+
+    def init_stream(self, session_id: str) -> SessionStream:
+        stream = SessionStream()
+        with self._lock:
+            self._streams[session_id] = stream
+        # Opportunistically clean up stale streams
+        self._cleanup_stale_streams()
+        return stream
+
+    def get_stream(self, session_id: str) -> Optional[SessionStream]:
+        with self._lock:
+            return self._streams.get(session_id)
+
+    def cleanup_stream(self, session_id: str):
+        with self._lock:
+            self._streams.pop(session_id, None)
+
+    def _cleanup_stale_streams(self):
+        """Remove streams that have exceeded their TTL (done/errored or just old).
+
+        Called opportunistically from init_stream to avoid needing a background timer.
+        """
+        now = time.monotonic()
+        stale = []
+        with self._lock:
+            for sid, stream in self._streams.items():
+                age = now - stream._created_at
+                # Remove streams that are done/errored and at least 60s old,
+                # or any stream older than the TTL regardless of state
+                if (stream.done and age > 60) or age > StreamConfig.TTL_SECONDS:
+                    stale.append(sid)
+            for sid in stale:
+                del self._streams[sid]
+        if stale:
+            logger.debug(f"Cleaned up {len(stale)} stale stream(s): {stale}")
+
+
+# Process-wide backend (chosen from StreamConfig.BACKEND on first use)
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def _create_backend():
+    if StreamConfig.BACKEND == 'redis':
+        from pipeline.stream_redis import RedisStreamBackend
+        logger.info("Session streams: using Redis backend")
+        return RedisStreamBackend.from_url(StreamConfig.REDIS_URL)
+    if StreamConfig.BACKEND != 'memory':
+        logger.warning(f"Unknown stream backend '{StreamConfig.BACKEND}', using memory")
+    return InMemoryStreamBackend()
+
+
+def get_stream_backend():
+    """Get or create the session stream backend."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = _create_backend()
+    return _backend
+
+
+def set_stream_backend(backend) -> None:
+    """Replace the session stream backend (tests, or explicit wiring at startup)."""
+    global _backend
+    with _backend_lock:
+        _backend = backend
 
 
-def init_stream(session_id: str) -> SessionStream:
+def init_stream(session_id: str):
     """Create a stream for a session (call before starting the pipeline)."""
-    stream = SessionStream()
-    with _lock:
-        _streams[session_id] = stream
-    # Opportunistically clean up stale streams
-    _cleanup_stale_streams()
-    return stream
+    return get_stream_backend().init_stream(session_id)
 
 
-def get_stream(session_id: str) -> Optional[SessionStream]:
+def get_stream(session_id: str):
     """Get the stream for a session (returns None if not found)."""
-    with _lock:
-        return _streams.get(session_id)
+    return get_stream_backend().get_stream(session_id)
 
 
 def cleanup_stream(session_id: str):
     """Remove a completed session's stream."""
-    with _lock:
-        _streams.pop(session_id, None)
-
-
-def _cleanup_stale_streams():
-    """Remove streams that have exceeded their TTL (done/errored or just old).
-
-    Called opportunistically from init_stream to avoid needing a background timer.
-    """
-    now = time.monotonic()
-    stale = []
-    with _lock:
-        for sid, stream in _streams.items():
-            age = now - stream._created_at
-            # Remove streams that are done/errored and at least 60s old,
-            # or any stream older than the TTL regardless of state
-            if (stream.done and age > 60) or age > _STREAM_TTL_SECONDS:
-                stale.append(sid)
-        for sid in stale:
-            del _streams[sid]
-    if stale:
-        logger.debug(f"Cleaned up {len(stale)} stale stream(s): {stale}")
+    get_stream_backend().cleanup_stream(session_id)
@@ -0,0 +1,294 @@
+"""
+Redis-backed session streams, shared by every gunicorn worker.
+
+Each session has four keys under StreamConfig.REDIS_KEY_PREFIX:
+  - {prefix}{session_id}          hash of JSON-encoded fields (title, stage, done, revision, ...)
+  - {prefix}{session_id}:events   list of JSON-encoded frontend events
+  - {prefix}{session_id}:changes  event-list change log; entry i produced revision i + 1
+  - {prefix}{session_id}:updates  pub/sub channel, published on every write
+
+Writers (the pipeline, on whichever worker runs it) update the keys and
+publish in one MULTI. Readers (the SSE endpoint, on any worker) subscribe to
+the channel and re-read the hash when woken, so they get the same
+subscribe()/attribute API as the in-process SessionStream. Each reader holds
+one pub/sub connection and blocks on its socket while idle.
+
+Redis errors never fail the pipeline: writes are logged and dropped, and
+get_stream() returns None so the SSE endpoint falls back to DB polling.
+"""
+
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+import redis
+from redis.exceptions import RedisError
+
+from config.database import StreamConfig
+
+logger = logging.getLogger(__name__)
+
+
+class RedisSessionStream:
+    """Session stream whose state lives in Redis (same API as SessionStream)."""
+
+    def __init__(self, client: 'redis.Redis', session_id: str):
+        self._client = client
+        self.session_id = session_id
+        self._key = f"{StreamConfig.REDIS_KEY_PREFIX}{session_id}"
+        self._events_key = f"{self._key}:events"
+        self._changes_key = f"{self._key}:changes"
+        self._channel = f"{self._key}:updates"
+        self._pubsub = None
+        # Local snapshot, refreshed by refresh() / wait_for_update()
+        self._state: Dict[str, Any] = {}
+        self._events: List[Dict[str, Any]] = []
+        self._events_revision: Optional[int] = None
+
+    # ------------------------------------------------------------------
+    # Writes (pipeline side)
+    # ------------------------------------------------------------------
+
+    def _write(
+        self,
+        fields: Optional[Dict[str, Any]] = None,
+        push: Optional[Dict[str, Any]] = None,
+        clear: bool = False,
+        replace: Optional[tuple] = None
+    ):
+        """Apply a change and wake readers in one MULTI."""
+        fields = fields or {}
+        pipe = self._client.pipeline(transaction=True)
+        change = None
+        if clear:
+            pipe.delete(self._events_key)
+            change = {'type': 'events_cleared'}
+        if push is not None:
+            pipe.rpush(self._events_key, json.dumps(push))
+            change = {'type': 'event_added', 'index': len(self._events), 'event': push}
+        if replace is not None:
+            index, event = replace
+            pipe.lset(self._events_key, index, json.dumps(event))
+            change = {'type': 'event_replaced', 'index': index, 'event': event}
+        events_changed = change is not None
+        if events_changed:
+            # Revision == length of the change log, so entries need no stored rev
+            pipe.rpush(self._changes_key, json.dumps(change))
+            pipe.hincrby(self._key, 'revision', 1)
+        if fields:
+            pipe.hset(self._key, mapping={k: json.dumps(v) for k, v in fields.items()})
+        pipe.expire(self._key, StreamConfig.TTL_SECONDS)
+        pipe.expire(self._events_key, StreamConfig.TTL_SECONDS)
+        pipe.expire(self._changes_key, StreamConfig.TTL_SECONDS)
+        pipe.publish(self._channel, '1')
+        try:
+            pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Stream write failed for session {self.session_id}: {e}")
+            return
+
+        self._state.update(fields)
+        if events_changed:
+            if clear:
+                self._events = []
+            if push is not None:
+                self._events.append(push)
+            if replace is not None:
+                self._events[replace[0]] = replace[1]
+            self._state['revision'] = self.revision + 1
+            self._events_revision = self._state['revision']
+
+    def push_event(self, event_data: Dict[str, Any]):
+        self._write(push=event_data)
+
+    def replace_event(self, index: int, event_data: Dict[str, Any]):
+        self._write(replace=(index, event_data))
+
+    def clear_events(self):
+        self._write(clear=True)
+
+    def set_event_count(self, count: int):
+        self._write({'event_count': count})
+
+    def set_title(self, title: str):
+        self._write({'title': title})
+
+    def set_stage(self, stage: str):
+        self._write({'stage': stage, 'queue_position': None})
+
+    def set_queued(self, position: int):
+        self._write({'stage': 'queued', 'queue_position': position})
+
+    def set_icon(self, icon: str):
+        self._write({'icon': icon})
+
+    def mark_done(self):
+        self._write({'done': True})
+
+    def mark_error(self, error: str):
+        self._write({'error': error, 'done': True})
+
+    # ------------------------------------------------------------------
+    # Reads (SSE side)
+    # ------------------------------------------------------------------
+
+    def refresh(self) -> bool:
+        """Reload the snapshot from Redis. Returns False if the stream is gone."""
+        try:
+            state = self._client.hgetall(self._key)
+            if not state:
+                return False
+            self._state = {k: json.loads(v) for k, v in state.items()}
+            # Only re-read the (possibly long) events list when it changed
+            if self._state.get('revision') != self._events_revision:
+                events = self._client.lrange(self._events_key, 0, -1)
+                self._events = [json.loads(e) for e in events]
+                self._events_revision = self._state.get('revision')
+            return True
+        except RedisError as e:
+            logger.warning(f"Stream read failed for session {self.session_id}: {e}")
+            return False
+
+    def _ensure_subscribed(self):
+        if self._pubsub is None:
+            self._pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+            self._pubsub.subscribe(self._channel)
+
+    def subscribe(self) -> 'RedisSessionStream':
+        """
+        Start listening for writes.
+
+        Each reader already has its own RedisSessionStream, so the stream is
+        its own subscription: wait() blocks on the pub/sub socket.
+        """
+        try:
+            self._ensure_subscribed()
+        except RedisError as e:
+            logger.warning(f"Stream subscribe failed for session {self.session_id}: {e}")
+        # Writes published before the subscription are picked up here
+        self.refresh()
+        return self
+
+    def wait(self, timeout: float) -> bool:
+        """Block until a write is published or timeout (StreamSubscription API)."""
+        return self.wait_for_update(timeout)
+
+    def wait_for_update(self, timeout: float = 1.0) -> bool:
+        """Block until a write is published or timeout. Returns True if notified."""
+        notified = False
+        try:
+            self._ensure_subscribed()
+            message = self._pubsub.get_message(timeout=timeout)
+            notified = message is not None
+            # Coalesce a burst of writes into one refresh
+            while message is not None:
+                message = self._pubsub.get_message(timeout=0)
+        except RedisError as e:
+            logger.warning(f"Stream subscribe failed for session {self.session_id}: {e}")
+            time.sleep(timeout)
+        # Re-read even on timeout: covers writes published before we subscribed
+        self.refresh()
+        return notified
+
+    def changes_since(self, revision: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Event-list changes after `revision`, oldest first (see SessionStream).
+
+        Returns None if they can't be replayed, so the caller sends a snapshot.
+        """
+        if revision > self.revision:
+            return None
+        try:
+            entries = self._client.lrange(self._changes_key, revision, -1)
+        except RedisError as e:
+            logger.warning(f"Stream read failed for session {self.session_id}: {e}")
+            return None
+        changes = []
+        for offset, entry in enumerate(entries):
+            change = json.loads(entry)
+            change['rev'] = revision + offset + 1
+            changes.append(change)
+        return changes
+
+    def snapshot(self):
+        """(revision, events) from the last refresh."""
+        return self._events_revision or 0, list(self._events)
+
+    def close(self):
+        """Drop the pub/sub subscription (call when the SSE response ends)."""
+        if self._pubsub is not None:
+            try:
+                self._pubsub.close()
+            except RedisError:
+                pass
+            self._pubsub = None
+
+    @property
+    def events(self) -> List[Dict[str, Any]]:
+        return self._events
+
+    @property
+    def title(self) -> Optional[str]:
+        return self._state.get('title')
+
+    @property
+    def icon(self) -> Optional[str]:
+        return self._state.get('icon')
+
+    @property
+    def event_count(self) -> Optional[int]:
+        return self._state.get('event_count')
+
+    @property
+    def stage(self) -> Optional[str]:
+        return self._state.get('stage')
+
+    @property
+    def queue_position(self) -> Optional[int]:
+        return self._state.get('queue_position')
+
+    @property
+    def done(self) -> bool:
+        return bool(self._state.get('done'))
+
+    @property
+    def error(self) -> Optional[str]:
+        return self._state.get('error')
+
+    @property
+    def revision(self) -> int:
+        return int(self._state.get('revision') or 0)
+
+    @property
+    def age_seconds(self) -> float:
+        """How many seconds since this stream was created (wall clock, any worker)."""
+        return time.time() - float(self._state.get('created_at') or time.time())
+
+
+class RedisStreamBackend:
+    """Session stream registry in Redis."""
+
+    def __init__(self, client: 'redis.Redis'):
+        self._client = client
+
+    @classmethod
+    def from_url(cls, url: str) -> 'RedisStreamBackend':
+        return cls(redis.Redis.from_url(url, decode_responses=True))
+
+    def init_stream(self, session_id: str) -> RedisSessionStream:
+        self.cleanup_stream(session_id)
+        stream = RedisSessionStream(self._client, session_id)
+        stream._write({'created_at': time.time(), 'done': False, 'revision': 0})
+        return stream
+
+    def get_stream(self, session_id: str) -> Optional[RedisSessionStream]:
+        stream = RedisSessionStream(self._client, session_id)
+        return stream if stream.refresh() else None
+
+    def cleanup_stream(self, session_id: str):
+        stream = RedisSessionStream(self._client, session_id)
+        try:
+            self._client.delete(stream._key, stream._events_key, stream._changes_key)
+        except RedisError as e:
+            logger.warning(f"Stream cleanup failed for session {session_id}: {e}")
@@ -0,0 +1,341 @@
+"""
+Tests for the per-user calendar index.
+
+Checks that conflict, surrounding-event and events-on-date queries served
+from the index match the PostgREST queries they replace, that writes update
+the index incrementally, and benchmarks both paths.
+"""
+
+import pytest
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+# Add backend to path
+backend_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if backend_path not in sys.path:
+    sys.path.insert(0, backend_path)
+
+
+def _ts(value):
+    if not value:
+        return None
+    dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+    def execute(self):
+        return self
+
+
+class FakeQuery:
+    """The subset of the PostgREST query builder EventService uses, over a list of rows."""
+
+    def __init__(self, db):
+        self.db = db
+        self.filters = []
+        self.orders = []
+        self.negate = False
+        self.window = (0, None)
+
+    def _filter(self, predicate):
+        negate, self.negate = self.negate, False
+        self.filters.append((lambda r: not predicate(r)) if negate else predicate)
+        return self
+
+    def _compare(self, col, value, op):
+        target = _ts(value)
+        return self._filter(lambda r: r.get(col) is not None and op(_ts(r[col]), target))
+
+    def select(self, fields):
+        self.fields = [f.strip() for f in fields.split(',')]
+        return self
+
+    @property
+    def not_(self):
+        self.negate = True
+        return self
+
+    def eq(self, col, value):
+        return self._filter(lambda r: r.get(col) == value)
+
+    def neq(self, col, value):
+        return self._filter(lambda r: r.get(col) is not None and r.get(col) != value)
+
+    def is_(self, col, value):
+        return self._filter(lambda r: r.get(col) is None)
+
+    def lt(self, col, value):
+        return self._compare(col, value, lambda a, b: a < b)
+
+    def gte(self, col, value):
+        return self._compare(col, value, lambda a, b: a >= b)
+
+    def lte(self, col, value):
+        return self._compare(col, value, lambda a, b: a <= b)
+
+    def order(self, col, desc=False):
+        self.orders.append((col, desc))
+        return self
+
+    def limit(self, n):
+        self.window = (0, n)
+        return self
+
+    def range(self, start, end):
+        self.window = (start, end - start + 1)
+        return self
+
+    def execute(self):
+        self.db.round_trip()
+        rows = [r for r in self.db.rows if all(f(r) for f in self.filters)]
+        for col, desc in reversed(self.orders):
+            rows.sort(key=lambda r: _ts(r[col]) if col.endswith('_time') else r[col], reverse=desc)
+        start, count = self.window
+        rows = rows[start:start + count] if count is not None else rows[start:]
+        return FakeResponse([{f: r.get(f) for f in self.fields} for r in rows])
+
+
+class FakeSupabase:
+    """In-memory events table plus the conflict RPCs, with an optional simulated round trip."""
+
+    def __init__(self, rows, rtt_ms=0.0):
+        self.rows = rows
+        self.rtt_ms = rtt_ms
+        self.round_trips = 0
+
+    def round_trip(self):
+        self.round_trips += 1
+        if self.rtt_ms:
+            time.sleep(self.rtt_ms / 1000)
+
+    def table(self, name):
+        return FakeQuery(self)
+
+    def _overlapping(self, user_id, start, end):
+        start, end = _ts(start), _ts(end)
+        rows = [
+            r for r in self.rows
+            if r['user_id'] == user_id and not r.get('deleted_at')
+            and r.get('start_time') and r.get('end_time')
+            and _ts(r['start_time']) < end and _ts(r['end_time']) > start
+        ]
+        rows.sort(key=lambda r: (_ts(r['start_time']), r['id']))
+        return [{f: r[f] for f in ('id', 'summary', 'start_time', 'end_time')} for r in rows]
+
+    def rpc(self, name, params):
+        self.round_trip()
+        if name == 'get_conflicting_events':
+            return FakeResponse(self._overlapping(params['p_user_id'], params['p_start_time'], params['p_end_time']))
+        if name == 'get_conflicting_events_batch':
+            return FakeResponse([
+                {'range_idx': r['idx'], **c}
+                for r in params['p_ranges']
+                for c in self._overlapping(params['p_user_id'], r['start'], r['end'])
+            ])
+        raise AssertionError(f"unexpected rpc {name}")
+
+
+def make_rows(n, seed=3):
+    rng = random.Random(seed)
+    base = datetime(2026, 2, 1, tzinfo=timezone.utc)
+    minutes = rng.sample(range(60 * 24 * 60), n)  # unique starts over 60 days
+    rows = []
+    for i, minute in enumerate(minutes):
+        start = base + timedelta(minutes=minute)
+        end = start + timedelta(minutes=rng.choice([30, 50, 60, 90, 180, 600]))
+        tz = timezone(timedelta(hours=rng.choice([0, -5, -8])))
+        timed = rng.random() > 0.1
+        rows.append({
+            'id': f'{i:08x}-0000-0000-0000-000000000000',
+            'user_id': 'user-a',
+            'provider': 'dropcal' if rng.random() < 0.15 else 'google',
+            'summary': f'Event {i}',
+            'start_time': start.astimezone(tz).isoformat() if timed else None,
+            'end_time': end.astimezone(tz).isoformat() if timed else None,
+            'start_date': None if timed else start.date().isoformat(),
+            'end_date': None,
+            'is_all_day': not timed,
+            'location': rng.choice([None, 'CIT 368', 'Sayles Hall']),
+            'calendar_name': 'School',
+            'deleted_at': '2026-01-01T00:00:00+00:00' if rng.random() < 0.05 else None,
+        })
+    rows.append(dict(rows[0], id='ffffffff-0000-0000-0000-000000000000', user_id='user-b'))
+    return rows
+
+
+@pytest.fixture
+def db():
+    return FakeSupabase(make_rows(600))
+
+
+@pytest.fixture
+def wired(db, monkeypatch):
+    """EventService with both paths pointed at the fake database."""
+    from database import models, supabase_client, calendar_index
+    from pipeline import events
+    from config.database import CalendarIndexConfig
+
+    monkeypatch.setattr(supabase_client, 'get_supabase', lambda: db)
+    monkeypatch.setattr(models, 'get_supabase', lambda: db)
+    monkeypatch.setattr(calendar_index, 'get_supabase', lambda: db)
+    index = calendar_index.CalendarIndex()
+    monkeypatch.setattr(events, 'get_calendar_index', lambda: index)
+    monkeypatch.setattr(models, 'get_calendar_index', lambda: index)
+
+    def run(use_index, fn, *args):
+        monkeypatch.setattr(CalendarIndexConfig, 'ENABLED', use_index)
+        return fn(*args)
+
+    return events.EventService, index, run
+
+
+class TestIndexMatchesDatabase:
+
+    def test_conflicts(self, wired):
+        service, _, run = wired
+        rng = random.Random(5)
+        ranges = []
+        for _ in range(150):
+            start = datetime(2026, 1, 28, tzinfo=timezone.utc) + timedelta(minutes=rng.randrange(60 * 24 * 70))
+            end = start + timedelta(minutes=rng.choice([15, 60, 240]))
+            ranges.append((start.isoformat(), end.isoformat()))
+
+        for start_time, end_time in ranges:
+            assert run(True, service.get_conflicting_events, 'user-a', start_time, end_time) == \
+                run(False, service.get_conflicting_events, 'user-a', start_time, end_time)
+        assert run(True, service.get_conflicting_events_batch, 'user-a', ranges) == \
+            run(False, service.get_conflicting_events_batch, 'user-a', ranges)
+
+    def test_surrounding_and_on_date(self, wired):
+        service, _, run = wired
+        rng = random.Random(9)
+        for _ in range(100):
+            target = datetime(2026, 1, 30, tzinfo=timezone.utc) + timedelta(minutes=rng.randrange(60 * 24 * 64))
+            target_time = target.astimezone(timezone(timedelta(hours=-5))).isoformat()
+            target_date = target.date().isoformat()
+            k = rng.choice([1, 3, 5])
+
+            assert run(True, service.get_surrounding_events, 'user-a', target_time, k) == \
+                run(False, service.get_surrounding_events, 'user-a', target_time, k)
+            assert run(True, service.get_events_on_date, 'user-a', target_date, k) == \
+                run(False, service.get_events_on_date, 'user-a', target_date, k)
+
+    def test_index_seeded_once(self, wired, db):
+        service, index, run = wired
+        run(True, service.get_surrounding_events, 'user-a', '2026-02-10T12:00:00+00:00', 5)
+        trips = db.round_trips
+        for day in range(1, 20):
+            run(True, service.get_events_on_date, 'user-a', f'2026-02-{day:02d}', 5)
+        assert db.round_trips == trips
+        assert index.get_stats()['loads'] == 1
+
+
+class TestIncrementalUpdates:
+
+    @pytest.fixture
+    def index(self, db):
+        from database.calendar_index import CalendarIndex
+        index = CalendarIndex(loader=lambda user_id: [r for r in db.rows if r['user_id'] == user_id and not r['deleted_at']])
+        index.conflicting('user-a', '2026-01-01T00:00:00+00:00', '2026-01-01T00:01:00+00:00')  # seed
+        return index
+
+    def test_write_moves_event(self, index):
+        row = {'id': 'new-1', 'user_id': 'user-a', 'provider': 'google', 'summary': 'Office hours',
+               'start_time': '2026-05-01T15:00:00+00:00', 'end_time': '2026-05-01T16:00:00+00:00'}
+        index.apply_rows([row])
+        assert [c['id'] for c in index.conflicting('user-a', '2026-05-01T15:30:00Z', '2026-05-01T15:45:00Z')] == ['new-1']
+
+        index.apply_rows([dict(row, start_time='2026-05-02T15:00:00+00:00', end_time='2026-05-02T16:00:00+00:00')])
+        assert index.conflicting('user-a', '2026-05-01T15:30:00Z', '2026-05-01T15:45:00Z') == []
+        assert len(index.conflicting('user-a', '2026-05-02T15:30:00Z', '2026-05-02T15:45:00Z')) == 1
+
+        index.apply_rows([dict(row, deleted_at='2026-05-01T00:00:00+00:00')])
+        assert index.conflicting('user-a', '2026-05-02T15:30:00Z', '2026-05-02T15:45:00Z') == []
+
+    def test_drafts_conflict_but_are_not_context(self, index):
+        index.apply_rows([{'id': 'draft-1', 'user_id': 'user-a', 'provider': 'dropcal', 'summary': 'Draft',
+                           'start_time': '2026-06-01T10:00:00+00:00', 'end_time': '2026-06-01T11:00:00+00:00'}])
+        assert len(index.conflicting('user-a', '2026-06-01T10:00:00Z', '2026-06-01T10:30:00Z')) == 1
+        assert index.events_on_date('user-a', '2026-06-01', 5) == []
+
+        index.remove_events('user-a', ['draft-1'])
+        assert index.conflicting('user-a', '2026-06-01T10:00:00Z', '2026-06-01T10:30:00Z') == []
+
+    def test_rows_without_times_are_ignored(self, index):
+        before = index.get_stats()['events']
+        index.apply_rows([{'id': make_rows(1)[0]['id'], 'user_id': 'user-a', 'event_embedding': [0.1]}])
+        assert index.get_stats()['events'] == before
+
+    def test_seed_racing_a_write_is_not_kept(self):
+        from database.calendar_index import CalendarIndex
+
+        def loader(user_id):
+            index.apply_rows([{'id': 'x', 'user_id': user_id, 'start_time': None, 'end_time': None}])
+            return []
+
+        index = CalendarIndex(loader=loader)
+        index.conflicting('user-a', '2026-01-01T00:00:00Z', '2026-01-01T01:00:00Z')
+        assert not index.is_loaded('user-a')
+
+
+class TestCalendarIndexBenchmark:
+    """Per-query latency of the index vs the PostgREST path it replaces."""
+
+    N_EVENTS = 5000
+    N_QUERIES = 20
+    RTT_MS = float(os.getenv('DROPCAL_BENCH_RTT_MS', '10'))  # simulated PostgREST round trip
+
+    def test_index_vs_rpc(self, monkeypatch):
+        from database import calendar_index, supabase_client, models
+        from pipeline import events
+        from config.database import CalendarIndexConfig
+
+        db = FakeSupabase(make_rows(self.N_EVENTS), rtt_ms=self.RTT_MS)
+        monkeypatch.setattr(supabase_client, 'get_supabase', lambda: db)
+        monkeypatch.setattr(models, 'get_supabase', lambda: db)
+        monkeypatch.setattr(calendar_index, 'get_supabase', lambda: db)
+        index = calendar_index.CalendarIndex()
+        monkeypatch.setattr(events, 'get_calendar_index', lambda: index)
+
+        targets = [
+            (datetime(2026, 2, 1, tzinfo=timezone.utc) + timedelta(hours=71 * i)).isoformat()
+            for i in range(self.N_QUERIES)
+        ]
+
+        def run_queries():
+            for t in targets:
+                events.EventService.get_surrounding_events('user-a', t, 5)
+                events.EventService.get_events_on_date('user-a', t[:10], 5)
+                events.EventService.get_conflicting_events('user-a', t, t[:11] + '23:00:00+00:00')
+
+        monkeypatch.setattr(CalendarIndexConfig, 'ENABLED', False)
+        start = time.perf_counter()
+        run_queries()
+        rpc_ms = (time.perf_counter() - start) * 1000
+
+        monkeypatch.setattr(CalendarIndexConfig, 'ENABLED', True)
+        start = time.perf_counter()
+        index._get_or_load('user-a')
+        seed_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        run_queries()
+        index_ms = (time.perf_counter() - start) * 1000
+
+        n = 3 * self.N_QUERIES
+        print(f"\n{n} queries over {self.N_EVENTS} events (simulated RTT {self.RTT_MS:.0f}ms): "
+              f"RPC path {rpc_ms:.1f}ms ({rpc_ms / n:.2f}ms/query), "
+              f"index {index_ms:.1f}ms ({index_ms / n:.3f}ms/query) after {seed_ms:.1f}ms seed")
+
+        assert index_ms / n < 1.0, f"Index queries should be <1ms, took {index_ms / n:.2f}ms"
+        assert index_ms < rpc_ms
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v', '-s'])
@@ -0,0 +1,113 @@
+"""
+Tests for the batched conflict query.
+
+Checks that all ranges of a conflict check go out in a single RPC with
+their indexes, that an empty check makes no request, and that without the
+batch RPC (its migration not applied) each range falls back to
+get_conflicting_events with the same tagged result shape.
+"""
+
+import pytest
+import sys
+import os
+
+# Add backend to path
+backend_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if backend_path not in sys.path:
+    sys.path.insert(0, backend_path)
+
+
+class FakeRPC:
+    def __init__(self, data):
+        self.data = data
+
+    def execute(self):
+        return self
+
+
+class FakeSupabase:
+    def __init__(self, rows, per_range=None):
+        self.rows = rows
+        self.per_range = per_range  # None = batch RPC deployed
+        self.calls = []
+
+    def rpc(self, name, params):
+        self.calls.append((name, params))
+        if self.per_range is not None:
+            if name == 'get_conflicting_events_batch':
+                raise RuntimeError('Could not find the function get_conflicting_events_batch')
+            return FakeRPC(self.per_range[params['p_start_time']])
+        return FakeRPC(self.rows)
+
+
+class TestConflictingEventsBatch:
+
+    def test_all_ranges_in_one_rpc(self, monkeypatch):
+        from database import models
+
+        row = {'range_idx': 1, 'id': 'e1', 'summary': 'Lab',
+               'start_time': '2026-02-12T15:00:00+00:00', 'end_time': '2026-02-12T16:00:00+00:00'}
+        supabase = FakeSupabase([row])
+        monkeypatch.setattr(models, 'get_supabase', lambda: supabase)
+
+        ranges = [
+            ('2026-02-05T10:00:00-05:00', '2026-02-05T11:00:00-05:00'),
+            ('2026-02-12T10:00:00-05:00', '2026-02-12T11:00:00-05:00'),
+        ]
+        result = models.Event.get_conflicting_events_batch('user-a', ranges)
+
+        assert result == [row]
+        assert len(supabase.calls) == 1
+        name, params = supabase.calls[0]
+        assert name == 'get_conflicting_events_batch'
+        assert params['p_user_id'] == 'user-a'
+        assert params['p_ranges'] == [
+            {'idx': 0, 'start': ranges[0][0], 'end': ranges[0][1]},
+            {'idx': 1, 'start': ranges[1][0], 'end': ranges[1][1]},
+        ]
+
+    def test_no_ranges_skips_rpc(self, monkeypatch):
+        from database import models
+
+        supabase = FakeSupabase([])
+        monkeypatch.setattr(models, 'get_supabase', lambda: supabase)
+
+        assert models.Event.get_conflicting_events_batch('user-a', []) == []
+        assert supabase.calls == []
+
+    def test_missing_batch_rpc_falls_back_per_range(self, monkeypatch, caplog):
+        from database import models
+
+        lab = {'id': 'e2', 'summary': 'Lab', 'user_id': 'user-a',
+               'start_time': '2026-02-05T15:30:00+00:00', 'end_time': '2026-02-05T16:30:00+00:00'}
+        seminar = {'id': 'e1', 'summary': 'Seminar', 'user_id': 'user-a',
+                   'start_time': '2026-02-05T15:00:00+00:00', 'end_time': '2026-02-05T16:00:00+00:00'}
+        ranges = [
+            ('2026-02-05T10:00:00-05:00', '2026-02-05T11:00:00-05:00'),
+            ('2026-02-12T10:00:00-05:00', '2026-02-12T11:00:00-05:00'),
+        ]
+        supabase = FakeSupabase([], per_range={ranges[0][0]: [lab, seminar], ranges[1][0]: []})
+        monkeypatch.setattr(models, 'get_supabase', lambda: supabase)
+        monkeypatch.setattr(models, '_warned_rpc_fallbacks', set())
+
+        result = models.Event.get_conflicting_events_batch('user-a', ranges)
+
+        assert [name for name, _ in supabase.calls] == [
+            'get_conflicting_events_batch', 'get_conflicting_events', 'get_conflicting_events',
+        ]
+        assert result == [
+            {'range_idx': 0, 'id': 'e1', 'summary': 'Seminar',
+             'start_time': seminar['start_time'], 'end_time': seminar['end_time']},
+            {'range_idx': 0, 'id': 'e2', 'summary': 'Lab',
+             'start_time': lab['start_time'], 'end_time': lab['end_time']},
+        ]
+
+        # The missing RPC is logged once per process, not on every check
+        models.Event.get_conflicting_events_batch('user-a', ranges)
+        warnings = [r for r in caplog.records if 'get_conflicting_events_batch' in r.getMessage()]
+        assert len(warnings) == 1
+        assert warnings[0].levelname == 'WARNING'
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
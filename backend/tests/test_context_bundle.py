@@ -0,0 +1,298 @@
+"""
+Tests for the batched personalization context bundle.
+
+Runs EventService.get_personalization_context_bundle against a fake Supabase
+whose RPC follows the supabase migration and whose table queries follow the
+per-event PostgREST calls, and checks the bundle matches
+get_surrounding_events / get_events_on_date / search_location_history event
+by event in one RPC. Also checks that the agent falls back to the per-event
+queries (same context) when the RPC raises, e.g. before the migration is
+applied.
+"""
+
+import pytest
+import sys
+import os
+from datetime import datetime, timezone
+
+# Add backend to path
+backend_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if backend_path not in sys.path:
+    sys.path.insert(0, backend_path)
+
+
+FIELDS = ['summary', 'start_time', 'end_time', 'start_date', 'end_date', 'is_all_day', 'location', 'calendar_name']
+
+
+def row(summary, start_time, user_id='user-a', provider='google', deleted_at=None, location=None):
+    return {
+        'user_id': user_id, 'provider': provider, 'deleted_at': deleted_at,
+        'summary': summary, 'start_time': start_time, 'end_time': None,
+        'start_date': None, 'end_date': None, 'is_all_day': start_time is None,
+        'location': location, 'calendar_name': 'Primary',
+    }
+
+
+ROWS = [
+    row('Gym', '2026-02-05T08:00:00+00:00'),
+    row('Standup', '2026-02-05T09:30:00+00:00'),
+    row('Seminar', '2026-02-05T11:00:00+00:00', location='Sciences Library'),
+    row('Draft', '2026-02-05T12:00:00+00:00', provider='dropcal'),
+    row('Deleted', '2026-02-05T12:30:00+00:00', deleted_at='2026-02-01T00:00:00+00:00'),
+    row('Other user', '2026-02-05T12:05:00+00:00', user_id='user-b'),
+    row('Lab', '2026-02-05T13:15:00+00:00'),
+    row('Office hours', '2026-02-05T16:40:00+00:00'),
+    row('Dinner', '2026-02-05T19:00:00+00:00'),
+    row('Holiday', None),
+    row('Review', '2026-02-06T10:00:00+00:00'),
+    row('Climbing', '2026-02-06T14:30:00+00:00'),
+]
+
+
+def parse_time(value):
+    """Timestamptz comparison; bare timestamps are UTC (as in the database)."""
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def project(rows):
+    return [{field: r[field] for field in FIELDS} for r in rows]
+
+
+class FakeQuery:
+    """The PostgREST builder calls get_surrounding_events / get_events_on_date make."""
+
+    def __init__(self, rows):
+        self.rows = list(rows)
+        self.negate = False
+        self.limit_n = None
+
+    def select(self, fields):
+        return self
+
+    def eq(self, column, value):
+        self.rows = [r for r in self.rows if r[column] == value]
+        return self
+
+    def neq(self, column, value):
+        self.rows = [r for r in self.rows if r[column] != value]
+        return self
+
+    @property
+    def not_(self):
+        self.negate = True
+        return self
+
+    def is_(self, column, value):
+        negate, self.negate = self.negate, False
+        self.rows = [r for r in self.rows if (r[column] is None) != negate]
+        return self
+
+    def _compare(self, column, value, op):
+        self.rows = [r for r in self.rows if op(parse_time(r[column]), parse_time(value))]
+        return self
+
+    def lt(self, column, value):
+        return self._compare(column, value, lambda a, b: a < b)
+
+    def gte(self, column, value):
+        return self._compare(column, value, lambda a, b: a >= b)
+
+    def lte(self, column, value):
+        return self._compare(column, value, lambda a, b: a <= b)
+
+    def order(self, column, desc=False):
+        self.rows.sort(key=lambda r: parse_time(r[column]), reverse=desc)
+        return self
+
+    def limit(self, n):
+        self.limit_n = n
+        return self
+
+    def execute(self):
+        return type('Result', (), {'data': project(self.rows[:self.limit_n])})()
+
+
+class FakeRPC:
+    def __init__(self, data):
+        self.data = data
+
+    def execute(self):
+        return self
+
+
+def context_bundle_rpc(rows, params):
+    """get_personalization_context_bundle from its supabase migration (surrounding part)."""
+    user_id, k = params['p_user_id'], params['p_k']
+    live = FakeQuery(rows).eq('user_id', user_id).neq('provider', 'dropcal')\
+        .is_('deleted_at', None).not_.is_('start_time', None).rows
+
+    surrounding = {}
+    for target in params['p_targets']:
+        if target.get('target_time'):
+            before = FakeQuery(live).lt('start_time', target['target_time'])\
+                .order('start_time', desc=True).rows[:max(k, 2)]
+            after = FakeQuery(live).gte('start_time', target['target_time'])\
+                .order('start_time').rows[:max(k, 2)]
+            matched = before + after
+        else:
+            matched = FakeQuery(live).gte('start_time', f"{target['target_date']}T00:00:00")\
+                .lte('start_time', f"{target['target_date']}T23:59:59").order('start_time').rows[:k]
+        if matched:
+            surrounding[str(target['idx'])] = project(sorted(matched, key=lambda r: parse_time(r['start_time'])))
+    return {'surrounding': surrounding, 'location_history': []}
+
+
+class FakeSupabase:
+    def __init__(self, rows, rpc_error=None):
+        self.rows = rows
+        self.rpc_error = rpc_error
+        self.rpc_calls = []
+        self.table_calls = 0
+
+    def table(self, name):
+        assert name == 'events'
+        self.table_calls += 1
+        return FakeQuery(self.rows)
+
+    def rpc(self, name, params):
+        assert name == 'get_personalization_context_bundle'
+        self.rpc_calls.append(params)
+        if self.rpc_error:
+            raise self.rpc_error
+        return FakeRPC(context_bundle_rpc(self.rows, params))
+
+
+class FakeGazetteer:
+    def search(self, user_id, query, limit):
+        return [{'location': f'{query} (matched)', 'match_score': 0.9, 'count': 1}]
+
+
+TARGETS = [
+    {'target_time': '2026-02-05T12:10:00+00:00', 'location': 'Sci Li'},
+    {'target_date': '2026-02-05'},
+    {'target_time': '2026-02-06T09:00:00+00:00'},
+    {'location': 'Gym'},  # neither time nor date
+    {'target_date': '2026-03-01', 'location': '  '},
+]
+
+
+@pytest.fixture
+def db(monkeypatch):
+    from config.database import CalendarIndexConfig
+    from database import supabase_client
+    from pipeline.personalization import location_gazetteer
+
+    supabase = FakeSupabase(ROWS)
+    monkeypatch.setattr(CalendarIndexConfig, 'ENABLED', False)
+    monkeypatch.setattr(supabase_client, 'get_supabase', lambda: supabase)
+    monkeypatch.setattr(location_gazetteer, 'get_location_gazetteer', lambda: FakeGazetteer())
+    return supabase
+
+
+def per_event_context(user_id, target):
+    from pipeline.events import EventService
+
+    if target.get('target_time'):
+        surrounding = EventService.get_surrounding_events(user_id, target['target_time'])
+    elif target.get('target_date'):
+        surrounding = EventService.get_events_on_date(user_id, target['target_date'])
+    else:
+        surrounding = []
+    location = (target.get('location') or '').strip()
+    return {
+        'surrounding_events': surrounding,
+        'location_matches': EventService.search_location_history(user_id, location) if location else [],
+    }
+
+
+class TestContextBundle:
+
+    def test_bundle_matches_per_event_queries(self, db):
+        from pipeline.events import EventService
+
+        bundle = EventService.get_personalization_context_bundle('user-a', TARGETS)
+
+        assert len(db.rpc_calls) == 1
+        assert db.table_calls == 0
+        for i, target in enumerate(TARGETS):
+            assert bundle[i] == per_event_context('user-a', target), f"event {i}"
+
+        # Sanity: the nearest events really were picked, drafts/deleted/others excluded
+        assert [e['summary'] for e in bundle[0]['surrounding_events']] == [
+            'Lab', 'Seminar', 'Standup', 'Gym', 'Office hours',
+        ]
+        assert bundle[3]['surrounding_events'] == []
+        assert bundle[4] == {'surrounding_events': [], 'location_matches': []}
+
+    def test_rpc_receives_only_datable_targets(self, db):
+        from pipeline.events import EventService
+
+        EventService.get_personalization_context_bundle('user-a', TARGETS, k=3)
+
+        params = db.rpc_calls[0]
+        assert params['p_user_id'] == 'user-a'
+        assert params['p_k'] == 3
+        assert params['p_include_locations'] is False
+        assert [t['idx'] for t in params['p_targets']] == [0, 1, 2, 4]
+
+    def test_rpc_error_propagates(self, db):
+        from pipeline.events import EventService
+
+        db.rpc_error = RuntimeError('function get_personalization_context_bundle does not exist')
+        with pytest.raises(RuntimeError):
+            EventService.get_personalization_context_bundle('user-a', TARGETS)
+
+
+class TestAgentContextFallback:
+
+    @pytest.fixture
+    def agent(self):
+        pytest.importorskip('langchain_anthropic')
+        from pipeline.personalization.agent import PersonalizationAgent
+
+        # Skip __init__ (LLM client, similarity store); stub the non-DB context sources
+        agent = PersonalizationAgent.__new__(PersonalizationAgent)
+        agent._batch_query_corrections = lambda events, user_id: [[] for _ in events]
+        agent._get_similarity_search = lambda historical_events, user_id: None
+        agent._find_similar_events = lambda events, search, k: [[] for _ in events]
+        return agent
+
+    @pytest.fixture
+    def events(self):
+        from pipeline.models import CalendarEvent, CalendarDateTime
+
+        return [
+            CalendarEvent(summary='Meet advisor', start=CalendarDateTime(dateTime='2026-02-05T12:10:00+00:00'),
+                          location='Sci Li'),
+            CalendarEvent(summary='Problem set', start=CalendarDateTime(date='2026-02-05')),
+            CalendarEvent(summary='Review', start=CalendarDateTime(dateTime='2026-02-06T09:00:00+00:00')),
+        ]
+
+    def test_rpc_failure_falls_back_to_same_context(self, db, agent, events, monkeypatch, caplog):
+        from pipeline.personalization import agent as agent_module
+
+        monkeypatch.setattr(agent_module, '_bundle_fallback_logged', False)
+        bundled = agent._prefetch_all_event_contexts(events, [], 'user-a')
+        assert db.table_calls == 0
+
+        db.rpc_error = RuntimeError('function get_personalization_context_bundle does not exist')
+        assert agent._fetch_context_bundle(events, 'user-a') is None
+
+        per_event = agent._prefetch_all_event_contexts(events, [], 'user-a')
+        assert db.table_calls > 0
+        assert per_event == bundled
+        assert bundled[0]['location_matches'] == [{'location': 'Sci Li (matched)', 'match_score': 0.9, 'count': 1}]
+
+        # The missing RPC is logged once, at warning level
+        agent._fetch_context_bundle(events, 'user-a')
+        warnings = [r for r in caplog.records if 'Context bundle RPC unavailable' in r.getMessage()]
+        assert [r.levelname for r in warnings] == ['WARNING']
+
+    def test_no_user_skips_bundle(self, db, agent, events):
+        assert agent._fetch_context_bundle(events, None) is None
+        assert db.rpc_calls == []
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,87 @@
+"""
+Tests for the per-user session context cache.
+
+Checks that repeat sessions hit the cache, that writes invalidate the
+affected kind only, and that a load racing a write isn't cached.
+"""
+
+import pytest
+import sys
+import os
+
+# Add backend to path
+backend_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if backend_path not in sys.path:
+    sys.path.insert(0, backend_path)
+
+
+class TestUserContextCache:
+
+    @pytest.fixture
+    def cache(self):
+        from database.context_cache import UserContextCache
+        return UserContextCache(max_users=2, ttl_seconds=60)
+
+    def test_repeat_loads_hit_cache(self, cache):
+        from database.context_cache import HISTORICAL_EVENTS
+        calls = []
+
+        def load():
+            calls.append(1)
+            return [{'id': 'e1'}]
+
+        assert cache.get('user-a', HISTORICAL_EVENTS, load) == [{'id': 'e1'}]
+        assert cache.get('user-a', HISTORICAL_EVENTS, load) == [{'id': 'e1'}]
+        assert len(calls) == 1
+        assert cache.get_stats()['hits'] == 1
+
+    def test_invalidate_only_drops_given_kind(self, cache):
+        from database.context_cache import HISTORICAL_EVENTS, CALENDARS
+        cache.get('user-a', HISTORICAL_EVENTS, lambda: ['old events'])
+        cache.get('user-a', CALENDARS, lambda: ['calendars'])
+
+        cache.invalidate('user-a', HISTORICAL_EVENTS)
+
+        assert cache.get('user-a', HISTORICAL_EVENTS, lambda: ['new events']) == ['new events']
+        assert cache.get('user-a', CALENDARS, lambda: ['reloaded']) == ['calendars']
+
+    def test_draft_writes_do_not_invalidate(self, cache):
+        from database.context_cache import HISTORICAL_EVENTS
+        cache.get('user-a', HISTORICAL_EVENTS, lambda: ['events'])
+
+        cache.invalidate_events([{'user_id': 'user-a', 'provider': 'dropcal'}])
+        assert cache.get('user-a', HISTORICAL_EVENTS, lambda: ['reloaded']) == ['events']
+
+        cache.invalidate_events([{'user_id': 'user-a', 'provider': 'google'}])
+        assert cache.get('user-a', HISTORICAL_EVENTS, lambda: ['reloaded']) == ['reloaded']
+
+    def test_draft_writes_drop_recurring_occurrences(self, cache):
+        from database.context_cache import HISTORICAL_EVENTS, RECURRING_OCCURRENCES
+        cache.get('user-a', HISTORICAL_EVENTS, lambda: ['events'])
+        cache.get('user-a', RECURRING_OCCURRENCES, lambda: 'index-v1')
+
+        cache.invalidate_events([{'user_id': 'user-a', 'provider': 'dropcal'}])
+        assert cache.get('user-a', HISTORICAL_EVENTS, lambda: ['reloaded']) == ['events']
+        assert cache.get('user-a', RECURRING_OCCURRENCES, lambda: 'index-v2') == 'index-v2'
+
+    def test_load_racing_a_write_is_not_cached(self, cache):
+        from database.context_cache import CALENDARS
+
+        def stale_load():
+            cache.invalidate('user-a', CALENDARS)  # write lands mid-load
+            return ['stale']
+
+        assert cache.get('user-a', CALENDARS, stale_load) == ['stale']
+        assert cache.get('user-a', CALENDARS, lambda: ['fresh']) == ['fresh']
+
+    def test_least_recently_used_user_is_evicted(self, cache):
+        from database.context_cache import TIMEZONE
+        for user_id in ('user-a', 'user-b', 'user-c'):
+            cache.get(user_id, TIMEZONE, lambda: 'America/New_York')
+
+        assert cache.get_stats()['users'] == 2
+        assert cache.get('user-a', TIMEZONE, lambda: 'Europe/London') == 'Europe/London'
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
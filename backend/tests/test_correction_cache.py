@@ -0,0 +1,254 @@
+"""
+Tests for the per-user correction matrix cache.
+
+Checks that repeat sessions hit the cache until the TTL expires, that a
+stored correction invalidates the user's entry (and a load racing that
+write isn't cached), that loading builds a normalized matrix of only the
+corrections with embeddings, and that the argpartition top-k in
+_batch_query_corrections ranks exactly like a full sort.
+"""
+
+import pytest
+import sys
+import os
+
+import numpy as np
+
+# Add backend to path
+backend_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if backend_path not in sys.path:
+    sys.path.insert(0, backend_path)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    from pipeline.personalization.corrections import matrix_cache
+
+    fake = FakeClock()
+    monkeypatch.setattr(matrix_cache.time, 'monotonic', fake)
+    return fake
+
+
+@pytest.fixture
+def loads(monkeypatch):
+    """Counts _load calls; each returns a fresh (corrections, matrix) pair."""
+    from pipeline.personalization.corrections.matrix_cache import CorrectionMatrixCache
+
+    calls = []
+
+    def fake_load(user_id):
+        calls.append(user_id)
+        return [{'id': f'{user_id}-{len(calls)}'}], np.ones((1, 4), dtype=np.float32)
+
+    monkeypatch.setattr(CorrectionMatrixCache, '_load', staticmethod(fake_load))
+    return calls
+
+
+class TestCorrectionMatrixCache:
+
+    @pytest.fixture
+    def cache(self):
+        from pipeline.personalization.corrections.matrix_cache import CorrectionMatrixCache
+        return CorrectionMatrixCache(max_users=2, ttl_seconds=60)
+
+    def test_repeat_loads_hit_cache_until_ttl(self, cache, clock, loads):
+        first, _ = cache.get('user-a')
+        clock.now += 59
+        assert cache.get('user-a')[0] is first
+        assert loads == ['user-a']
+
+        clock.now += 2
+        assert cache.get('user-a')[0] == [{'id': 'user-a-2'}]
+        assert cache.get_stats()['hits'] == 1
+        assert cache.get_stats()['misses'] == 2
+
+    def test_invalidate_forces_reload(self, cache, clock, loads):
+        cache.get('user-a')
+        cache.get('user-b')
+        cache.invalidate('user-a')
+
+        assert cache.get('user-a')[0] == [{'id': 'user-a-3'}]
+        assert cache.get('user-b')[0] == [{'id': 'user-b-2'}]
+        assert loads == ['user-a', 'user-b', 'user-a']
+
+    def test_load_racing_a_new_correction_is_not_cached(self, cache, clock, monkeypatch):
+        from pipeline.personalization.corrections.matrix_cache import CorrectionMatrixCache
+
+        def stale_load(user_id):
+            cache.invalidate(user_id)  # correction stored mid-load
+            return [{'id': 'stale'}], np.ones((1, 4), dtype=np.float32)
+
+        monkeypatch.setattr(CorrectionMatrixCache, '_load', staticmethod(stale_load))
+        assert cache.get('user-a')[0] == [{'id': 'stale'}]
+        assert cache.get_stats()['users'] == 0
+
+    def test_least_recently_used_user_is_evicted(self, cache, clock, loads):
+        for user_id in ('user-a', 'user-b', 'user-a', 'user-c'):
+            cache.get(user_id)
+
+        assert cache.get_stats()['users'] == 2
+        cache.get('user-a')
+        cache.get('user-b')
+        assert loads == ['user-a', 'user-b', 'user-c', 'user-b']
+
+    def test_failed_load_is_not_cached(self, cache, clock, monkeypatch):
+        from pipeline.personalization.corrections.matrix_cache import CorrectionMatrixCache
+
+        def failing_load(user_id):
+            raise RuntimeError('supabase down')
+
+        monkeypatch.setattr(CorrectionMatrixCache, '_load', staticmethod(failing_load))
+        with pytest.raises(RuntimeError):
+            cache.get('user-a')
+        assert cache.get_stats()['users'] == 0
+
+
+class FakeQuery:
+    def __init__(self, rows):
+        self.rows = rows
+        self.columns = None
+
+    def select(self, columns):
+        self.columns = columns
+        return self
+
+    def eq(self, column, value):
+        return self
+
+    def execute(self):
+        return type('Result', (), {'data': self.rows})()
+
+
+class FakeSupabase:
+    def __init__(self, rows):
+        self.query = FakeQuery(rows)
+
+    def table(self, name):
+        assert name == 'event_corrections'
+        return self.query
+
+
+class FakeModel:
+    def __init__(self, dimension=None, embeddings=None):
+        self.dimension = dimension
+        self.embeddings = embeddings
+
+    def get_sentence_embedding_dimension(self):
+        return self.dimension
+
+    def encode(self, texts, convert_to_numpy=True, normalize_embeddings=True):
+        return self.embeddings
+
+
+class TestCorrectionMatrixLoad:
+
+    def test_builds_normalized_matrix_of_embedded_corrections(self, monkeypatch):
+        from database import supabase_client
+        from pipeline.personalization.corrections.matrix_cache import CORRECTION_COLUMNS, CorrectionMatrixCache
+        from pipeline.personalization.similarity import service as similarity_service
+
+        supabase = FakeSupabase([
+            {'id': 'c1', 'user_final': {}, 'facts_embedding': [3.0, 4.0]},
+            {'id': 'c2', 'user_final': {}, 'facts_embedding': None},
+            {'id': 'c3', 'user_final': {}, 'facts_embedding': '[0, 2]'},
+        ])
+        monkeypatch.setattr(supabase_client, 'get_supabase', lambda: supabase)
+        monkeypatch.setattr(similarity_service, 'get_embedding_model', lambda: FakeModel(dimension=2))
+
+        corrections, matrix = CorrectionMatrixCache._load('user-a')
+
+        assert supabase.query.columns == CORRECTION_COLUMNS
+        assert [c['id'] for c in corrections] == ['c1', 'c3']
+        assert all('facts_embedding' not in c for c in corrections)
+        assert matrix.dtype == np.float32
+        np.testing.assert_allclose(matrix, [[0.6, 0.8], [0.0, 1.0]], atol=1e-6)
+
+
+class TestStoreCorrectionInvalidates:
+
+    @pytest.fixture
+    def storage(self, monkeypatch):
+        from pipeline.personalization.corrections import service as correction_service
+        from pipeline.personalization.corrections.matrix_cache import CorrectionMatrixCache
+
+        cache = CorrectionMatrixCache()
+        monkeypatch.setattr(correction_service, 'get_correction_matrix_cache', lambda: cache)
+
+        # Skip __init__ (loads the embedding model and a Supabase client)
+        storage = correction_service.CorrectionStorageService.__new__(correction_service.CorrectionStorageService)
+        storage.analyzer = type('Analyzer', (), {
+            'analyze_correction': lambda self, suggestion, final, text: {
+                'correction_type': 'title', 'fields_changed': ['title'],
+            },
+        })()
+        storage._embed_facts = lambda facts: np.zeros(4, dtype=np.float32)
+        return storage, cache
+
+    def store(self, storage):
+        return storage.store_correction(
+            'user-a', 'sess-1', 'math hw due fri',
+            {'title': 'math hw'}, {'summary': 'Math HW'}, {'summary': 'MATH 0180 Homework'},
+        )
+
+    def test_stored_correction_invalidates_user(self, storage):
+        storage, cache = storage
+        storage.supabase = type('Supabase', (), {
+            'table': lambda self, name: self,
+            'insert': lambda self, data: self,
+            'execute': lambda self: type('Result', (), {'data': [{'id': 'corr-1'}]})(),
+        })()
+
+        assert self.store(storage) == 'corr-1'
+        assert cache._versions == {'user-a': 1}
+
+    def test_failed_insert_keeps_cache(self, storage):
+        storage, cache = storage
+
+        def failing_insert(self, data):
+            raise RuntimeError('insert failed')
+
+        storage.supabase = type('Supabase', (), {
+            'table': lambda self, name: self,
+            'insert': failing_insert,
+        })()
+
+        assert self.store(storage) is None
+        assert cache._versions == {}
+
+
+class TestCorrectionRanking:
+
+    def test_top_k_matches_full_sort(self, monkeypatch):
+        pytest.importorskip('langchain_anthropic')
+        from pipeline.personalization.agent import PersonalizationAgent
+        from pipeline.personalization.corrections import matrix_cache
+        from pipeline.personalization.similarity import service as similarity_service
+
+        rng = np.random.default_rng(7)
+        corrections = [{'id': f'c{i}'} for i in range(50)]
+        stored = rng.standard_normal((50, 8)).astype(np.float32)
+        events = rng.standard_normal((6, 8)).astype(np.float32)
+
+        cache = type('Cache', (), {'get': lambda self, user_id: (corrections, stored)})()
+        monkeypatch.setattr(matrix_cache, 'get_correction_matrix_cache', lambda: cache)
+        monkeypatch.setattr(similarity_service, 'get_embedding_model', lambda: FakeModel(embeddings=events))
+        agent = type('Agent', (), {'_event_to_correction_text': staticmethod(lambda event: '')})()
+
+        for k in (1, 5, 50, 80):
+            ranked = PersonalizationAgent._batch_query_corrections(agent, list(range(6)), 'user-a', k=k)
+
+            scores = events @ stored.T
+            expected = [[corrections[j] for j in np.argsort(-row)[:k]] for row in scores]
+            assert ranked == expected
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
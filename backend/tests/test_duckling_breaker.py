@@ -0,0 +1,95 @@
+"""
+Tests for the Duckling circuit breaker.
+
+Checks that consecutive outages open the breaker, that an open breaker
+fails fast without touching the sidecar, and that a background probe
+closes it again.
+"""
+
+import pytest
+import time
+import sys
+import os
+from datetime import datetime, timezone as dt_timezone
+
+# Add backend to path
+backend_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if backend_path not in sys.path:
+    sys.path.insert(0, backend_path)
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestCircuitBreaker:
+
+    def test_opens_after_consecutive_failures(self):
+        from pipeline.resolution.circuit_breaker import CircuitBreaker
+        breaker = CircuitBreaker('test', probe=lambda: False, failure_threshold=3, probe_interval=60)
+
+        breaker.record_failure()
+        breaker.record_failure()
+        breaker.record_success()  # success resets the streak
+        breaker.record_failure()
+        breaker.record_failure()
+        assert breaker.allow_request()
+
+        breaker.record_failure()
+        assert breaker.is_open
+        assert not breaker.allow_request()
+        assert breaker.get_stats()['short_circuited'] == 1
+        breaker.reset()
+
+    def test_background_probe_closes_breaker(self):
+        from pipeline.resolution.circuit_breaker import CircuitBreaker
+        healthy = {'value': False}
+        breaker = CircuitBreaker('test', probe=lambda: healthy['value'], failure_threshold=1, probe_interval=0.02)
+
+        breaker.record_failure()
+        assert breaker.is_open
+
+        healthy['value'] = True
+        assert wait_for(lambda: not breaker.is_open)
+        assert breaker.allow_request()
+
+
+class TestDucklingClientBreaker:
+
+    @pytest.fixture
+    def client(self):
+        from pipeline.resolution.circuit_breaker import CircuitBreaker
+        from pipeline.resolution.duckling_client import DucklingClient, DucklingUnavailableError
+
+        breaker = CircuitBreaker('duckling', probe=lambda: False, failure_threshold=2, probe_interval=60)
+        client = DucklingClient(base_url='http://duckling.invalid', breaker=breaker)
+        client.calls = []
+
+        def down(text, ref_time, timezone, locale, dims):
+            client.calls.append(text)
+            raise DucklingUnavailableError('timed out')
+
+        client._post_parse = down
+        yield client
+        breaker.reset()
+
+    def test_open_breaker_fails_fast(self, client):
+        from pipeline.resolution.duckling_client import DucklingUnavailableError
+        now = datetime(2026, 2, 5, 15, 30, tzinfo=dt_timezone.utc)
+
+        for text in ('Monday', 'Tuesday', 'Wednesday', 'Thursday'):
+            with pytest.raises(DucklingUnavailableError):
+                client.parse_time(text, reference_time=now, timezone='UTC')
+
+        # Only the first two reached the sidecar
+        assert client.calls == ['Monday', 'Tuesday']
+        assert client.get_health()['state'] == 'open'
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,137 @@
+"""
+Tests for the Duckling parse cache.
+
+Checks that repeated strings in a session are parsed once, that results
+depending on the time of day are only shared within the same minute, and
+that hit-rate metrics are reported.
+"""
+
+import pytest
+import sys
+import os
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+# Add backend to path
+backend_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if backend_path not in sys.path:
+    sys.path.insert(0, backend_path)
+
+
+def time_result(body, grain):
+    return {'body': body, 'dim': 'time', 'latent': False,
+            'value': {'type': 'value', 'value': '2026-02-09T00:00:00.000-05:00', 'grain': grain}}
+
+
+class TestDucklingParseCache:
+
+    @pytest.fixture
+    def client(self):
+        from pipeline.resolution.duckling_client import DucklingClient
+        client = DucklingClient(base_url='http://duckling.invalid')
+        client.calls = []
+        grains = {'monday': 'day', 'sept 14': 'day', '3pm': 'hour', '5pm': 'hour'}
+
+        def fake_post(text, ref_time, timezone, locale, dims):
+            client.calls.append(text)
+            grain = grains.get(' '.join(text.split()).lower())
+            return [time_result(text, grain)] if grain else []
+
+        client._post_parse = fake_post
+        return client
+
+    @pytest.fixture
+    def now(self):
+        return datetime(2026, 2, 5, 10, 30, 15, tzinfo=dt_timezone(timedelta(hours=-5)))
+
+    def test_session_issues_one_call_per_distinct_string(self, client, now):
+        strings = ['Monday', '3pm', 'Sept 14', '5pm', 'monday', ' 3pm ', 'MONDAY'] * 4
+        for text in strings:
+            client.parse_time(text, reference_time=now, timezone='America/New_York')
+
+        assert sorted(client.calls) == ['3pm', '5pm', 'Monday', 'Sept 14']
+        stats = client.get_cache_stats()
+        assert stats['misses'] == 4
+        assert stats['hits'] == len(strings) - 4
+
+    def test_day_grain_shared_across_the_day(self, client, now):
+        client.parse_time('Monday', reference_time=now, timezone='America/New_York')
+        client.parse_time('Monday', reference_time=now + timedelta(hours=5), timezone='America/New_York')
+        assert client.calls == ['Monday']
+        assert client.get_cache_stats()['day_hits'] == 1
+
+        # Next local day can resolve "Monday" differently
+        client.parse_time('Monday', reference_time=now + timedelta(days=1), timezone='America/New_York')
+        assert client.calls == ['Monday', 'Monday']
+
+    def test_time_of_day_results_keyed_by_minute(self, client, now):
+        client.parse_time('3pm', reference_time=now, timezone='America/New_York')
+        client.parse_time('3pm', reference_time=now + timedelta(seconds=20), timezone='America/New_York')
+        assert client.calls == ['3pm']
+
+        client.parse_time('3pm', reference_time=now + timedelta(hours=5), timezone='America/New_York')
+        assert client.calls == ['3pm', '3pm']
+
+    def test_key_includes_dims_and_timezone(self, client, now):
+        client.parse_time('Monday', reference_time=now, timezone='America/New_York')
+        client.parse_time('Monday', reference_time=now, timezone='Europe/London')
+        client.parse_duration('Monday', reference_time=now, timezone='America/New_York')
+        assert len(client.calls) == 3
+
+    def test_lru_eviction(self, now):
+        from pipeline.resolution.duckling_cache import DucklingParseCache
+        cache = DucklingParseCache(max_entries=2)
+        for text in ('a', 'b', 'c'):
+            cache.put(text, now, 'UTC', 'en_US', ['time'], [])
+
+        assert cache.get('a', now, 'UTC', 'en_US', ['time']) is None
+        assert cache.get('c', now, 'UTC', 'en_US', ['time']) == []
+        assert cache.get_stats()['evictions'] == 1
+
+
+class TestBatchResolution:
+
+    @pytest.fixture
+    def client(self):
+        from pipeline.resolution.duckling_client import DucklingClient, DucklingError
+        client = DucklingClient(base_url='http://duckling.invalid')
+        client.calls = []
+
+        def fake_post(text, ref_time, timezone, locale, dims):
+            client.calls.append(text)
+            if text == 'broken':
+                raise DucklingError('boom')
+            return [time_result(text, 'day')]
+
+        client._post_parse = fake_post
+        return client
+
+    def test_parse_batch_dedupes_and_reports_errors(self, client):
+        from pipeline.resolution.duckling_client import DucklingError
+        parsed = client.parse_batch(['Monday', 'Sept 14', 'Monday', 'broken', ''], timezone='UTC')
+
+        assert sorted(client.calls) == ['Monday', 'Sept 14', 'broken']
+        assert parsed['Monday'][0]['body'] == 'Monday'
+        assert isinstance(parsed['broken'], DucklingError)
+
+    def test_batch_matches_per_event_resolution(self, client, monkeypatch):
+        from pipeline.models import ExtractedEvent
+        from pipeline.resolution import temporal_resolver
+
+        monkeypatch.setattr(temporal_resolver, '_get_client', lambda: client)
+        # Strings the local fast path defers, so every parse reaches Duckling
+        events = [
+            ExtractedEvent(summary='Lecture', start_date='next Monday', start_time='3:00', end_time='5:00'),
+            ExtractedEvent(summary='Exam', start_date='Sept 14'),
+            ExtractedEvent(summary='Lab', start_date='next Monday', start_time='3:00'),
+        ]
+        now = datetime(2026, 2, 5, 10, 30, tzinfo=dt_timezone(timedelta(hours=-5)))
+
+        batched = temporal_resolver.resolve_temporal_batch(events, 'America/New_York', now)
+        single = [temporal_resolver.resolve_temporal(e, 'America/New_York', now) for e in events]
+
+        assert batched == single
+        assert sorted(client.calls) == ['3:00', '5:00', 'Sept 14', 'next Monday']
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,138 @@
+"""
+Tests for the fast-path temporal parser.
+
+Checks canonical formats resolve locally to the values Duckling returns,
+that ambiguous strings fall through to Duckling, and benchmarks session
+resolution with the sidecar bypassed.
+"""
+
+import pytest
+import time
+import sys
+import os
+from datetime import datetime
+
+# Add backend to path
+backend_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if backend_path not in sys.path:
+    sys.path.insert(0, backend_path)
+
+import pytz
+
+TZ = pytz.timezone('America/New_York')
+# Thursday 2026-02-05 10:30 ET
+NOW = TZ.localize(datetime(2026, 2, 5, 10, 30))
+
+
+class TestFastParse:
+
+    @pytest.mark.parametrize("text,expected", [
+        ('2026-02-05', datetime(2026, 2, 5)),
+        ('2026-02-05T14:00:00', datetime(2026, 2, 5, 14, 0)),
+        ('02/14/2026', datetime(2026, 2, 14)),
+        ('February 5, 2026', datetime(2026, 2, 5)),
+        ('Thursday, Feb. 5th 2026', datetime(2026, 2, 5)),
+        ('5 September 2026', datetime(2026, 9, 5)),
+        ('today', datetime(2026, 2, 5)),
+        ('Tomorrow', datetime(2026, 2, 6)),
+        ('Monday', datetime(2026, 2, 9)),
+        ('3pm', datetime(2026, 2, 5, 15, 0)),
+        ('3:00 PM', datetime(2026, 2, 5, 15, 0)),
+        ('at 11:15 a.m.', datetime(2026, 2, 5, 11, 15)),
+        ('9am', datetime(2026, 2, 6, 9, 0)),  # already past today
+        ('10am', datetime(2026, 2, 5, 10, 0)),  # current hour still counts
+        ('12am', datetime(2026, 2, 6, 0, 0)),
+        ('noon', datetime(2026, 2, 5, 12, 0)),
+        ('17:45', datetime(2026, 2, 5, 17, 45)),
+    ])
+    def test_canonical_formats(self, text, expected):
+        from pipeline.resolution.fast_parser import fast_parse
+        assert fast_parse(text, TZ, NOW) == TZ.localize(expected)
+
+    @pytest.mark.parametrize("text", [
+        'next Tuesday', 'Thursday',  # relative phrasing / same weekday as today
+        '3:00', '09:30',             # no am/pm — Duckling picks the next match
+        'Feb 5', '2026-02-30', 'the week after midterms',
+    ])
+    def test_ambiguous_strings_fall_back(self, text):
+        from pipeline.resolution.fast_parser import fast_parse
+        assert fast_parse(text, TZ, NOW) is None
+
+    def test_per_format_hit_counts(self):
+        from pipeline.resolution.fast_parser import fast_parse, get_fast_path_stats, reset_fast_path_stats
+        reset_fast_path_stats()
+        for text in ['3pm', '4pm', '2026-02-05', 'next week']:
+            fast_parse(text, TZ, NOW)
+
+        stats = get_fast_path_stats()
+        assert stats['format_hits']['time_12h'] == 2
+        assert stats['format_hits']['iso_date'] == 1
+        assert stats['misses'] == 1
+        assert stats['hit_rate'] == 0.75
+
+
+class TestDegradedFallback:
+    """Local resolution used while Duckling's circuit breaker is open."""
+
+    @pytest.mark.parametrize("text,expected", [
+        ('Thursday', datetime(2026, 2, 5)),
+        ('next Thursday', datetime(2026, 2, 12)),
+        ('Feb 14', datetime(2026, 2, 14)),
+        ('the 3rd of January', datetime(2027, 1, 3)),
+        ('3:00', datetime(2026, 2, 5, 15, 0)),
+        ('11:00', datetime(2026, 2, 5, 11, 0)),
+        ('2026-02-05', datetime(2026, 2, 5)),
+    ])
+    def test_fallback_resolves_what_fast_path_defers(self, text, expected):
+        from pipeline.resolution.fast_parser import fallback_parse
+        assert fallback_parse(text, TZ, NOW) == TZ.localize(expected)
+
+    def test_unparseable_returns_none(self):
+        from pipeline.resolution.fast_parser import fallback_parse
+        assert fallback_parse('the week after midterms', TZ, NOW) is None
+
+
+class TestFastPathBenchmark:
+    """Session resolution latency with the Duckling sidecar bypassed."""
+
+    N_EVENTS = 25
+
+    @pytest.fixture
+    def events(self):
+        from pipeline.models import ExtractedEvent
+        return [
+            ExtractedEvent(
+                summary=f'Lecture {i}',
+                start_date=f'2026-0{2 + i % 3}-{1 + i:02d}',
+                start_time=['10:00 AM', '1pm', '3:30 PM'][i % 3],
+                end_time=['11:15 AM', '2pm', '4:45 PM'][i % 3],
+            )
+            for i in range(self.N_EVENTS)
+        ]
+
+    def test_resolution_without_sidecar(self, events, monkeypatch):
+        from pipeline.resolution import temporal_resolver
+        from pipeline.resolution.duckling_client import DucklingClient
+
+        client = DucklingClient(base_url='http://duckling.invalid')
+
+        def no_sidecar(*args, **kwargs):
+            raise AssertionError("canonical strings should not reach Duckling")
+
+        client._post_parse = no_sidecar
+        monkeypatch.setattr(temporal_resolver, '_get_client', lambda: client)
+
+        start = time.perf_counter()
+        results = temporal_resolver.resolve_temporal_batch(events, 'America/New_York', NOW)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        print(f"\nResolved {self.N_EVENTS} events locally in {elapsed_ms:.2f}ms "
+              f"({elapsed_ms / self.N_EVENTS:.3f}ms/event, 0 Duckling calls)")
+
+        assert all(not isinstance(r, Exception) for r in results)
+        assert results[0].start.dateTime == '2026-02-01T10:00:00-05:00'
+        assert elapsed_ms < 50, f"Local resolution should be <50ms, took {elapsed_ms:.1f}ms"
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v', '-s'])
@@ -0,0 +1,122 @@
+"""
+Tests for the pooled Duckling HTTP transport.
+
+Checks latency histogram percentiles, that the connection pool is sized from
+the worker/session config, and that the async batch path gathers one request
+per uncached string and maps failures the same way as single parses.
+"""
+
+import pytest
+import sys
+import os
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+# Add backend to path
+backend_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if backend_path not in sys.path:
+    sys.path.insert(0, backend_path)
+
+
+class TestLatencyHistogram:
+
+    def test_percentiles_use_bucket_upper_bounds(self):
+        from pipeline.resolution.http_transport import LatencyHistogram
+        histogram = LatencyHistogram()
+        for ms in [3] * 50 + [20] * 45 + [400] * 4 + [9000]:
+            histogram.observe(ms)
+
+        stats = histogram.get_stats()
+        assert stats['count'] == 100
+        assert stats['p50_ms'] == 5
+        assert stats['p95_ms'] == 25
+        assert stats['p99_ms'] == 500
+        assert stats['max_ms'] == 9000
+        assert stats['buckets']['le_inf'] == 1
+
+    def test_errors_and_reset(self):
+        from pipeline.resolution.http_transport import LatencyHistogram
+        histogram = LatencyHistogram()
+        histogram.observe(12, error=True)
+        assert histogram.get_stats()['errors'] == 1
+
+        histogram.reset()
+        assert histogram.get_stats()['count'] == 0
+        assert histogram.get_stats()['p95_ms'] == 0.0
+
+
+class TestPooledTransport:
+
+    def test_pool_sized_from_config(self):
+        from config.processing import ProcessingConfig, DucklingTransportConfig
+        from pipeline.resolution.http_transport import PooledHTTPTransport
+
+        transport = PooledHTTPTransport()
+        adapter = transport._session.get_adapter('http://duckling:8000/parse')
+        assert transport.pool_maxsize == ProcessingConfig.MAX_WORKERS * DucklingTransportConfig.CONCURRENT_SESSIONS
+        assert adapter._pool_maxsize == transport.pool_maxsize
+        assert adapter.max_retries.total == 0
+
+    def test_connection_failure_is_recorded(self):
+        from pipeline.resolution.http_transport import PooledHTTPTransport, TransportConnectionError
+
+        transport = PooledHTTPTransport()
+        with pytest.raises(TransportConnectionError):
+            transport.post('http://127.0.0.1:9/parse', data={'text': 'today'}, timeout=1)
+        assert transport.histogram.get_stats()['errors'] == 1
+
+
+class FakeAsyncTransport:
+    """Records gathered batches and answers from a canned table."""
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.batches = []
+
+    def post_many(self, requests_, timeout):
+        texts = [data['text'] for _, data in requests_]
+        self.batches.append(texts)
+        return [self.responses[text] for text in texts]
+
+
+class TestAsyncBatch:
+
+    @pytest.fixture
+    def now(self):
+        return datetime(2026, 2, 5, 10, 30, tzinfo=dt_timezone(timedelta(hours=-5)))
+
+    @pytest.fixture
+    def client(self):
+        from pipeline.resolution.duckling_client import DucklingClient
+        from pipeline.resolution.http_transport import TransportResponse, TransportTimeout
+
+        result = '[{"body": "x", "dim": "time", "value": {"type": "value", "grain": "day"}}]'
+        client = DucklingClient(base_url='http://duckling.invalid', use_async=False)
+        client._async_transport = FakeAsyncTransport({
+            'Monday': TransportResponse(200, result),
+            'Sept 14': TransportResponse(200, result),
+            'garbled': TransportResponse(400, 'bad request'),
+            'slow': TransportTimeout('read timed out'),
+        })
+        return client
+
+    def test_one_gather_per_batch_and_cached_after(self, client, now):
+        parsed = client.parse_batch(['Monday', 'Sept 14', 'Monday'], now, timezone='UTC')
+
+        assert client._async_transport.batches == [['Monday', 'Sept 14']]
+        assert parsed['Monday'][0]['dim'] == 'time'
+
+        client.parse_batch(['Monday', 'Sept 14'], now, timezone='UTC')
+        assert len(client._async_transport.batches) == 1
+
+    def test_errors_match_single_parse_semantics(self, client, now):
+        from pipeline.resolution.duckling_client import DucklingError, DucklingUnavailableError
+
+        parsed = client.parse_batch(['Monday', 'garbled', 'slow'], now, timezone='UTC')
+
+        assert type(parsed['garbled']) is DucklingError
+        assert isinstance(parsed['slow'], DucklingUnavailableError)
+        assert client.get_health()['consecutive_failures'] == 1
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
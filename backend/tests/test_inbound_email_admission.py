@@ -0,0 +1,116 @@
+"""
+Tests for admission control on the inbound email webhook.
+
+A full email lane answers 429 so the email worker retries. When submit()
+loses the race after the pre-check passed, the session row just created is
+deleted rather than left behind as an error session.
+"""
+
+import pytest
+import sys
+import os
+
+# Add backend to path
+backend_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if backend_path not in sys.path:
+    sys.path.insert(0, backend_path)
+
+
+class FakeScheduler:
+    def __init__(self, admit=True, submit_ok=True):
+        self.admit = admit
+        self.submit_ok = submit_ok
+        self.submitted = []
+
+    def check_admission(self, user_id, lane):
+        from pipeline.scheduler import SchedulerSaturated
+        if not self.admit:
+            raise SchedulerSaturated('email queue full', retry_after=7)
+
+    def submit(self, job_id, user_id, fn, *args, lane):
+        from pipeline.scheduler import SchedulerSaturated
+        if not self.submit_ok:
+            raise SchedulerSaturated('email queue full', retry_after=7)
+        self.submitted.append(job_id)
+
+
+class FakeSessions:
+    def __init__(self):
+        self.created = []
+        self.deleted = []
+        self.errors = []
+
+    def create(self, user_id, input_type, input_content):
+        session = {'id': f'sess-{len(self.created)}', 'user_id': user_id, 'input_type': input_type}
+        self.created.append(session)
+        return session
+
+    def delete(self, session_id):
+        self.deleted.append(session_id)
+        return True
+
+    def mark_error(self, session_id, message):
+        self.errors.append(session_id)
+
+
+@pytest.fixture
+def webhook(monkeypatch):
+    """Post an email to the webhook with a given scheduler."""
+    from flask import Flask
+    from pipeline.input.email import routes
+
+    sessions = FakeSessions()
+    monkeypatch.setenv('CLOUDFLARE_WEBHOOK_SECRET', 'secret')
+    monkeypatch.setattr(routes, '_resolve_user', lambda local_part: {'id': 'user-a'})
+    for name in ('create', 'delete', 'mark_error'):
+        monkeypatch.setattr(routes.DBSession, name, getattr(sessions, name))
+
+    app = Flask(__name__)
+    app.session_processor = type('Processor', (), {'process_text_session': lambda self, *args: None})()
+    app.register_blueprint(routes.inbound_email_bp)
+
+    def post(scheduler):
+        monkeypatch.setattr(routes, 'get_session_scheduler', lambda: scheduler)
+        return app.test_client().post('/webhook/inbound-email', headers={'X-Webhook-Secret': 'secret'}, json={
+            'from': 'registrar@brown.edu',
+            'to': 'lucas@events.dropcal.ai',
+            'subject': 'Exam moved',
+            'text_body': 'The final is now Friday 5/15 at 2pm in Salomon 101.',
+        })
+
+    return sessions, post
+
+
+class TestInboundEmailAdmission:
+
+    def test_admitted_email_is_queued(self, webhook):
+        sessions, post = webhook
+        scheduler = FakeScheduler()
+
+        response = post(scheduler)
+
+        assert response.status_code == 202
+        assert scheduler.submitted == ['sess-0']
+        assert sessions.deleted == []
+
+    def test_full_lane_rejects_before_creating_a_session(self, webhook):
+        sessions, post = webhook
+
+        response = post(FakeScheduler(admit=False))
+
+        assert response.status_code == 429
+        assert response.headers['Retry-After'] == '7'
+        assert sessions.created == []
+
+    def test_lost_admission_race_deletes_session(self, webhook):
+        sessions, post = webhook
+
+        response = post(FakeScheduler(submit_ok=False))
+
+        assert response.status_code == 429
+        assert sessions.deleted == ['sess-0']
+        assert sessions.errors == []
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
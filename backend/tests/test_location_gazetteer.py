@@ -0,0 +1,110 @@
+"""
+Tests for the per-user location gazetteer.
+
+Checks that n-gram-indexed search keeps search_location_history's scoring
+(difflib ratio >= 0.3, rounded, sorted by score then count) and that
+incremental sync updates keep counts and last-used context current, and that
+the number of users kept is bounded (LRU).
+"""
+
+import pytest
+import sys
+import os
+from collections import defaultdict
+from difflib import SequenceMatcher
+
+# Add backend to path
+backend_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if backend_path not in sys.path:
+    sys.path.insert(0, backend_path)
+
+
+def reference_search(rows, query_location, limit=5):
+    """The original full-scan scoring from search_location_history."""
+    location_data = defaultdict(lambda: {'count': 0, 'canonical': '', 'last_used_with': '', 'calendar': ''})
+    for event in rows:
+        loc = event['location']
+        data = location_data[loc.lower().strip()]
+        data['count'] += 1
+        if not data['canonical']:
+            data['canonical'] = loc
+            data['last_used_with'] = event.get('summary', '')
+            data['calendar'] = event.get('calendar_name', '')
+
+    query_lower = query_location.lower().strip()
+    results = []
+    for key, data in location_data.items():
+        score = SequenceMatcher(None, query_lower, key).ratio()
+        if score >= 0.3:
+            results.append({
+                'location': data['canonical'],
+                'match_score': round(score, 2),
+                'count': data['count'],
+                'last_used_with': data['last_used_with'],
+                'calendar': data['calendar'],
+            })
+    results.sort(key=lambda r: (-r['match_score'], -r['count']))
+    return results[:limit]
+
+
+class TestLocationGazetteer:
+
+    @pytest.fixture
+    def rows(self):
+        # Most recent first, like the history query
+        return [
+            {'id': '1', 'location': 'CIT 368', 'summary': 'CSCI Lab', 'calendar_name': 'Classes', 'start_time': '2026-02-10T14:00:00-05:00'},
+            {'id': '2', 'location': 'Sciences Library', 'summary': 'Study', 'calendar_name': 'Personal', 'start_time': '2026-02-09T10:00:00-05:00'},
+            {'id': '3', 'location': 'cit 368', 'summary': 'Office Hours', 'calendar_name': 'Classes', 'start_time': '2026-02-08T16:00:00-05:00'},
+            {'id': '4', 'location': 'Blue State Coffee', 'summary': 'Coffee chat', 'calendar_name': 'Personal', 'start_time': '2026-02-07T09:00:00-05:00'},
+            {'id': '5', 'location': 'Barus & Holley 166', 'summary': 'PHYS Lecture', 'calendar_name': 'Classes', 'start_time': '2026-02-06T11:00:00-05:00'},
+            {'id': '6', 'location': 'Sciences Library', 'summary': 'Group project', 'calendar_name': 'Classes', 'start_time': '2026-02-05T13:00:00-05:00'},
+        ]
+
+    @pytest.fixture
+    def gazetteer(self, rows):
+        from pipeline.personalization.location_gazetteer import LocationGazetteer
+        return LocationGazetteer(loader=lambda user_id: rows)
+
+    @pytest.mark.parametrize("query", ['CIT', 'cit 368', 'sci lib', 'Blue State', 'Barus Holley', 'main street'])
+    def test_matches_full_scan_scoring(self, gazetteer, rows, query):
+        assert gazetteer.search('user-a', query) == reference_search(rows, query)
+
+    def test_incremental_add_update_delete(self, gazetteer):
+        gazetteer.search('user-a', 'warmup')  # seed
+
+        gazetteer.record_event('user-a', '7', 'CIT 368', 'Review Session', 'Classes', '2026-02-11T18:00:00-05:00')
+        top = gazetteer.search('user-a', 'CIT 368')[0]
+        assert top['count'] == 3
+        assert top['last_used_with'] == 'Review Session'
+
+        # Moving an event to a new location updates both entries
+        gazetteer.record_event('user-a', '7', 'Friedman 108', 'Review Session', 'Classes', '2026-02-11T18:00:00-05:00')
+        top = gazetteer.search('user-a', 'CIT 368')[0]
+        assert top['count'] == 2
+        assert top['last_used_with'] == 'CSCI Lab'
+        assert gazetteer.search('user-a', 'Friedman 108')[0]['count'] == 1
+
+        gazetteer.remove_event('user-a', '7')
+        assert all(r['location'] != 'Friedman 108' for r in gazetteer.search('user-a', 'Friedman 108'))
+
+    def test_updates_before_seed_are_ignored(self, gazetteer):
+        """Unseeded users pick everything up from the database on first search."""
+        gazetteer.record_event('user-b', '9', 'Somewhere', 'Event', 'Cal', None)
+        assert not gazetteer.is_loaded('user-b')
+
+    def test_least_recently_searched_user_is_evicted(self, rows):
+        from pipeline.personalization.location_gazetteer import LocationGazetteer
+
+        loads = []
+        gazetteer = LocationGazetteer(loader=lambda user_id: loads.append(user_id) or rows, max_users=2)
+        for user_id in ('user-a', 'user-b', 'user-a', 'user-c'):
+            gazetteer.search(user_id, 'CIT')
+
+        assert not gazetteer.is_loaded('user-b')
+        assert gazetteer.is_loaded('user-a') and gazetteer.is_loaded('user-c')
+        assert loads == ['user-a', 'user-b', 'user-c']
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
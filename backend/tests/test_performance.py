@@ -299,5 +299,70 @@ class TestScalability:
             f"Index size should be reasonable, got {index_size / 1024:.1f}KB"
 
 
+@pytest.fixture(scope='module')
+def compact_dataset():
+    return generate_test_events(2000)
+
+
+@pytest.fixture(scope='module')
+def exact_index(compact_dataset):
+    from pipeline.personalization.similarity import TwoStageRetrieval
+    retrieval = TwoStageRetrieval(index_type='flat')
+    retrieval.build_index(compact_dataset)
+    return retrieval
+
+
+@pytest.fixture(scope='module')
+def compact_queries():
+    return [
+        {'title': title}
+        for title in [
+            'MATH homework', 'CSCI lab', 'ECON lecture', 'PHYS practice',
+            'CHEM appointment', 'math problem set', 'team meeting', 'physics lab report',
+        ]
+    ]
+
+
+class TestCompactIndexRecall:
+    """Test recall and memory of compact (quantized / HNSW) indexes vs the exact index."""
+
+    K = 20
+
+    def test_compact_type_selected_within_history_limit(self, monkeypatch):
+        """A full personalization history must be able to use the configured compact index."""
+        from config.database import QueryLimits
+        from config.similarity import CompactIndexConfig
+        from pipeline.personalization.similarity import TwoStageRetrieval
+
+        monkeypatch.setattr(CompactIndexConfig, 'INDEX_TYPE', 'sq8')
+        retrieval = TwoStageRetrieval()
+        assert retrieval._resolve_index_type(QueryLimits.PERSONALIZATION_HISTORICAL_LIMIT) == 'sq8'
+        assert retrieval._resolve_index_type(CompactIndexConfig.MIN_EVENTS - 1) == 'flat'
+
+    @pytest.mark.parametrize("index_type", ['sq8', 'sq_fp16', 'hnsw'])
+    def test_recall_at_k(self, compact_dataset, exact_index, compact_queries, index_type):
+        """Stage-1 candidates from the compact index should match the exact index."""
+        from pipeline.personalization.similarity import TwoStageRetrieval
+
+        compact = TwoStageRetrieval(index_type=index_type)
+        compact.build_index(compact_dataset)
+
+        recalls = []
+        for query in compact_queries:
+            truth = set(exact_index._fast_semantic_search_indices(query, n=self.K))
+            found = set(compact._fast_semantic_search_indices(query, n=self.K))
+            recalls.append(len(truth & found) / len(truth))
+        recall = sum(recalls) / len(recalls)
+
+        exact_mb = exact_index.memory_bytes() / 1024 / 1024
+        compact_mb = compact.memory_bytes() / 1024 / 1024
+        print(f"\n{index_type}: recall@{self.K}={recall:.3f}, "
+              f"memory {compact_mb:.2f}MB vs exact {exact_mb:.2f}MB")
+
+        assert recall >= 0.9, f"{index_type} recall@{self.K} too low: {recall:.3f}"
+        if index_type != 'hnsw':
+            assert compact.memory_bytes() < exact_index.memory_bytes()
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v', '-s'])
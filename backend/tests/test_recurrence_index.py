@@ -0,0 +1,114 @@
+"""
+Tests for the recurring occurrence index used by /events/check-conflicts.
+
+Checks that the searchsorted overlap query returns exactly what the
+per-candidate expand_rrule + times_overlap loop returned, in the same order.
+"""
+
+import pytest
+import random
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Add backend to path
+backend_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if backend_path not in sys.path:
+    sys.path.insert(0, backend_path)
+
+from dateutil.parser import isoparse
+
+
+RULES = [
+    ['RRULE:FREQ=WEEKLY;BYDAY=MO,WE,FR'],
+    ['RRULE:FREQ=WEEKLY;BYDAY=TU,TH;COUNT=20'],
+    ['RRULE:FREQ=DAILY;INTERVAL=2'],
+    ['RRULE:FREQ=MONTHLY;BYMONTHDAY=15', 'RRULE:FREQ=WEEKLY;BYDAY=SU'],
+    ['EXDATE:20260301T100000Z'],  # no RRULE — expands to nothing
+]
+
+
+def brute_force(recurring, exclude_ids, event_start, event_end):
+    """The loop check_event_conflicts ran before the index."""
+    from pipeline.resolution.rrule_utils import expand_rrule, times_overlap
+    results = []
+    for rec_event in recurring:
+        if rec_event.get('id') in exclude_ids:
+            continue
+        try:
+            rec_dt_start = isoparse(rec_event['start_time'])
+            rec_dt_end = isoparse(rec_event['end_time'])
+            for occ_start, occ_end in expand_rrule(
+                rec_event['recurrence'], rec_dt_start, rec_dt_end - rec_dt_start
+            ):
+                if times_overlap(event_start, event_end, occ_start, occ_end):
+                    results.append((rec_event['id'], occ_start, occ_end))
+        except (ValueError, TypeError):
+            continue
+    return results
+
+
+@pytest.fixture
+def recurring():
+    rng = random.Random(7)
+    rows = []
+    for i in range(40):
+        start = datetime(2026, 1, 5) + timedelta(days=rng.randrange(30), hours=rng.randrange(8, 18))
+        end = start + timedelta(minutes=rng.choice([50, 75, 90, 180]))
+        offset = rng.choice(['-05:00', '-08:00', '+00:00', ''])  # '' = naive row
+        rows.append({
+            'id': f'rec-{i}',
+            'summary': f'Recurring {i}',
+            'start_time': start.isoformat() + offset,
+            'end_time': end.isoformat() + offset,
+            'recurrence': rng.choice(RULES),
+        })
+    rows.append({'id': 'broken', 'summary': 'Broken', 'start_time': 'not a date',
+                 'end_time': 'x', 'recurrence': RULES[0]})
+    return rows
+
+
+class TestRecurringOccurrenceIndex:
+
+    def test_matches_brute_force(self, recurring):
+        from pipeline.resolution.recurrence_index import RecurringOccurrenceIndex
+
+        index = RecurringOccurrenceIndex(recurring)
+        exclude_ids = {'rec-3', 'rec-11'}
+        rng = random.Random(11)
+        for _ in range(300):
+            start = datetime(2026, 1, 1) + timedelta(minutes=15 * rng.randrange(4 * 24 * 150))
+            end = start + timedelta(minutes=rng.choice([30, 60, 120, 600]))
+            offset = rng.choice(['-05:00', '+01:00', ''])
+            event_start, event_end = isoparse(start.isoformat() + offset), isoparse(end.isoformat() + offset)
+
+            expected = brute_force(recurring, exclude_ids, event_start, event_end)
+            actual = [
+                (rec_event['id'], occ_start, occ_end)
+                for rec_event, occ_start, occ_end in index.overlapping(event_start, event_end, exclude_ids)
+            ]
+            assert actual == expected
+            # isoformat strings (the response payload) must match too
+            assert [o[1].isoformat() for o in actual] == [o[1].isoformat() for o in expected]
+
+    def test_touching_ranges_do_not_overlap(self):
+        from pipeline.resolution.recurrence_index import RecurringOccurrenceIndex
+        index = RecurringOccurrenceIndex([{
+            'id': 'r', 'summary': 'Standup',
+            'start_time': '2026-02-02T09:00:00-05:00', 'end_time': '2026-02-02T09:15:00-05:00',
+            'recurrence': ['RRULE:FREQ=DAILY'],
+        }])
+
+        assert index.overlapping(isoparse('2026-02-03T09:15:00-05:00'), isoparse('2026-02-03T10:00:00-05:00')) == []
+        hits = index.overlapping(isoparse('2026-02-03T14:10:00+00:00'), isoparse('2026-02-03T14:20:00+00:00'))
+        assert [occ_start.isoformat() for _, occ_start, _ in hits] == ['2026-02-03T09:00:00-05:00']
+
+    def test_empty_index(self):
+        from pipeline.resolution.recurrence_index import RecurringOccurrenceIndex
+        index = RecurringOccurrenceIndex([])
+        assert len(index) == 0
+        assert index.overlapping(isoparse('2026-02-03T09:00:00Z'), isoparse('2026-02-03T10:00:00Z')) == []
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
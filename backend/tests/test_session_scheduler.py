@@ -0,0 +1,323 @@
+"""
+Tests for the pipeline job scheduler.
+
+Covers the bounded worker pool, round-robin fairness between users,
+admission control (global and per-user queue limits), queue position
+updates on the SSE stream (only moved positions, outside the scheduler
+lock), wait-time / failure stats, and priority lanes
+(interactive before email, per-lane caps, maintenance yielding to sessions).
+"""
+
+import pytest
+import sys
+import os
+import threading
+import time
+
+# Add backend to path
+backend_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if backend_path not in sys.path:
+    sys.path.insert(0, backend_path)
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+def make_scheduler(workers, max_queued=20, max_queued_per_user=20, **lanes):
+    """Scheduler with an interactive lane plus any extra lanes given as LaneLimits."""
+    from config.processing import LaneLimits
+    from pipeline.scheduler import SessionScheduler
+
+    limits = {'interactive': LaneLimits(workers, max_queued, max_queued_per_user)}
+    limits.update(lanes)
+    return SessionScheduler(workers=workers, lanes=limits)
+
+
+class Gate:
+    """Job body that blocks until released and records start order."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, name):
+        with self._lock:
+            self.started.append(name)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        self.release.wait(timeout=5)
+        with self._lock:
+            self.active -= 1
+
+
+class TestSessionScheduler:
+
+    def test_concurrency_bounded_by_workers(self):
+        scheduler = make_scheduler(2, 20, 20)
+        gate = Gate()
+        for i in range(6):
+            scheduler.submit(f's{i}', 'user-a', gate, f's{i}')
+
+        assert wait_until(lambda: len(gate.started) == 2)
+        time.sleep(0.05)
+        assert len(gate.started) == 2
+        assert scheduler.get_stats()['queued'] == 4
+
+        gate.release.set()
+        assert wait_until(lambda: scheduler.get_stats()['lanes']['interactive']['completed'] == 6)
+        assert gate.max_active == 2
+
+    def test_round_robin_between_users(self):
+        scheduler = make_scheduler(1, 20, 20)
+        gate = Gate()
+        scheduler.submit('a0', 'user-a', gate, 'a0')
+        assert wait_until(lambda: gate.started == ['a0'])
+
+        for name in ('a1', 'a2', 'a3'):
+            scheduler.submit(name, 'user-a', gate, name)
+        scheduler.submit('b1', 'user-b', gate, 'b1')
+
+        # user-b's single session is dispatched after one of user-a's, not after all three
+        assert scheduler.get_position('a1') == 0
+        assert scheduler.get_position('b1') == 1
+        assert scheduler.get_position('a3') == 3
+
+        gate.release.set()
+        assert wait_until(lambda: len(gate.started) == 5)
+        assert gate.started == ['a0', 'a1', 'b1', 'a2', 'a3']
+
+    def test_rejects_when_queue_full(self):
+        from pipeline.scheduler import SchedulerSaturated
+
+        scheduler = make_scheduler(1, 2, 10)
+        gate = Gate()
+        scheduler.submit('s0', 'user-a', gate, 's0')
+        assert wait_until(lambda: gate.started == ['s0'])
+        scheduler.submit('s1', 'user-b', gate, 's1')
+        scheduler.submit('s2', 'user-c', gate, 's2')
+
+        with pytest.raises(SchedulerSaturated) as exc_info:
+            scheduler.submit('s3', 'user-d', gate, 's3')
+        assert exc_info.value.retry_after > 0
+        with pytest.raises(SchedulerSaturated):
+            scheduler.check_admission('user-d')
+        assert scheduler.get_stats()['rejected'] == 2
+
+        gate.release.set()
+        assert wait_until(lambda: scheduler.get_stats()['lanes']['interactive']['completed'] == 3)
+        scheduler.check_admission('user-d')
+
+    def test_per_user_limit_leaves_room_for_others(self):
+        from pipeline.scheduler import SchedulerSaturated
+
+        scheduler = make_scheduler(1, 10, 2)
+        gate = Gate()
+        scheduler.submit('a0', 'user-a', gate, 'a0')
+        assert wait_until(lambda: gate.started == ['a0'])
+        scheduler.submit('a1', 'user-a', gate, 'a1')
+        scheduler.submit('a2', 'user-a', gate, 'a2')
+
+        with pytest.raises(SchedulerSaturated):
+            scheduler.submit('a3', 'user-a', gate, 'a3')
+        scheduler.submit('b1', 'user-b', gate, 'b1')
+
+        gate.release.set()
+
+    def test_queue_position_published_to_stream(self):
+        from pipeline.stream import init_stream, cleanup_stream
+
+        scheduler = make_scheduler(1, 10, 10)
+        gate = Gate()
+        scheduler.submit('sched-run', 'user-a', gate, 'sched-run')
+        assert wait_until(lambda: gate.started == ['sched-run'])
+
+        first = init_stream('sched-q1')
+        second = init_stream('sched-q2')
+        try:
+            assert scheduler.submit('sched-q1', 'user-a', gate, 'sched-q1') == 0
+            assert scheduler.submit('sched-q2', 'user-b', gate, 'sched-q2') == 1
+            assert (first.stage, first.queue_position) == ('queued', 0)
+            assert (second.stage, second.queue_position) == ('queued', 1)
+
+            gate.release.set()
+            assert wait_until(lambda: second.stage == 'starting')
+            assert second.queue_position is None
+        finally:
+            cleanup_stream('sched-q1')
+            cleanup_stream('sched-q2')
+
+    def test_only_moved_positions_published_outside_lock(self, monkeypatch):
+        from pipeline import scheduler as scheduler_module
+
+        scheduler = make_scheduler(1, 10, 10)
+        published = []
+
+        class RecordingStream:
+            """set_queued checks the scheduler lock is free (a Redis write would hold it)."""
+
+            def __init__(self, job_id):
+                self.job_id = job_id
+
+            def set_queued(self, position):
+                probe = threading.Thread(target=scheduler.get_position, args=(self.job_id,))
+                probe.start()
+                probe.join(timeout=1)
+                assert not probe.is_alive()
+                published.append((self.job_id, position))
+
+            def set_stage(self, stage):
+                pass
+
+        monkeypatch.setattr(scheduler_module, 'get_stream', RecordingStream)
+        gate = Gate()
+        scheduler.submit('s0', 'user-a', gate, 's0')
+        assert wait_until(lambda: gate.started == ['s0'])
+        published.clear()
+
+        scheduler.submit('s1', 'user-a', gate, 's1')
+        scheduler.submit('s2', 'user-a', gate, 's2')
+        scheduler.submit('s3', 'user-b', gate, 's3')  # round-robin: starts before s2
+        assert published == [('s1', 0), ('s2', 1), ('s3', 1), ('s2', 2)]
+
+        published.clear()
+        gate.release.set()
+        assert wait_until(lambda: gate.started == ['s0', 's1', 's3', 's2'])
+        assert published == [('s3', 0), ('s2', 1), ('s2', 0)]
+
+    def test_failing_job_keeps_worker_alive(self):
+        scheduler = make_scheduler(1, 10, 10)
+        done = threading.Event()
+
+        def boom():
+            raise RuntimeError('pipeline crashed')
+
+        scheduler.submit('s0', 'user-a', boom)
+        scheduler.submit('s1', 'user-a', done.set)
+
+        assert done.wait(timeout=2)
+        assert wait_until(lambda: scheduler.get_stats()['lanes']['interactive']['completed'] == 2)
+        stats = scheduler.get_stats()['lanes']['interactive']
+        assert stats['failed'] == 1
+        assert stats['wait']['count'] == 2
+        assert stats['run']['count'] == 2
+        assert stats['run']['errors'] == 1
+
+    def test_waiting_job_id_not_queued_twice(self):
+        scheduler = make_scheduler(1)
+        gate = Gate()
+        scheduler.submit('s0', 'user-a', gate, 's0')
+        assert wait_until(lambda: gate.started == ['s0'])
+
+        scheduler.submit('refresh', 'user-a', gate, 'refresh')
+        scheduler.submit('refresh', 'user-a', gate, 'refresh')
+        assert scheduler.get_stats()['queued'] == 1
+
+        gate.release.set()
+        assert wait_until(lambda: scheduler.get_stats()['lanes']['interactive']['completed'] == 2)
+
+
+class TestSchedulerLanes:
+
+    def test_interactive_starts_before_earlier_email(self):
+        from config.processing import LaneLimits
+        from pipeline.scheduler import EMAIL
+
+        scheduler = make_scheduler(1, email=LaneLimits(1, 10, 10))
+        gate = Gate()
+        scheduler.submit('i0', 'user-a', gate, 'i0')
+        assert wait_until(lambda: gate.started == ['i0'])
+
+        scheduler.submit('e1', 'user-b', gate, 'e1', lane=EMAIL)
+        scheduler.submit('i1', 'user-c', gate, 'i1')
+        assert scheduler.get_position('i1') == 0
+        assert scheduler.get_position('e1') == 1
+
+        gate.release.set()
+        assert wait_until(lambda: len(gate.started) == 3)
+        assert gate.started == ['i0', 'i1', 'e1']
+
+    def test_email_lane_capped_below_pool(self):
+        from config.processing import LaneLimits
+        from pipeline.scheduler import EMAIL
+
+        scheduler = make_scheduler(2, email=LaneLimits(1, 10, 10))
+        gate = Gate()
+        scheduler.submit('e1', 'user-a', gate, 'e1', lane=EMAIL)
+        scheduler.submit('e2', 'user-b', gate, 'e2', lane=EMAIL)
+        assert wait_until(lambda: gate.started == ['e1'])
+        time.sleep(0.05)
+        assert gate.started == ['e1']
+
+        # The other session slot is still free for interactive work
+        scheduler.submit('i1', 'user-c', gate, 'i1')
+        assert wait_until(lambda: gate.started == ['e1', 'i1'])
+
+        gate.release.set()
+        assert wait_until(lambda: len(gate.started) == 3)
+
+    def test_maintenance_yields_to_sessions(self):
+        from config.processing import LaneLimits
+        from pipeline.scheduler import MAINTENANCE
+
+        scheduler = make_scheduler(1, maintenance=LaneLimits(1, 10, 10, yields=True))
+        gate = Gate()
+        scheduler.submit('i0', 'user-a', gate, 'i0')
+        assert wait_until(lambda: gate.started == ['i0'])
+
+        # Maintenance has its own thread but waits while sessions fill the pool
+        scheduler.submit('m1', 'user-a', gate, 'm1', lane=MAINTENANCE)
+        time.sleep(0.05)
+        assert gate.started == ['i0']
+
+        gate.release.set()
+        assert wait_until(lambda: gate.started == ['i0', 'm1'])
+
+    def test_maintenance_waits_for_queued_sessions(self):
+        from config.processing import LaneLimits
+        from pipeline.scheduler import MAINTENANCE
+
+        scheduler = make_scheduler(1, maintenance=LaneLimits(1, 10, 10, yields=True))
+        gate = Gate()
+        scheduler.submit('i0', 'user-a', gate, 'i0')
+        assert wait_until(lambda: gate.started == ['i0'])
+        scheduler.submit('m1', 'user-a', gate, 'm1', lane=MAINTENANCE)
+        scheduler.submit('i1', 'user-b', gate, 'i1')
+
+        gate.release.set()
+        assert wait_until(lambda: len(gate.started) == 3)
+        assert gate.started == ['i0', 'i1', 'm1']
+
+    def test_submit_maintenance_drops_when_saturated(self, monkeypatch):
+        from config.processing import LaneLimits
+        from pipeline import scheduler as scheduler_module
+
+        scheduler = make_scheduler(1, maintenance=LaneLimits(1, 1, 10, yields=True))
+        monkeypatch.setattr(scheduler_module, '_scheduler', scheduler)
+        gate = Gate()
+        scheduler.submit('i0', 'user-a', gate, 'i0')
+        assert wait_until(lambda: gate.started == ['i0'])
+
+        assert scheduler_module.submit_maintenance('m1', 'user-a', gate, 'm1') is True
+        assert scheduler_module.submit_maintenance('m2', 'user-a', gate, 'm2') is False
+        assert scheduler.get_stats()['lanes']['maintenance']['rejected'] == 1
+
+        gate.release.set()
+        assert wait_until(lambda: gate.started == ['i0', 'm1'])
+
+    def test_unknown_lane_rejected(self):
+        scheduler = make_scheduler(1)
+        with pytest.raises(ValueError):
+            scheduler.submit('x', 'user-a', lambda: None, lane='batch')
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -203,6 +203,22 @@ class TestSimilaritySystemIntegration:
         titles = [event['title'] for event, _, _ in results]
         print(f"\n✓ Diversity filtering results: {titles}")
 
+    def test_batch_search_matches_single_queries(self, production_search):
+        """find_similar_batch should match per-query find_similar_with_diversity."""
+        queries = [
+            {'title': 'MATH 0180 homework', 'all_day': True},
+            {'title': 'standup meeting', 'all_day': False},
+            {'title': '', 'all_day': True},
+            {'title': 'CSCI lab', 'all_day': False},
+        ]
+
+        batch = production_search.find_similar_batch(queries, k=3)
+
+        assert len(batch) == len(queries)
+        for query, batch_results in zip(queries, batch):
+            single = production_search.find_similar_with_diversity(query, k=3)
+            assert [e['id'] for e, _, _ in batch_results] == [e['id'] for e, _, _ in single]
+
     def test_fallback_handling(self, production_search):
         """Test fallback for low-quality matches."""
         # Query that should have low similarity to everything
@@ -385,5 +401,131 @@ class TestSimilarityEvaluation:
         print(f"\n✓ Train/test split: {len(train)} train, {len(test)} test events")
 
 
+class TestStoredEmbeddingIndex:
+    """Test building the index from stored pgvector embeddings."""
+
+    @pytest.fixture
+    def embedded_events(self):
+        from pipeline.personalization.similarity import compute_embeddings_batch
+
+        titles = ['MATH 0180 Homework 1', 'CSCI 0200 Lab', 'Team Meeting', 'Doctor Appointment']
+        embeddings = compute_embeddings_batch(titles)
+        return [
+            {
+                'id': str(i),
+                'summary': title,
+                # PostgREST returns vector columns in their text form
+                'event_embedding': '[' + ','.join(str(float(x)) for x in emb) + ']',
+            }
+            for i, (title, emb) in enumerate(zip(titles, embeddings))
+        ]
+
+    def test_fully_embedded_history_skips_encoding(self, embedded_events, monkeypatch):
+        """No model pass when every row already has an embedding."""
+        from pipeline.personalization.similarity import TwoStageRetrieval
+
+        retrieval = TwoStageRetrieval()
+
+        def fail_encode(*args, **kwargs):
+            raise AssertionError("model.encode should not be called")
+
+        monkeypatch.setattr(retrieval.similarity.model, 'encode', fail_encode)
+        retrieval.build_index(embedded_events)
+
+        assert retrieval.index.ntotal == len(embedded_events)
+
+    def test_only_missing_rows_are_encoded(self, embedded_events, monkeypatch):
+        """Rows without an embedding are encoded together in one batch."""
+        from pipeline.personalization.similarity import TwoStageRetrieval
+
+        events = embedded_events + [
+            {'id': '10', 'summary': 'Weekly Standup'},
+            {'id': '11', 'summary': 'Math Problem Set 3'},
+        ]
+        retrieval = TwoStageRetrieval()
+        original_encode = retrieval.similarity.model.encode
+        calls = []
+
+        def counting_encode(texts, *args, **kwargs):
+            calls.append(texts)
+            return original_encode(texts, *args, **kwargs)
+
+        monkeypatch.setattr(retrieval.similarity.model, 'encode', counting_encode)
+        retrieval.build_index(events)
+
+        assert calls == [['Weekly Standup', 'Math Problem Set 3']]
+        assert retrieval.index.ntotal == len(events)
+
+
+class TestSimilarityIndexStore:
+    """Test per-user index reuse across sessions."""
+
+    @pytest.fixture
+    def events(self):
+        return [
+            {'id': str(i), 'title': title, 'updated_at': '2025-01-01T00:00:00'}
+            for i, title in enumerate([
+                'MATH 0180 Homework 1', 'CSCI 0200 Lab', 'Team Meeting',
+                'Doctor Appointment', 'Weekly Standup', 'Math Problem Set 3',
+            ])
+        ]
+
+    def test_warm_hit_reuses_index(self, events):
+        """Same user + unchanged history should not rebuild."""
+        from pipeline.personalization.similarity import SimilarityIndexStore
+
+        store = SimilarityIndexStore(persist_dir='')
+        first = store.get_or_build('user-a', events)
+        second = store.get_or_build('user-a', list(events))
+
+        assert first is second
+        stats = store.get_stats()
+        assert stats['hits'] == 1 and stats['misses'] == 1
+
+    def test_changed_history_and_other_user_rebuild(self, events):
+        """An edited event or a different user must get a different index."""
+        from pipeline.personalization.similarity import SimilarityIndexStore
+
+        store = SimilarityIndexStore(persist_dir='')
+        first = store.get_or_build('user-a', events)
+
+        edited = [dict(e) for e in events]
+        edited[0]['updated_at'] = '2025-02-01T00:00:00'
+        assert store.get_or_build('user-a', edited) is not first
+        assert store.get_or_build('user-b', events) is not first
+
+        # Stale fingerprint for user-a was replaced, not kept alongside
+        assert store.get_stats()['entries'] == 2
+
+    def test_invalidate_drops_only_that_user(self, events):
+        """Invalidation after a bulk write frees the user's index, not others'."""
+        from pipeline.personalization.similarity import SimilarityIndexStore
+
+        store = SimilarityIndexStore(persist_dir='')
+        store.get_or_build('user-a', events)
+        kept = store.get_or_build('user-b', events)
+
+        store.invalidate('user-a')
+        assert store.get_stats()['entries'] == 1
+        assert store.get_or_build('user-b', events) is kept
+        store.get_or_build('user-a', events)
+        assert store.get_stats()['misses'] == 3
+
+    def test_disk_snapshot_round_trip(self, events, tmp_path):
+        """A fresh store (e.g. after restart) should load from disk, not re-encode."""
+        from pipeline.personalization.similarity import SimilarityIndexStore
+
+        query = {'title': 'math homework', 'all_day': True}
+        built = SimilarityIndexStore(persist_dir=str(tmp_path)).get_or_build('user-a', events)
+
+        restarted = SimilarityIndexStore(persist_dir=str(tmp_path))
+        loaded = restarted.get_or_build('user-a', events)
+
+        assert restarted.get_stats()['disk_hits'] == 1
+        built_ids = [e['id'] for e, _, _ in built.find_similar(query, k=3)]
+        loaded_ids = [e['id'] for e, _, _ in loaded.find_similar(query, k=3)]
+        assert built_ids == loaded_ids
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v', '-s'])
@@ -237,6 +237,67 @@ class TestCalendarEventSimilarity:
             for component, value in breakdown.items():
                 assert 0.0 <= value <= 1.0, f"{component} score should be in [0,1], got {value}"
 
+    def test_batch_matches_pairwise(self, similarity_service):
+        """Vectorized batch scoring should match compute_similarity per candidate."""
+        query = {'title': 'MATH 0180 homework', 'all_day': True}
+        candidates = [
+            {'title': 'MATH 0180 Homework 1', 'all_day': True},
+            {'title': 'Team Meeting', 'all_day': False},
+            {'title': 'very long event title with many words', 'all_day': True},
+            {'summary': 'No title field', 'all_day': True},
+            {'title': 'a', 'all_day': False},
+        ]
+
+        batch = similarity_service.compute_similarity_batch(query, candidates)
+
+        assert len(batch) == len(candidates)
+        for candidate, (batch_score, batch_breakdown) in zip(candidates, batch):
+            score, breakdown = similarity_service.compute_similarity(query, candidate)
+            assert batch_score == pytest.approx(score, abs=1e-5)
+            assert batch_breakdown.keys() == breakdown.keys()
+            for component in breakdown:
+                assert batch_breakdown[component] == pytest.approx(breakdown[component], abs=1e-5)
+
+
+class TestEmbeddingCache:
+    """Test the shared byte-bounded LRU embedding cache."""
+
+    def test_lru_eviction_by_bytes(self):
+        """Least recently used entries are evicted once over the byte budget."""
+        import numpy as np
+        from pipeline.personalization.similarity import EmbeddingCache
+
+        vector = np.ones(384, dtype=np.float32)
+        # Room for roughly two entries
+        cache = EmbeddingCache(max_bytes=2 * (vector.nbytes + 200), dtype='float32')
+
+        cache.put('a', vector)
+        cache.put('b', vector)
+        cache.get('a')          # 'a' is now most recently used
+        cache.put('c', vector)  # evicts 'b'
+
+        assert 'a' in cache and 'c' in cache
+        assert 'b' not in cache
+        stats = cache.get_stats()
+        assert stats['evictions'] == 1
+        assert stats['hits'] == 1
+        assert stats['bytes'] <= stats['max_bytes']
+
+    def test_float16_storage_returns_float32(self):
+        """float16 storage halves memory but reads back as float32."""
+        import numpy as np
+        from pipeline.personalization.similarity import EmbeddingCache
+
+        vector = np.linspace(-1, 1, 384).astype(np.float32)
+        cache = EmbeddingCache(max_bytes=1024 * 1024, dtype='float16')
+        cache.put('x', vector)
+
+        value = cache.get('x')
+        assert value.dtype == np.float32
+        assert np.allclose(value, vector, atol=1e-3)
+        assert cache.get('missing') is None
+        assert cache.get_stats()['misses'] == 1
+
 
 class TestConvenienceFunctions:
     """Test helper functions."""
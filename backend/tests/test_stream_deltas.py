@@ -0,0 +1,153 @@
+"""
+Tests for the delta protocol on session streams and the SSE endpoint.
+
+Checks the in-process change log (revisions, replay, truncation), that the
+SSE endpoint sends event_added / event_replaced / events_cleared frames with
+the revision as the SSE id in delta mode, resumes from Last-Event-ID with
+only the missed changes, falls back to a snapshot when it can't replay, and
+keeps sending full lists to clients that didn't ask for deltas.
+"""
+
+import pytest
+import sys
+import os
+import json
+
+# Add backend to path
+backend_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if backend_path not in sys.path:
+    sys.path.insert(0, backend_path)
+
+
+def parse_frames(body):
+    """SSE body → list of (id, event, data) for frames that carry data."""
+    frames = []
+    for block in body.strip().split('\n\n'):
+        fields = {}
+        for line in block.split('\n'):
+            if line.startswith(':'):
+                continue
+            name, _, value = line.partition(': ')
+            fields[name] = value
+        if 'data' in fields:
+            frames.append((fields.get('id'), fields.get('event'), json.loads(fields['data'])))
+    return frames
+
+
+class TestSessionStreamChanges:
+
+    def test_changes_are_numbered_by_revision(self):
+        from pipeline.stream import SessionStream
+
+        stream = SessionStream()
+        stream.push_event({'summary': 'Kickoff'})
+        stream.push_event({'summary': 'Dinner'})
+        stream.replace_event(0, {'summary': 'Kickoff (personalized)'})
+        stream.clear_events()
+
+        assert stream.revision == 4
+        assert [(c['rev'], c['type']) for c in stream.changes_since(0)] == [
+            (1, 'event_added'),
+            (2, 'event_added'),
+            (3, 'event_replaced'),
+            (4, 'events_cleared'),
+        ]
+        assert stream.changes_since(2)[0] == {
+            'rev': 3, 'type': 'event_replaced', 'index': 0,
+            'event': {'summary': 'Kickoff (personalized)'},
+        }
+        assert stream.changes_since(4) == []
+        assert stream.changes_since(5) is None
+
+    def test_truncated_log_cannot_replay(self, monkeypatch):
+        from config.database import StreamConfig
+        from pipeline.stream import SessionStream
+
+        monkeypatch.setattr(StreamConfig, 'MAX_CHANGE_LOG', 3)
+        stream = SessionStream()
+        for i in range(5):
+            stream.push_event({'summary': f'e{i}'})
+
+        assert stream.changes_since(1) is None
+        assert [c['rev'] for c in stream.changes_since(2)] == [3, 4, 5]
+        assert stream.snapshot() == (5, stream.events)
+
+
+@pytest.fixture
+def sse(monkeypatch):
+    """Flask client for the SSE route, with the session row and stream stubbed."""
+    from flask import Flask
+    from pipeline import session_routes
+    from pipeline.stream import SessionStream
+
+    stream = SessionStream()
+    monkeypatch.setattr(session_routes.DBSession, 'get_by_id_lite',
+                        staticmethod(lambda session_id: {'id': session_id, 'status': 'processing'}))
+    monkeypatch.setattr(session_routes, 'get_stream', lambda session_id: stream)
+    monkeypatch.setattr(session_routes, 'cleanup_stream', lambda session_id: None)
+
+    app = Flask(__name__)
+    app.register_blueprint(session_routes.sessions_bp)
+
+    def get(query='', headers=None):
+        response = app.test_client().get(f'/sessions/s1/stream{query}', headers=headers or {})
+        return parse_frames(response.get_data(as_text=True))
+
+    return stream, get
+
+
+def finished_stream(stream):
+    stream.push_event({'summary': 'Kickoff'})
+    stream.push_event({'summary': 'Dinner'})
+    stream.replace_event(1, {'summary': 'Dinner (personalized)'})
+    stream.mark_done()
+
+
+class TestDeltaSSE:
+
+    def test_delta_frames_carry_revision_ids(self, sse):
+        stream, get = sse
+        finished_stream(stream)
+
+        frames = [f for f in get('?delta=1') if f[1] not in ('init', 'stage')]
+        assert [(f[0], f[1]) for f in frames] == [
+            ('1', 'event_added'),
+            ('2', 'event_added'),
+            ('3', 'event_replaced'),
+            (None, 'complete'),
+        ]
+        assert frames[2][2]['index'] == 1
+        assert frames[2][2]['event'] == {'summary': 'Dinner (personalized)'}
+
+    def test_resume_sends_only_missed_changes(self, sse):
+        stream, get = sse
+        finished_stream(stream)
+
+        frames = [f for f in get(headers={'Last-Event-ID': '2'}) if f[1] != 'init']
+        assert [(f[0], f[1]) for f in frames] == [('3', 'event_replaced'), (None, 'complete')]
+
+        frames = [f for f in get('?last_event_id=3') if f[1] != 'init']
+        assert [f[1] for f in frames] == ['complete']
+
+    def test_unreplayable_resume_gets_snapshot(self, sse):
+        stream, get = sse
+        finished_stream(stream)
+
+        frames = [f for f in get(headers={'Last-Event-ID': '42'}) if f[1] == 'event']
+        assert frames == [('3', 'event', {
+            'events': [{'summary': 'Kickoff'}, {'summary': 'Dinner (personalized)'}],
+            'rev': 3,
+        })]
+
+    def test_legacy_clients_get_full_lists(self, sse):
+        stream, get = sse
+        finished_stream(stream)
+
+        frames = [f for f in get() if f[1] not in ('init', 'stage')]
+        assert [f[1] for f in frames] == ['event', 'event', 'complete']
+        assert all(f[0] is None for f in frames)
+        assert frames[-2][2]['events'][1] == {'summary': 'Dinner (personalized)'}
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,233 @@
+"""
+Tests for event-driven SSE relays.
+
+Subscriptions must never lose a write (the reader can be busy sending when
+the pipeline pushes), and an idle connection must not wake up until
+something changes. The benchmarks hold 1,000 idle SSE relays open in one
+process, check they burn (almost) no CPU while idle, then wake every one of
+them with a write and let them finish. TestIdleStreamBenchmark runs the
+relays on OS threads (what sync/gthread workers do: idle costs no CPU, but
+each connection holds a thread). TestGreenletStreamBenchmark runs them as
+greenlets in a monkey-patched subprocess, as under the gevent worker.
+"""
+
+import pytest
+import sys
+import os
+import json
+import subprocess
+import threading
+import time
+
+# Add backend to path
+backend_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if backend_path not in sys.path:
+    sys.path.insert(0, backend_path)
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestStreamSubscription:
+
+    def test_write_while_reader_busy_is_not_lost(self):
+        from pipeline.stream import SessionStream
+
+        stream = SessionStream()
+        subscription = stream.subscribe()
+        stream.push_event({'summary': 'Kickoff'})  # nobody waiting yet
+
+        assert subscription.wait(timeout=0) is True
+        assert subscription.wait(timeout=0.01) is False
+
+    def test_every_subscriber_is_woken(self):
+        from pipeline.stream import SessionStream
+
+        stream = SessionStream()
+        first, second = stream.subscribe(), stream.subscribe()
+        threading.Timer(0.05, stream.set_stage, args=('resolving',)).start()
+
+        start = time.monotonic()
+        assert first.wait(timeout=2.0) is True
+        assert second.wait(timeout=2.0) is True
+        assert time.monotonic() - start < 1.0
+
+    def test_closed_subscription_is_dropped(self):
+        from pipeline.stream import SessionStream
+
+        stream = SessionStream()
+        subscription = stream.subscribe()
+        subscription.close()
+        stream.set_title('Offsite')
+
+        assert subscription.wait(timeout=0) is False
+        assert stream._subscribers == []
+
+
+class TestIdleStreamBenchmark:
+
+    CONNECTIONS = 1000
+
+    @pytest.fixture
+    def relays(self, monkeypatch):
+        """CONNECTIONS live SSE relays, one OS thread each, on queued sessions."""
+        from pipeline import session_routes
+        from pipeline.stream import SessionStream
+
+        monkeypatch.setattr(session_routes, 'cleanup_stream', lambda session_id: None)
+        streams = [SessionStream() for _ in range(self.CONNECTIONS)]
+        received = [[] for _ in range(self.CONNECTIONS)]
+
+        def relay(i):
+            stream = streams[i]
+            subscription = stream.subscribe()
+            try:
+                for frame in session_routes._stream_live(f's{i}', {}, stream, subscription, delta=True):
+                    received[i].append(frame)
+            finally:
+                subscription.close()
+
+        for stream in streams:
+            stream.set_queued(1)
+        threads = [threading.Thread(target=relay, args=(i,), daemon=True) for i in range(self.CONNECTIONS)]
+        for thread in threads:
+            thread.start()
+
+        yield streams, received, threads
+
+        for stream in streams:
+            stream.mark_done()
+
+    def test_idle_streams_cost_no_cpu(self, relays):
+        streams, received, threads = relays
+        assert wait_until(lambda: all(len(frames) == 1 for frames in received))
+
+        # Idle: nothing is written, so no relay should wake up
+        cpu_start = time.process_time()
+        time.sleep(1.0)
+        idle_cpu = time.process_time() - cpu_start
+        assert all(len(frames) == 1 for frames in received)
+        assert idle_cpu < 0.2
+
+        # One write per session reaches every connection
+        start = time.monotonic()
+        for stream in streams:
+            stream.push_event({'summary': 'Kickoff'})
+        assert wait_until(lambda: all(len(frames) == 2 for frames in received))
+        fan_out = time.monotonic() - start
+        assert all('event: event_added' in frames[1] for frames in received)
+
+        for stream in streams:
+            stream.mark_done()
+        for thread in threads:
+            thread.join(timeout=5)
+        assert not any(thread.is_alive() for thread in threads)
+        assert all('event: complete' in frames[-1] for frames in received)
+
+        print(f"\n{self.CONNECTIONS} idle streams: {idle_cpu * 1000:.1f}ms CPU over 1s idle, "
+              f"fan-out to all in {fan_out * 1000:.0f}ms")
+
+
+# Runs in a fresh interpreter: monkey.patch_all() must come before threading
+# is imported, and would leak into every other test if done in-process
+GREENLET_RELAYS = """
+from gevent import monkey
+monkey.patch_all()
+
+import json
+import sys
+import time
+
+import gevent
+
+connections = int(sys.argv[1])
+
+from pipeline import session_routes
+from pipeline.stream import SessionStream
+
+session_routes.cleanup_stream = lambda session_id: None
+streams = [SessionStream() for _ in range(connections)]
+received = [[] for _ in range(connections)]
+
+
+def relay(i):
+    subscription = streams[i].subscribe()
+    try:
+        for frame in session_routes._stream_live(f's{i}', {}, streams[i], subscription, delta=True):
+            received[i].append(frame)
+    finally:
+        subscription.close()
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        gevent.sleep(0.01)
+    return False
+
+
+for stream in streams:
+    stream.set_queued(1)
+relays = [gevent.spawn(relay, i) for i in range(connections)]
+connected = wait_until(lambda: all(len(frames) == 1 for frames in received))
+
+cpu_start = time.process_time()
+gevent.sleep(1.0)
+idle_cpu = time.process_time() - cpu_start
+stayed_idle = all(len(frames) == 1 for frames in received)
+
+start = time.monotonic()
+for stream in streams:
+    stream.push_event({'summary': 'Kickoff'})
+woken = wait_until(lambda: all(len(frames) == 2 for frames in received))
+fan_out = time.monotonic() - start
+
+for stream in streams:
+    stream.mark_done()
+gevent.joinall(relays, timeout=5)
+
+print(json.dumps({
+    'connected': connected,
+    'stayed_idle': stayed_idle,
+    'woken': woken,
+    'finished': all(relay.dead for relay in relays),
+    'complete': all('event: complete' in frames[-1] for frames in received),
+    'idle_cpu': idle_cpu,
+    'fan_out': fan_out,
+}))
+"""
+
+
+class TestGreenletStreamBenchmark:
+
+    CONNECTIONS = 1000
+
+    def test_idle_greenlet_streams_cost_no_cpu(self):
+        pytest.importorskip('gevent')
+
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(p for p in sys.path if p))
+        proc = subprocess.run(
+            [sys.executable, '-c', GREENLET_RELAYS, str(self.CONNECTIONS)],
+            cwd=backend_path, env=env, capture_output=True, text=True, timeout=60,
+        )
+        assert proc.returncode == 0, proc.stderr
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+
+        assert result['connected'] and result['stayed_idle'] and result['woken']
+        assert result['finished'] and result['complete']
+        assert result['idle_cpu'] < 0.2
+
+        print(f"\n{self.CONNECTIONS} idle greenlet streams: {result['idle_cpu'] * 1000:.1f}ms CPU over 1s idle, "
+              f"fan-out to all in {result['fan_out'] * 1000:.0f}ms")
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,285 @@
+"""
+Tests for the Redis session stream backend.
+
+Runs two backends against one local Redis stand-in (as two gunicorn workers
+would share one Redis): the pipeline writes through one, the SSE reader on
+the other sees every update and is woken by pub/sub rather than polling.
+Also checks the module-level init/get/cleanup routing and that Redis errors
+degrade to "no stream" (so the SSE endpoint falls back to DB polling).
+"""
+
+import pytest
+import sys
+import os
+import threading
+import time
+from collections import defaultdict
+
+# Add backend to path
+backend_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if backend_path not in sys.path:
+    sys.path.insert(0, backend_path)
+
+redis = pytest.importorskip('redis')
+
+
+class FakeRedis:
+    """In-process stand-in for the Redis commands the stream backend uses."""
+
+    def __init__(self):
+        self.hashes = defaultdict(dict)
+        self.lists = defaultdict(list)
+        self.subscribers = defaultdict(list)
+        self.lock = threading.RLock()
+        self.fail = False
+
+    def _check(self):
+        if self.fail:
+            raise redis.exceptions.ConnectionError('redis down')
+
+    def hset(self, key, mapping):
+        self.hashes[key].update(mapping)
+
+    def hincrby(self, key, field, amount):
+        value = int(self.hashes[key].get(field, 0)) + amount
+        self.hashes[key][field] = str(value)
+        return value
+
+    def hgetall(self, key):
+        self._check()
+        with self.lock:
+            return dict(self.hashes.get(key, {}))
+
+    def rpush(self, key, value):
+        self.lists[key].append(value)
+
+    def lset(self, key, index, value):
+        self.lists[key][index] = value
+
+    def lrange(self, key, start, end):
+        self._check()
+        with self.lock:
+            items = self.lists.get(key, [])
+            return list(items[start:] if end == -1 else items[start:end + 1])
+
+    def delete(self, *keys):
+        self._check()
+        with self.lock:
+            for key in keys:
+                self.hashes.pop(key, None)
+                self.lists.pop(key, None)
+
+    def expire(self, key, seconds):
+        pass
+
+    def publish(self, channel, message):
+        for subscriber in list(self.subscribers[channel]):
+            subscriber.deliver(message)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        return FakePubSub(self)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.commands.append((name, args, kwargs))
+        return queue
+
+    def execute(self):
+        self.client._check()
+        with self.client.lock:
+            return [getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in self.commands]
+
+
+class FakePubSub:
+    def __init__(self, client):
+        self.client = client
+        self.messages = []
+        self.condition = threading.Condition()
+
+    def subscribe(self, channel):
+        self.client._check()
+        self.client.subscribers[channel].append(self)
+
+    def deliver(self, message):
+        with self.condition:
+            self.messages.append({'type': 'message', 'data': message})
+            self.condition.notify_all()
+
+    def get_message(self, timeout=0.0):
+        with self.condition:
+            if not self.messages and timeout:
+                self.condition.wait(timeout)
+            return self.messages.pop(0) if self.messages else None
+
+    def close(self):
+        for subscribers in self.client.subscribers.values():
+            if self in subscribers:
+                subscribers.remove(self)
+
+
+@pytest.fixture
+def workers():
+    from pipeline.stream_redis import RedisStreamBackend
+
+    client = FakeRedis()
+    return RedisStreamBackend(client), RedisStreamBackend(client), client
+
+
+class TestRedisSessionStream:
+
+    def test_reader_on_other_worker_sees_writes(self, workers):
+        pipeline_worker, sse_worker, _ = workers
+        writer = pipeline_worker.init_stream('sess-1')
+
+        reader = sse_worker.get_stream('sess-1')
+        assert reader is not None
+        assert not reader.done
+        assert reader.revision == 0
+
+        writer.set_stage('extracting')
+        writer.set_title('Team offsite')
+        writer.set_event_count(2)
+        writer.push_event({'summary': 'Kickoff'})
+        writer.push_event({'summary': 'Dinner'})
+        reader.wait_for_update(timeout=0.05)
+
+        assert reader.stage == 'extracting'
+        assert reader.title == 'Team offsite'
+        assert reader.event_count == 2
+        assert [e['summary'] for e in reader.events] == ['Kickoff', 'Dinner']
+        assert reader.revision == 2
+
+        writer.clear_events()
+        writer.push_event({'summary': 'Kickoff (personalized)'})
+        writer.mark_done()
+        reader.wait_for_update(timeout=0.05)
+
+        assert reader.done
+        assert reader.revision == 4
+        assert [e['summary'] for e in reader.events] == ['Kickoff (personalized)']
+
+    def test_change_log_shared_across_workers(self, workers):
+        pipeline_worker, sse_worker, _ = workers
+        writer = pipeline_worker.init_stream('sess-8')
+        writer.push_event({'summary': 'Kickoff'})
+        writer.push_event({'summary': 'Dinner'})
+        writer.replace_event(1, {'summary': 'Dinner (personalized)'})
+
+        reader = sse_worker.get_stream('sess-8')
+        assert [e['summary'] for e in reader.events] == ['Kickoff', 'Dinner (personalized)']
+        assert reader.snapshot() == (3, reader.events)
+
+        changes = reader.changes_since(1)
+        assert [(c['rev'], c['type'], c['index']) for c in changes] == [
+            (2, 'event_added', 1),
+            (3, 'event_replaced', 1),
+        ]
+        assert changes[1]['event'] == {'summary': 'Dinner (personalized)'}
+        assert reader.changes_since(3) == []
+        assert reader.changes_since(9) is None
+
+        writer.clear_events()
+        reader.refresh()
+        assert reader.changes_since(3) == [{'rev': 4, 'type': 'events_cleared'}]
+
+    def test_wait_wakes_on_publish(self, workers):
+        pipeline_worker, sse_worker, _ = workers
+        writer = pipeline_worker.init_stream('sess-2')
+        reader = sse_worker.get_stream('sess-2')
+        reader.wait_for_update(timeout=0.01)  # subscribe
+
+        threading.Timer(0.05, writer.set_queued, args=(3,)).start()
+        start = time.monotonic()
+        assert reader.wait_for_update(timeout=2.0) is True
+        assert time.monotonic() - start < 1.0
+        assert (reader.stage, reader.queue_position) == ('queued', 3)
+
+        writer.set_stage('starting')
+        reader.wait_for_update(timeout=0.05)
+        assert (reader.stage, reader.queue_position) == ('starting', None)
+        reader.close()
+
+    def test_subscribe_sees_earlier_writes_then_blocks(self, workers):
+        pipeline_worker, sse_worker, _ = workers
+        writer = pipeline_worker.init_stream('sess-9')
+        reader = sse_worker.get_stream('sess-9')
+        writer.set_title('Written before subscribing')
+
+        subscription = reader.subscribe()
+        assert reader.title == 'Written before subscribing'
+        assert subscription.wait(timeout=0.05) is False
+
+        threading.Timer(0.05, writer.push_event, args=({'summary': 'Kickoff'},)).start()
+        assert subscription.wait(timeout=2.0) is True
+        assert reader.events == [{'summary': 'Kickoff'}]
+        subscription.close()
+
+    def test_error_marks_done(self, workers):
+        pipeline_worker, sse_worker, _ = workers
+        writer = pipeline_worker.init_stream('sess-3')
+        writer.mark_error('No events found')
+
+        reader = sse_worker.get_stream('sess-3')
+        assert reader.done
+        assert reader.error == 'No events found'
+
+    def test_cleanup_and_unknown_session(self, workers):
+        pipeline_worker, sse_worker, _ = workers
+        pipeline_worker.init_stream('sess-4')
+        sse_worker.cleanup_stream('sess-4')
+
+        assert sse_worker.get_stream('sess-4') is None
+        assert sse_worker.get_stream('never-created') is None
+
+    def test_redis_errors_degrade_to_no_stream(self, workers):
+        pipeline_worker, sse_worker, client = workers
+        writer = pipeline_worker.init_stream('sess-5')
+        client.fail = True
+
+        writer.push_event({'summary': 'Lost'})  # logged, not raised
+        assert sse_worker.get_stream('sess-5') is None
+
+        client.fail = False
+        assert sse_worker.get_stream('sess-5').events == []
+
+
+class TestStreamBackendRouting:
+
+    def test_module_functions_use_configured_backend(self, workers):
+        from pipeline import stream as stream_module
+
+        backend, other_worker, _ = workers
+        previous = stream_module.get_stream_backend()
+        stream_module.set_stream_backend(backend)
+        try:
+            stream_module.init_stream('sess-6').set_title('Routed')
+            assert other_worker.get_stream('sess-6').title == 'Routed'
+            assert stream_module.get_stream('sess-6').title == 'Routed'
+            stream_module.cleanup_stream('sess-6')
+            assert stream_module.get_stream('sess-6') is None
+        finally:
+            stream_module.set_stream_backend(previous)
+
+    def test_memory_backend_is_default(self):
+        from pipeline.stream import InMemoryStreamBackend, SessionStream
+
+        backend = InMemoryStreamBackend()
+        stream = backend.init_stream('sess-7')
+        assert isinstance(stream, SessionStream)
+        stream.push_event({'summary': 'Local'})
+        assert backend.get_stream('sess-7').revision == 1
+        backend.cleanup_stream('sess-7')
+        assert backend.get_stream('sess-7') is None
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,320 @@
+"""
+Tests for the bulk sync write path.
+
+Applies provider pages through SmartSyncService._apply_events against an
+in-memory event store and checks that the added/updated/deleted counts and
+the resulting rows match applying the same events one at a time, with one
+lookup and batched writes per page. Also covers the fetch/write pipeline:
+pages are written in order while later pages are fetched, and the sync token
+is only handed back once every write has succeeded.
+"""
+
+import pytest
+import sys
+import os
+import threading
+import time
+
+# Add backend to path
+backend_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if backend_path not in sys.path:
+    sys.path.insert(0, backend_path)
+
+
+class FakeStore:
+    """In-memory events table exposing the model calls the sync path uses."""
+
+    def __init__(self):
+        self.rows = {}
+        self.calls = []
+        self._next_id = 0
+
+    def _insert(self, row):
+        self._next_id += 1
+        row = dict(row, id=f'row-{self._next_id}', deleted_at=None)
+        self.rows[row['id']] = row
+        return row
+
+    def live(self, provider_event_id):
+        return [r for r in self.rows.values()
+                if r['provider_event_id'] == provider_event_id and r['deleted_at'] is None]
+
+    # Event
+    def get_by_provider_event_ids(self, user_id, provider, provider_event_ids):
+        self.calls.append('lookup')
+        found = {}
+        for pid in provider_event_ids:
+            rows = self.live(pid)
+            if rows:
+                found[pid] = {'id': rows[0]['id'], 'provider_event_id': pid}
+        return found
+
+    def upsert_batch(self, rows):
+        self.calls.append('upsert')
+        for row in rows:
+            self.rows[row['id']].update(row)
+        return rows
+
+    def soft_delete_batch(self, event_ids):
+        self.calls.append('soft_delete')
+        for event_id in event_ids:
+            self.rows[event_id]['deleted_at'] = 'now'
+        return [self.rows[event_id] for event_id in event_ids]
+
+    # EventService
+    def bulk_create_provider_events(self, user_id, provider, provider_account_id, events_data):
+        self.calls.append('insert')
+        return [self._insert(dict(data, user_id=user_id, provider=provider)) for data in events_data]
+
+
+class FakeGazetteer:
+    def record_event(self, *args, **kwargs):
+        pass
+
+    def remove_event(self, *args, **kwargs):
+        pass
+
+
+def google_event(pid, summary='Meeting', status='confirmed'):
+    return {
+        'id': pid,
+        'status': status,
+        'summary': summary,
+        'start': {'dateTime': '2026-03-02T10:00:00-05:00'},
+        'end': {'dateTime': '2026-03-02T11:00:00-05:00'},
+    }
+
+
+def apply_sequentially(store, events):
+    """Reference: per-event semantics of the old one-at-a-time sync."""
+    results = {'events_added': 0, 'events_updated': 0, 'events_deleted': 0}
+    for event in events:
+        live = store.live(event['id'])
+        if event.get('status') == 'cancelled':
+            if live:
+                live[0]['deleted_at'] = 'now'
+                results['events_deleted'] += 1
+        elif live:
+            live[0]['summary'] = event['summary']
+            results['events_updated'] += 1
+        else:
+            store._insert({'provider_event_id': event['id'], 'summary': event['summary']})
+            results['events_added'] += 1
+    return results
+
+
+def live_summaries(store):
+    return sorted((r['provider_event_id'], r['summary'])
+                  for r in store.rows.values() if r['deleted_at'] is None)
+
+
+@pytest.fixture
+def sync(monkeypatch):
+    from calendars import sync_service
+
+    store = FakeStore()
+    monkeypatch.setattr(sync_service, 'Event', store)
+    monkeypatch.setattr(sync_service, 'EventService', store)
+    monkeypatch.setattr(sync_service, 'get_location_gazetteer', lambda: FakeGazetteer())
+    return sync_service.SmartSyncService(), store
+
+
+def seed(store, pids):
+    for pid in pids:
+        store._insert({'provider_event_id': pid, 'summary': 'Old'})
+
+
+class FakeIndexStore:
+    def __init__(self):
+        self.invalidated = []
+
+    def invalidate(self, user_id):
+        self.invalidated.append(user_id)
+
+
+class TestSyncInvalidation:
+
+    @pytest.fixture
+    def run_sync(self, sync, monkeypatch):
+        from calendars import sync_service
+
+        service, _ = sync
+        index_store = FakeIndexStore()
+        monkeypatch.setattr(sync_service, 'get_index_store', lambda: index_store)
+        monkeypatch.setattr(service, '_analyze_sync_state', lambda user_id: {'provider': 'google'})
+        monkeypatch.setattr(service, '_choose_strategy', lambda state: 'incremental')
+        monkeypatch.setattr(service, '_sync_calendars', lambda user_id, provider: [])
+
+        def run(results):
+            monkeypatch.setattr(service, '_execute_sync', lambda user_id, state, strategy: results)
+            service.sync('user-a')
+            return index_store.invalidated
+
+        return run
+
+    def test_changed_history_drops_similarity_index(self, run_sync):
+        assert run_sync({'events_added': 0, 'events_updated': 2, 'events_deleted': 0}) == ['user-a']
+
+    def test_unchanged_history_keeps_index(self, run_sync):
+        assert run_sync({'events_added': 0, 'events_updated': 0, 'events_deleted': 0}) == []
+
+
+class TestApplyEvents:
+
+    PAGE = [
+        google_event('a', 'Renamed'),                  # existing → updated
+        google_event('b', status='cancelled'),         # existing → deleted
+        google_event('c', status='cancelled'),         # unknown → ignored
+        google_event('new', 'First'),                  # added
+        google_event('new', 'Second'),                 # repeated in page → updated
+        google_event('gone', 'Brief'),                 # added ...
+        google_event('gone', status='cancelled'),      # ... then cancelled → deleted
+        google_event('gone', 'Back'),                  # ... then re-added → added
+    ]
+
+    def test_counts_and_rows_match_sequential(self, sync):
+        service, store = sync
+        seed(store, ['a', 'b'])
+        reference = FakeStore()
+        seed(reference, ['a', 'b'])
+
+        results = {'events_added': 0, 'events_updated': 0, 'events_deleted': 0}
+        service._apply_events('user-a', 'google', 'primary', self.PAGE, results)
+
+        assert results == apply_sequentially(reference, self.PAGE)
+        assert live_summaries(store) == live_summaries(reference)
+
+    def test_one_lookup_and_batched_writes_per_page(self, sync):
+        service, store = sync
+        seed(store, ['a', 'b'])
+
+        results = {'events_added': 0, 'events_updated': 0, 'events_deleted': 0}
+        service._apply_events('user-a', 'google', 'primary', self.PAGE, results)
+
+        assert store.calls == ['lookup', 'insert', 'upsert', 'soft_delete']
+
+    def test_writes_split_at_batch_size(self, sync, monkeypatch):
+        from calendars import sync_service
+
+        service, store = sync
+        monkeypatch.setattr(sync_service.SyncConfig, 'BULK_WRITE_BATCH_SIZE', 2)
+        page = [google_event(f'e{i}') for i in range(5)]
+
+        results = {'events_added': 0, 'events_updated': 0, 'events_deleted': 0}
+        service._apply_events('user-a', 'google', 'primary', page, results)
+
+        assert results['events_added'] == 5
+        assert store.calls == ['lookup', 'insert', 'insert', 'insert']
+
+    def test_empty_page_makes_no_requests(self, sync):
+        service, store = sync
+        results = {'events_added': 0, 'events_updated': 0, 'events_deleted': 0}
+        service._apply_events('user-a', 'google', 'primary', [], results)
+
+        assert store.calls == []
+        assert results == {'events_added': 0, 'events_updated': 0, 'events_deleted': 0}
+
+
+def paged(pages, delay=0.0, log=None):
+    """fetch_page over a list of item lists, with Google-style page tokens."""
+    def fetch_page(page_token):
+        index = int(page_token or 0)
+        time.sleep(delay)
+        if log is not None:
+            log.append(('fetch', index))
+        response = {'items': pages[index]}
+        if index + 1 < len(pages):
+            response['nextPageToken'] = str(index + 1)
+        else:
+            response['nextSyncToken'] = 'sync-token'
+        return response
+    return fetch_page
+
+
+class TestSyncPipeline:
+
+    def test_pages_written_in_order_and_token_returned(self, sync):
+        service, store = sync
+        pages = [
+            [google_event('a', 'One')],
+            [google_event('a', 'Two'), google_event('b')],
+            [google_event('b', status='cancelled')],
+        ]
+
+        results, token = service._sync_pages('user-a', 'google', 'primary', paged(pages))
+
+        assert token == 'sync-token'
+        assert results == {'events_added': 2, 'events_updated': 1, 'events_deleted': 1}
+        assert live_summaries(store) == [('a', 'Two')]
+
+    def test_fetch_overlaps_writes(self, sync, monkeypatch):
+        service, _ = sync
+        delay = 0.05
+        pages = [[google_event(f'e{i}')] for i in range(6)]
+        monkeypatch.setattr(service, '_apply_events', lambda *args: time.sleep(delay))
+
+        start = time.perf_counter()
+        service._sync_pages('user-a', 'google', 'primary', paged(pages, delay=delay))
+        elapsed = time.perf_counter() - start
+
+        # Sequential would be 2 * 6 * delay; pipelined is about (6 + 1) * delay
+        assert elapsed < 2 * len(pages) * delay * 0.8
+
+    def test_fetcher_blocks_when_writer_falls_behind(self, sync, monkeypatch):
+        from calendars import sync_service
+
+        service, _ = sync
+        monkeypatch.setattr(sync_service.SyncConfig, 'PIPELINE_MAX_PAGES_AHEAD', 1)
+        release = threading.Event()
+        log = []
+
+        def slow_apply(user_id, provider, calendar_id, items, results):
+            release.wait()
+
+        monkeypatch.setattr(service, '_apply_events', slow_apply)
+        pages = [[google_event(f'e{i}')] for i in range(10)]
+        runner = threading.Thread(
+            target=service._sync_pages,
+            args=('user-a', 'google', 'primary', paged(pages, log=log))
+        )
+        runner.start()
+        time.sleep(0.1)
+
+        # One page in the writer, one queued, one fetched and waiting to be queued
+        assert len(log) <= 3
+        release.set()
+        runner.join(timeout=5)
+        assert len(log) == 10
+
+    def test_write_failure_stops_paging_and_withholds_token(self, sync, monkeypatch):
+        service, _ = sync
+        log = []
+
+        def failing_apply(user_id, provider, calendar_id, items, results):
+            raise RuntimeError('supabase down')
+
+        monkeypatch.setattr(service, '_apply_events', failing_apply)
+        pages = [[google_event(f'e{i}')] for i in range(20)]
+
+        with pytest.raises(RuntimeError, match='supabase down'):
+            service._sync_pages('user-a', 'google', 'primary', paged(pages, delay=0.01, log=log))
+
+        assert len(log) < len(pages)
+
+    def test_fetch_failure_waits_for_queued_writes(self, sync):
+        service, store = sync
+
+        def fetch_page(page_token):
+            if page_token:
+                raise RuntimeError('google down')
+            return {'items': [google_event('a')], 'nextPageToken': '1'}
+
+        with pytest.raises(RuntimeError, match='google down'):
+            service._sync_pages('user-a', 'google', 'primary', fetch_page)
+
+        # The page fetched before the failure was fully written before raising
+        assert live_summaries(store) == [('a', 'Meeting')]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
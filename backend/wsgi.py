@@ -1,10 +1,22 @@
 """
 WSGI entry point for Gunicorn.
 This file allows importing from either 'app' or 'backend.app' module paths.
+
+With WEB_WORKER_CLASS=gevent (opt-in; the Procfile default is sync) each
+SSE connection is a greenlet instead of a thread, so idle streams cost
+neither CPU nor a thread. The patch has to happen before the app (and
+threading) is imported, which --preload does here in the master.
+Scheduler worker threads become greenlets too, so CPU-bound pipeline steps
+(embeddings, FAISS builds, parsing) hold up other connections while they run.
 """
-import sys
 import os
 
+if os.getenv('WEB_WORKER_CLASS') == 'gevent':
+    from gevent import monkey
+    monkey.patch_all()
+
+import sys
+
 # Add parent directory to path if we're in the backend directory
 current_dir = os.path.dirname(os.path.abspath(__file__))
 parent_dir = os.path.dirname(current_dir)
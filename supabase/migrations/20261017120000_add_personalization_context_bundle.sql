@@ -0,0 +1,103 @@
+-- Migration: Add get_personalization_context_bundle RPC
+-- Description: Returns the per-event personalization context for a whole
+-- session in one round trip, instead of 2-3 PostgREST queries per event:
+--   * surrounding: per target, the nearest timed events before/after a
+--     target_time, or the timed events on a target_date (keyed by event index)
+--   * location_history: recent events with a location (shared by all targets;
+--     fuzzy matching stays in the application)
+--
+-- p_targets: [{"idx": 0, "target_time": "2026-02-05T14:00:00-05:00"},
+--             {"idx": 1, "target_date": "2026-02-06"}, ...]
+
+CREATE OR REPLACE FUNCTION get_personalization_context_bundle(
+    p_user_id UUID,
+    p_targets JSONB,
+    p_k INTEGER DEFAULT 5,
+    p_include_locations BOOLEAN DEFAULT TRUE,
+    p_location_limit INTEGER DEFAULT 200
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+SET search_path = public
+AS $$
+WITH targets AS (
+    SELECT
+        (t->>'idx')::INTEGER AS idx,
+        NULLIF(t->>'target_time', '')::TIMESTAMPTZ AS target_time,
+        NULLIF(t->>'target_date', '') AS target_date
+    FROM jsonb_array_elements(COALESCE(p_targets, '[]'::JSONB)) AS t
+),
+-- Timed targets: k nearest on each side (application trims to k by distance)
+surrounding AS (
+    SELECT tg.idx, e.*
+    FROM targets tg
+    CROSS JOIN LATERAL (
+        (
+            SELECT summary, start_time, end_time, start_date, end_date, is_all_day, location, calendar_name
+            FROM events
+            WHERE user_id = p_user_id
+              AND provider <> 'dropcal'
+              AND deleted_at IS NULL
+              AND start_time IS NOT NULL
+              AND start_time < tg.target_time
+            ORDER BY start_time DESC
+            LIMIT GREATEST(p_k, 2)
+        )
+        UNION ALL
+        (
+            SELECT summary, start_time, end_time, start_date, end_date, is_all_day, location, calendar_name
+            FROM events
+            WHERE user_id = p_user_id
+              AND provider <> 'dropcal'
+              AND deleted_at IS NULL
+              AND start_time IS NOT NULL
+              AND start_time >= tg.target_time
+            ORDER BY start_time ASC
+            LIMIT GREATEST(p_k, 2)
+        )
+    ) e
+    WHERE tg.target_time IS NOT NULL
+),
+-- Date-only targets: timed events starting that day
+on_date AS (
+    SELECT tg.idx, e.*
+    FROM targets tg
+    CROSS JOIN LATERAL (
+        SELECT summary, start_time, end_time, start_date, end_date, is_all_day, location, calendar_name
+        FROM events
+        WHERE user_id = p_user_id
+          AND provider <> 'dropcal'
+          AND deleted_at IS NULL
+          AND start_time IS NOT NULL
+          AND start_time >= (tg.target_date || 'T00:00:00')::TIMESTAMPTZ
+          AND start_time <= (tg.target_date || 'T23:59:59')::TIMESTAMPTZ
+        ORDER BY start_time ASC
+        LIMIT p_k
+    ) e
+    WHERE tg.target_time IS NULL AND tg.target_date IS NOT NULL
+),
+grouped AS (
+    SELECT idx, jsonb_agg(to_jsonb(x) - 'idx' ORDER BY x.start_time) AS rows
+    FROM (SELECT * FROM surrounding UNION ALL SELECT * FROM on_date) x
+    GROUP BY idx
+)
+SELECT jsonb_build_object(
+    'surrounding', COALESCE((SELECT jsonb_object_agg(idx, rows) FROM grouped), '{}'::JSONB),
+    'location_history', CASE WHEN p_include_locations THEN COALESCE((
+        SELECT jsonb_agg(to_jsonb(l) ORDER BY l.start_time DESC)
+        FROM (
+            SELECT location, summary, calendar_name, start_time
+            FROM events
+            WHERE user_id = p_user_id
+              AND provider <> 'dropcal'
+              AND deleted_at IS NULL
+              AND location IS NOT NULL
+            ORDER BY start_time DESC
+            LIMIT p_location_limit
+        ) l
+    ), '[]'::JSONB) ELSE '[]'::JSONB END
+);
+$$;
+
+COMMENT ON FUNCTION get_personalization_context_bundle IS 'Batched personalization context (surrounding events per event index + location history) in one round trip';
@@ -0,0 +1,42 @@
+-- Migration: Add get_conflicting_events_batch RPC
+-- Description: Set-based version of get_conflicting_events. Takes every
+-- (start, end) range of a conflict check — each candidate event plus each
+-- expanded occurrence of recurring candidates — and returns all overlapping
+-- events in one round trip, tagged with the index of the range they hit.
+-- A weekly class previously cost one RPC per occurrence (up to 200).
+--
+-- p_ranges: [{"idx": 0, "start": "2026-02-05T14:00:00-05:00", "end": "2026-02-05T15:00:00-05:00"}, ...]
+
+CREATE OR REPLACE FUNCTION get_conflicting_events_batch(
+    p_user_id UUID,
+    p_ranges JSONB
+)
+RETURNS TABLE (
+    range_idx INTEGER,
+    id UUID,
+    summary TEXT,
+    start_time TIMESTAMPTZ,
+    end_time TIMESTAMPTZ
+)
+LANGUAGE sql
+STABLE
+SET search_path = public
+AS $$
+WITH ranges AS (
+    SELECT
+        (r->>'idx')::INTEGER AS idx,
+        (r->>'start')::TIMESTAMPTZ AS range_start,
+        (r->>'end')::TIMESTAMPTZ AS range_end
+    FROM jsonb_array_elements(COALESCE(p_ranges, '[]'::JSONB)) AS r
+)
+SELECT rg.idx, e.id, e.summary::TEXT, e.start_time, e.end_time
+FROM ranges rg
+JOIN events e
+  ON e.user_id = p_user_id
+ AND e.deleted_at IS NULL
+ AND e.start_time < rg.range_end
+ AND e.end_time > rg.range_start
+ORDER BY rg.idx, e.start_time, e.id;
+$$;
+
+COMMENT ON FUNCTION get_conflicting_events_batch IS 'Overlapping events for many time ranges in one round trip, tagged with range index';
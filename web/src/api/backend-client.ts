@@ -79,6 +79,11 @@ export async function uploadFile(
  * Receives events directly from the pipeline as they're resolved — no polling needed.
  * Falls back to pollSession + getSessionEvents if SSE fails.
  *
+ * Uses the delta protocol: the backend sends each event-list change once
+ * (event_added / event_replaced / events_cleared, with the revision as the SSE
+ * id) and we apply it to a local copy. If the connection drops, EventSource
+ * reconnects with Last-Event-ID and only the missed changes are replayed.
+ *
  * @param sessionId - Session ID to stream
  * @param callbacks - Event handlers for different stream events
  * @returns Cleanup function to close the connection
@@ -95,7 +100,12 @@ export function streamSession(
     onError: (error: string) => void
   }
 ): () => void {
-  const eventSource = new EventSource(`${API_URL}/sessions/${sessionId}/stream`)
+  const eventSource = new EventSource(`${API_URL}/sessions/${sessionId}/stream?delta=1`)
+  let events: CalendarEvent[] = []
+  // Reconnects since the last event-list frame. The server sends init on
+  // every reconnect, so only real progress (a delta or snapshot) resets it.
+  let reconnects = 0
+  const MAX_RECONNECTS = 3
 
   eventSource.addEventListener('init', (e) => {
     const data = JSON.parse(e.data)
@@ -107,9 +117,34 @@ export function streamSession(
     }
   })
 
+  // Full snapshot (already-processed session, or changes couldn't be replayed)
   eventSource.addEventListener('event', (e) => {
     const data = JSON.parse(e.data)
-    callbacks.onEvents(data.events)
+    reconnects = 0
+    events = data.events
+    callbacks.onEvents([...events])
+  })
+
+  eventSource.addEventListener('event_added', (e) => {
+    const data = JSON.parse(e.data)
+    reconnects = 0
+    events = [...events]
+    events.splice(data.index, 0, data.event)
+    callbacks.onEvents(events)
+  })
+
+  eventSource.addEventListener('event_replaced', (e) => {
+    const data = JSON.parse(e.data)
+    reconnects = 0
+    events = [...events]
+    events[data.index] = data.event
+    callbacks.onEvents(events)
+  })
+
+  eventSource.addEventListener('events_cleared', () => {
+    reconnects = 0
+    events = []
+    callbacks.onEvents(events)
   })
 
   eventSource.addEventListener('count', (e) => {
@@ -149,6 +184,10 @@ export function streamSession(
     if (e instanceof MessageEvent) {
       const data = JSON.parse(e.data)
       callbacks.onError(data.error || 'Processing failed')
+    } else if (eventSource.readyState === EventSource.CONNECTING && reconnects < MAX_RECONNECTS) {
+      // Browser is reconnecting; it resumes from the last revision we saw
+      reconnects += 1
+      return
     } else {
       callbacks.onError('Connection to server lost')
     }